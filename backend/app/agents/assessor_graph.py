@@ -2,13 +2,27 @@
 
 from __future__ import annotations
 
-from typing import TypedDict, List, Dict, Any, Optional, Tuple
+from typing import TypedDict, List, Dict, Any, Optional, Set, Tuple
 
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, END
 
 from app.domain.models import Patient, Citation
-from app.agents.prompts import ASSESSOR_SYSTEM, ASSESSOR_USER_TEMPLATE
+from app.agents.prompts import (
+    ASSESSOR_PLAN_SYSTEM,
+    ASSESSOR_PLAN_USER_TEMPLATE,
+    ASSESSOR_SYSTEM,
+    ASSESSOR_USER_TEMPLATE,
+)
 from app.validation.citation_verifier import CitationVerifier
+from app.retrieval.chunk_features import SYMPTOM_TERM_SET, hit_features
+from app.retrieval.reranker import HitReranker
+from app.retrieval.dedupe import alias_pages
+from app.retrieval.lexicon import EVIDENCE_BLOCKERS, EVIDENCE_TERMS
+from app.retrieval.phrase_matcher import PhraseMatcher
+from app.retrieval.recommendations import RecommendationIndex, phrase_matches, symptom_matches
+from app.retrieval.site_tagging import SITE_BUCKETS
+from app.utils.concurrency import call_async
 
 
 class AssessorState(TypedDict, total=False):
@@ -16,9 +30,11 @@ class AssessorState(TypedDict, total=False):
     top_k: int
 
     patient: Patient
+    rule_matches: List[Dict[str, Any]]
 
     suspected_site: str
     query: str
+    speculative: Dict[str, Any]
 
     evidence_hits: List[Dict[str, Any]]
     retrieval_debug: Dict[str, Any]
@@ -28,8 +44,43 @@ class AssessorState(TypedDict, total=False):
     response: Dict[str, Any]
 
 
-def build_assessor_graph(patient_repo, retriever, llm, policy):
+# _fallback_extract terms (patient symptoms and cited chunk text), blockers included so
+# "non-visible haematuria" is never read as "visible haematuria"
+_EVIDENCE_MATCHER = PhraseMatcher([t for terms in EVIDENCE_TERMS.values() for t in terms] + list(EVIDENCE_BLOCKERS))
+
+
+def _io_node(fn, afn) -> RunnableLambda:
+    """Graph node with a sync and an async body: invoke() runs fn, ainvoke() awaits afn."""
+    return RunnableLambda(fn, afunc=afn, name=fn.__name__)
+
+
+def build_assessor_graph(
+    patient_repo,
+    retriever,
+    llm,
+    policy,
+    reranker: Optional[HitReranker] = None,
+    rules: Optional[RecommendationIndex] = None,
+    min_top_score: float = 0.55,
+    speculative_margin: Optional[float] = None,
+    deterministic_fast_path: bool = False,
+):
+    """
+    speculative_margin (None = off): retrieval on the deterministic query runs
+    as a parallel branch next to the LLM planning call. Its hits are used as-is
+    when their top score is >= min_top_score + speculative_margin; otherwise the
+    LLM query is retrieved too and the two rankings are fused (RRF).
+
+    deterministic_fast_path: when a _fallback_extract rule matches and its
+    cited chunk (retrieved, above min_top_score) contains the rule's terms,
+    the graph goes straight to decide without the extract_criteria LLM call.
+
+    The LLM / retrieval nodes have sync and async implementations: invoke()
+    blocks as before, ainvoke() awaits the providers' async APIs (or runs
+    sync-only providers in a worker thread).
+    """
     verifier = CitationVerifier()
+    reranker = reranker or HitReranker()
 
     # ------------------------
     # Helpers
@@ -54,48 +105,8 @@ def build_assessor_graph(patient_repo, retriever, llm, policy):
     def _get_chunk_id(h: Dict[str, Any]) -> str:
         return (h.get("id") or h.get("chunk_id") or "").strip()
 
-    def _is_boilerplate(text: str) -> bool:
-        t = _norm(text)
-        if not t:
-            return True
-
-        clinical_markers = [
-            "refer",
-            "consider",
-            "offer",
-            "should be referred",
-            "suspected cancer pathway",
-            "symptom and specific features",
-            "possible cancer",
-            "recommendation",
-            "aged",
-            "and over",
-            "within",
-            "weeks",
-            "haematuria",
-            "hematuria",
-            "dysphagia",
-            "hoarseness",
-            "haemoptysis",
-            "hemoptysis",
-            "x-ray",
-        ]
-        if any(m in t for m in clinical_markers):
-            return False
-
-        boiler = [
-            "all rights reserved",
-            "notice of rights",
-            "terms-and-conditions",
-            "www.nice.org.uk",
-            "suspected cancer: recognition and referral",
-            "recommendations organised by site of cancer",
-            "use this guideline to guide referrals",
-            "this guideline covers",
-            "contents",
-            "introduction",
-        ]
-        return any(b in t for b in boiler)
+    def _features(h: Dict[str, Any]) -> Dict[str, Any]:
+        return hit_features(h)
 
     def _symptoms_norm(patient: Patient) -> List[str]:
         out = []
@@ -105,36 +116,48 @@ def build_assessor_graph(patient_repo, retriever, llm, policy):
                 out.append(s2)
         return out
 
-    def _contains_any(text: str, needles: List[str]) -> bool:
-        t = _norm(text)
-        return any(n in t for n in needles)
+    def _contains_any(h: Dict[str, Any], needles: Tuple[str, ...]) -> bool:
+        return bool(phrase_matches(_EVIDENCE_MATCHER, _hit_text(h)) & set(needles))
 
-    def _best_hit_for_terms(hits: List[Dict[str, Any]], terms: List[str]) -> Optional[Dict[str, Any]]:
+    def _best_hit_for_terms(hits: List[Dict[str, Any]], terms: Tuple[str, ...], strict: bool = False) -> Optional[Dict[str, Any]]:
         """
-        Pick the first hit (already sorted/reranked later) that contains at least one term.
-        If none match, return the first hit.
+        Pick the first hit (already reranked) whose text contains one of the terms as whole tokens.
+        If none match, return the first hit. strict: only a containing hit whose own score is
+        >= min_top_score, else None (a strong unrelated hit is no evidence for the rule).
         """
         for h in hits:
-            if _contains_any(_hit_text(h), terms):
+            if strict and float(h.get("score", 0.0)) < min_top_score:
+                continue
+            if _contains_any(h, terms):
                 return h
-        return hits[0] if hits else None
+        return hits[0] if hits and not strict else None
+
+    def _asserted_terms(patient: Patient) -> Set[str]:
+        """Evidence terms the patient's symptoms assert (whole tokens, not negated or resolved)."""
+        out: Set[str] = set()
+        for s in patient.symptoms or []:
+            out |= symptom_matches(_EVIDENCE_MATCHER, s)
+        return out
 
-    def _fallback_extract(patient: Patient, hits: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _fallback_extract(patient: Patient, hits: List[Dict[str, Any]], strict: bool = False) -> Dict[str, Any]:
         """
         Deterministic extraction when LLM extraction fails.
         Creates matched_rules with valid chunk_id/page so policy can decide.
+        Triggers are symptoms the patient asserts (symptom_matches: whole tokens,
+        negations and "non-visible" excluded). strict=True (fast path) only cites
+        a hit that contains the rule's term and scores >= min_top_score itself.
         """
         age = int(getattr(patient, "age", 0) or 0)
-        symptoms = _symptoms_norm(patient)
+        asserted = _asserted_terms(patient)
 
         # Heuristic rule triggers (covers your E2E patients)
-        has_visible_haem = any("visible haematuria" in s or "visible hematuria" in s or "haematuria" in s or "hematuria" in s for s in symptoms)
-        has_dysphagia = any("dysphagia" in s for s in symptoms)
-        has_haemoptysis = any("haemoptysis" in s or "hemoptysis" in s for s in symptoms)
+        has_visible_haem = bool(asserted & set(EVIDENCE_TERMS["visible_haematuria"]))
+        has_dysphagia = bool(asserted & set(EVIDENCE_TERMS["dysphagia"]))
+        has_haemoptysis = bool(asserted & set(EVIDENCE_TERMS["haemoptysis"]))
 
         # Map to terms to find best evidence chunk
         if has_visible_haem and age >= 45:
-            hit = _best_hit_for_terms(hits, ["visible haematuria", "haematuria", "hematuria", "urology", "bladder"])
+            hit = _best_hit_for_terms(hits, EVIDENCE_TERMS["visible_haematuria"], strict)
             if hit and _get_chunk_id(hit):
                 return {
                     "insufficient_evidence": False,
@@ -148,7 +171,7 @@ def build_assessor_graph(patient_repo, retriever, llm, policy):
                 }
 
         if has_dysphagia:
-            hit = _best_hit_for_terms(hits, ["dysphagia", "oesophageal", "stomach", "upper gastrointestinal", "upper gi"])
+            hit = _best_hit_for_terms(hits, EVIDENCE_TERMS["dysphagia"], strict)
             if hit and _get_chunk_id(hit):
                 return {
                     "insufficient_evidence": False,
@@ -162,7 +185,7 @@ def build_assessor_graph(patient_repo, retriever, llm, policy):
                 }
 
         if has_haemoptysis and age >= 40:
-            hit = _best_hit_for_terms(hits, ["haemoptysis", "hemoptysis", "lung", "chest x-ray", "suspected cancer pathway"])
+            hit = _best_hit_for_terms(hits, EVIDENCE_TERMS["haemoptysis"], strict)
             if hit and _get_chunk_id(hit):
                 return {
                     "insufficient_evidence": False,
@@ -178,53 +201,20 @@ def build_assessor_graph(patient_repo, retriever, llm, policy):
         # If nothing matched, mark insufficient
         return {"insufficient_evidence": True, "matched_rules": []}
 
-    def _hit_score(h: Dict[str, Any], patient: Patient, suspected_site: str) -> float:
-        meta = h.get("metadata") or {}
-        txt = _norm(_hit_text(h))
-        base = float(h.get("score", 0.0))
-
-        if bool(meta.get("has_criteria", False)):
-            base += 0.22
-        if "symptom and specific features" in txt and "recommendation" in txt:
-            base += 0.16
-        if "suspected cancer pathway" in txt:
-            base += 0.12
-        if ("refer" in txt) or ("consider" in txt) or ("offer" in txt):
-            base += 0.08
-
-        terms = _symptoms_norm(patient)
-        term_hits = sum(1 for t in terms[:14] if t in txt)
-        base += min(0.18, term_hits * 0.03)
-
-        if "haemoptysis" in txt or "hemoptysis" in txt:
-            base += 0.18
-        if "unexplained haemoptysis" in txt or "unexplained hemoptysis" in txt:
-            base += 0.10
-
-        site = (suspected_site or "").lower().strip()
-        if site and site != "general":
-            if site in txt:
-                base += 0.06
-            if site == "lung" and ("lung" in txt or "respiratory" in txt):
-                base += 0.06
-
-        if _is_boilerplate(txt):
-            base -= 0.35
-
-        return base
-
-    def _best_excerpt(hit_text: str, patient: Patient, window: int = 240) -> str:
-        s = (hit_text or "").strip()
+    def _best_excerpt(h: Dict[str, Any], patient: Patient, window: int = 240) -> str:
+        s = _hit_text(h)
         if not s:
             return ""
-        low = s.lower()
+        f = _features(h)
 
-        terms = _symptoms_norm(patient)
         idx = -1
-        for t in terms:
+        for t in _symptoms_norm(patient):
             if not t or len(t) < 4:
                 continue
-            i = low.find(t)
+            if t in SYMPTOM_TERM_SET:
+                i = int(f["terms"].get(t, -1))
+            else:
+                i = s.lower().find(t)
             if i != -1:
                 idx = i
                 break
@@ -241,6 +231,59 @@ def build_assessor_graph(patient_repo, retriever, llm, policy):
             out = out + "..."
         return out
 
+    def _deterministic_query(patient: Patient, site: str) -> str:
+        symptoms = ", ".join(patient.symptoms or [])
+        return (
+            "NICE NG12 suspected cancer pathway referral criteria. "
+            f"Symptoms {symptoms}. Age {patient.age}. Site {site}. "
+            "Refer consider offer aged and over recommendation."
+        )
+
+    def _sanitize_query(q: str) -> str:
+        q = q.replace('"', " ").replace("(", " ").replace(")", " ")
+        q = q.replace(" AND ", " ").replace(" OR ", " ")
+        return " ".join(q.split()).strip()
+
+    def _speculative_site(state: AssessorState) -> str:
+        # most frequent site among the rule-table matches (met or not), else no filter
+        sites = [m["rule"].get("site") for m in state.get("rule_matches") or []]
+        sites = [x for x in sites if x in SITE_BUCKETS]
+        return max(sites, key=sites.count) if sites else "general"
+
+    def _fuse_rankings(a: List[Dict[str, Any]], b: List[Dict[str, Any]], k: int, rrf_k: int = 60) -> List[Dict[str, Any]]:
+        """Reciprocal-rank fusion of two hit lists (same formula as the retriever's hybrid mode)."""
+        fused: Dict[str, float] = {}
+        by_id: Dict[str, Dict[str, Any]] = {}
+        for hits in (a, b):
+            for rank, h in enumerate(hits):
+                hid = _get_chunk_id(h)
+                if not hid:
+                    continue
+                fused[hid] = fused.get(hid, 0.0) + 1.0 / (rrf_k + rank + 1)
+                if hid not in by_id or float(h.get("score", 0.0)) > float(by_id[hid].get("score", 0.0)):
+                    by_id[hid] = h
+        order = sorted(fused, key=lambda hid: -fused[hid])[:k]
+        return [by_id[hid] for hid in order]
+
+    def _rule_reason(m: Dict[str, Any]) -> str:
+        """NG12 1.1.1: aged 40 and over with haemoptysis meets suspected cancer pathway referral criteria (lung cancer)."""
+        r, c = m["rule"], m["criterion"]
+        who = []
+        if c.get("age_min") is not None:
+            who.append(f"aged {c['age_min']} and over")
+        if c.get("age_max") is not None:
+            who.append(f"aged {c['age_max']} or under")
+        terms = " and ".join(m.get("terms") or []) or "the listed symptoms"
+        pathway = {
+            "suspected_cancer_pathway": "suspected cancer pathway referral",
+            "48_hours": "very urgent (48 hours) referral",
+            "2_weeks": "urgent (2 weeks) referral",
+        }.get(r.get("timeframe", ""), "referral")
+        head = (" ".join(who) + " with " if who else "") + terms
+        head = head[:1].upper() + head[1:]
+        cancer = f" ({r['cancer']})" if r.get("cancer") else ""
+        return f"NG12 {r['rec_id']}: {head} meets {pathway} criteria{cancer}."
+
     # ------------------------
     # Graph nodes
     # ------------------------
@@ -251,67 +294,199 @@ def build_assessor_graph(patient_repo, retriever, llm, policy):
         state["patient"] = p
         return state
 
-    def infer_site_with_agent(state: AssessorState):
+    def match_rule_table(state: AssessorState):
+        """
+        Symptom -> recommendation lookup in the ingest rule table.
+        A met "refer" recommendation is answered here: its source chunk becomes the
+        evidence and its rule the extraction, so retrieval and the LLM are skipped.
+        Only criteria whose whole source text the table models (criterion["bypass"])
+        qualify; other matches only hint the site for speculative retrieval.
+        """
+        state["rule_matches"] = rules.lookup(state["patient"]) if rules is not None else []
+        refer = [
+            m
+            for m in state["rule_matches"]
+            if m["rule"].get("action") == "refer" and m["rule"].get("chunk_id") and m["criterion"].get("bypass")
+        ]
+        if not refer:
+            return state
+
+        # one evidence hit per source chunk (several recommendations can share a chunk)
+        hits_by_id: Dict[str, Dict[str, Any]] = {}
+        matched_rules: List[Dict[str, Any]] = []
+        for m in refer:
+            r = m["rule"]
+            h = hits_by_id.setdefault(
+                r["chunk_id"],
+                {
+                    "id": r["chunk_id"],
+                    "document": "",
+                    # no similarity score: the chunk comes from the table, not from a search
+                    "metadata": {"page": r.get("page", 0), "site": r.get("site", "")},
+                },
+            )
+            h["document"] = (h["document"] + "\n" + r.get("text", "")).strip()
+            matched_rules.append(
+                {
+                    "rule_id": f"ng12_{r['rec_id']}",
+                    "reason": _rule_reason(m),
+                    "citations": [{"chunk_id": r["chunk_id"], "page": r.get("page", 0)}],
+                }
+            )
+        hits = list(hits_by_id.values())
+
+        site = refer[0]["rule"].get("site", "general")
+        state["suspected_site"] = site if site in SITE_BUCKETS else "general"
+        state["evidence_hits"] = hits
+        state["extracted"] = {"insufficient_evidence": False, "matched_rules": matched_rules}
+        state["retrieval_debug"] = {
+            "path": "rule_table",
+            "count": len(hits),
+            "rules": [m["rule"]["rec_id"] for m in state["rule_matches"]],
+            "matched_terms": sorted({t for m in refer for t in m["terms"]}),
+            "rules_index_version": rules.index_version,
+        }
+        return state
+
+    def route_after_rules(state: AssessorState):
+        if state.get("extracted"):
+            return "decide"
+        if speculative_margin is not None:
+            return ["plan_query_with_agent", "speculative_retrieve"]
+        return "plan_query_with_agent"
+
+    def _speculative_request(state: AssessorState) -> Tuple[str, str]:
+        site = _speculative_site(state)
+        return _sanitize_query(_deterministic_query(state["patient"], site)), site
+
+    def speculative_retrieve(state: AssessorState):
+        """Runs alongside plan_query_with_agent; partial update (parallel branches must not both write state keys)."""
+        query, site = _speculative_request(state)
+        hits, debug = retriever.retrieve(query, top_k=int(state.get("top_k", 5)), site=site)
+        return {"speculative": {"query": query, "site": site, "hits": hits or [], "debug": debug or {}}}
+
+    async def aspeculative_retrieve(state: AssessorState):
+        query, site = _speculative_request(state)
+        hits, debug = await call_async(retriever, "retrieve", query, top_k=int(state.get("top_k", 5)), site=site)
+        return {"speculative": {"query": query, "site": site, "hits": hits or [], "debug": debug or {}}}
+
+    def _plan_prompt(state: AssessorState) -> str:
         p = state["patient"]
-        user = (
-            "Given the patient symptoms, choose the NICE NG12 site bucket.\n"
-            "Return ONLY one token from:\n"
-            "lung, upper_gi, colorectal, breast, urology, head_neck, general\n\n"
-            f"Symptoms: {p.symptoms}\n"
-            f"Age: {p.age}\n"
-            f"Smoking: {p.smoking_history}\n"
+        return ASSESSOR_PLAN_USER_TEMPLATE.format(
+            sites=", ".join(SITE_BUCKETS),
+            age=p.age,
+            symptoms=p.symptoms,
+            duration=p.symptom_duration_days,
+            smoking=p.smoking_history,
         )
-        site = (llm.generate_text("Return only the site token.", user) or "").strip().lower()
-        allowed = {"lung", "upper_gi", "colorectal", "breast", "urology", "head_neck", "general"}
-        if site not in allowed:
-            site = "general"
-        state["suspected_site"] = site
-        return state
 
-    def build_query_with_agent(state: AssessorState):
+    def plan_query_with_agent(state: AssessorState):
+        """
+        One structured LLM call for both the site bucket and the search query
+        ({"site", "query"}). An unknown site becomes "general"; an empty query
+        falls back to the deterministic template.
+        """
+        plan = llm.generate_json(ASSESSOR_PLAN_SYSTEM, _plan_prompt(state), schema_name="assessor_plan")
+        return _apply_plan(state, plan)
+
+    async def aplan_query_with_agent(state: AssessorState):
+        plan = await call_async(llm, "generate_json", ASSESSOR_PLAN_SYSTEM, _plan_prompt(state), schema_name="assessor_plan")
+        return _apply_plan(state, plan)
+
+    def _apply_plan(state: AssessorState, plan: Any) -> Dict[str, Any]:
         p = state["patient"]
-        site = state.get("suspected_site", "general")
+        if not isinstance(plan, dict):
+            plan = {}
 
-        user = (
-            "Write ONE natural-language vector search query to retrieve NICE NG12 recommendation criteria.\n"
-            "Rules:\n"
-            "- NO quotes, NO AND/OR, NO parentheses, NO boolean operators\n"
-            "- Include symptom phrases exactly as written\n"
-            "- Include: suspected cancer pathway referral, refer, consider, aged\n"
-            "- If site bucket is not general, include that site word\n"
-            "Return ONLY the query string.\n\n"
-            f"Site bucket: {site}\n"
-            f"Age: {p.age}\n"
-            f"Symptoms: {p.symptoms}\n"
-            f"Duration days: {p.symptom_duration_days}\n"
-            f"Smoking: {p.smoking_history}\n"
-        )
+        site = str(plan.get("site") or "").strip().lower()
+        if site not in SITE_BUCKETS:
+            site = "general"
 
-        q = (llm.generate_text("Return only the query string.", user) or "").strip()
+        q = plan.get("query")
+        q = q.strip() if isinstance(q, str) else ""
         if not q:
-            symptoms = ", ".join(p.symptoms or [])
-            q = (
-                "NICE NG12 suspected cancer pathway referral criteria. "
-                f"Symptoms {symptoms}. Age {p.age}. Site {site}. "
-                "Refer consider offer aged and over recommendation."
-            )
+            q = _deterministic_query(p, site)
 
-        q = q.replace('"', " ").replace("(", " ").replace(")", " ")
-        q = q.replace(" AND ", " ").replace(" OR ", " ")
-        q = " ".join(q.split()).strip()
+        q = _sanitize_query(q)
 
-        state["query"] = q
-        return state
+        # partial update: may run in parallel with speculative_retrieve
+        return {"suspected_site": site, "query": q}
+
+    def _use_speculative(state: AssessorState) -> bool:
+        """Speculative hits win outright (strong, or same query/site as the plan): state updated, no retrieval."""
+        spec = state.get("speculative")
+        if not spec:
+            return False
+        spec_debug = spec["debug"] or {}
+        strong = float(spec_debug.get("top_score", 0.0)) >= min_top_score + float(speculative_margin or 0.0)
+        same = spec["query"] == state.get("query", "") and spec["site"] == state.get("suspected_site")
+        if (strong or same) and spec["hits"]:
+            state["evidence_hits"] = spec["hits"]
+            state["retrieval_debug"] = {**spec_debug, "speculative": _speculative_debug(spec, "used")}
+            return True
+        return False
+
+    def _speculative_debug(spec: Dict[str, Any], hits: str) -> Dict[str, Any]:
+        """
+        retrieval_debug.speculative: what became of the deterministic-query retrieval.
+        hits: used (its hits alone) | fused (RRF with the planned query's hits) | empty (no hits).
+        Which path answered the assessment is retrieval_debug.path (_set_path).
+        """
+        return {
+            "query": spec["query"],
+            "site": spec["site"],
+            "top_score": float((spec["debug"] or {}).get("top_score", 0.0)),
+            "hits": hits,
+        }
 
     def retrieve_ng12(state: AssessorState):
-        hits, debug = retriever.retrieve(state["query"], top_k=int(state.get("top_k", 5)))
-        state["evidence_hits"] = hits or []
-        state["retrieval_debug"] = debug or {
+        if _use_speculative(state):
+            return state
+        hits, debug = retriever.retrieve(
+            state["query"],
+            top_k=int(state.get("top_k", 5)),
+            site=state.get("suspected_site"),
+        )
+        return _apply_retrieval(state, hits, debug)
+
+    async def aretrieve_ng12(state: AssessorState):
+        if _use_speculative(state):
+            return state
+        hits, debug = await call_async(
+            retriever,
+            "retrieve",
+            state["query"],
+            top_k=int(state.get("top_k", 5)),
+            site=state.get("suspected_site"),
+        )
+        return _apply_retrieval(state, hits, debug)
+
+    def _apply_retrieval(state: AssessorState, hits, debug) -> AssessorState:
+        top_k = int(state.get("top_k", 5))
+        spec = state.get("speculative")
+        hits = hits or []
+        debug = debug or {
             "count": 0,
             "top_score": 0.0,
             "k_score": 0.0,
             "query": state.get("query", ""),
         }
+
+        if spec and spec["hits"]:
+            hits = _fuse_rankings(hits, spec["hits"], top_k, int(getattr(retriever, "rrf_k", 60)))
+            scores = [float(h.get("score", 0.0)) for h in hits]
+            debug = {
+                **debug,
+                "count": len(hits),
+                "top_score": max(scores) if scores else 0.0,
+                "k_score": min(scores) if scores else 0.0,
+                "speculative": _speculative_debug(spec, "fused"),
+            }
+        elif spec:
+            debug = {**debug, "speculative": _speculative_debug(spec, "empty")}
+
+        state["evidence_hits"] = hits
+        state["retrieval_debug"] = debug
         return state
 
     def rerank_and_filter_hits(state: AssessorState):
@@ -319,32 +494,58 @@ def build_assessor_graph(patient_repo, retriever, llm, policy):
         site = state.get("suspected_site", "general")
         hits = state.get("evidence_hits", []) or []
 
-        filtered = [h for h in hits if not _is_boilerplate(_hit_text(h))]
-        pool = filtered if filtered else hits
+        # boilerplate dropped (unless nothing else), then one feature-matrix x weights product
+        state["evidence_hits"] = reranker.rerank(hits, p, site)
+        return state
 
-        scored = [(float(_hit_score(h, p, site)), h) for h in pool]
-        scored.sort(key=lambda x: x[0], reverse=True)
+    def _evidence_ok(state: AssessorState) -> bool:
+        debug = state.get("retrieval_debug", {}) or {}
+        count = int(debug.get("count", 0))
+        top_score = float(debug.get("top_score", 0.0))
+        return (count > 0) and (top_score >= min_top_score) and bool(state.get("evidence_hits"))
 
-        state["evidence_hits"] = [h for _, h in scored]
+    def match_deterministic_rules(state: AssessorState):
+        """
+        Fast path: the _fallback_extract rules (visible haematuria 45+, dysphagia,
+        haemoptysis 40+) with strong evidence answer without the LLM extraction call.
+        """
+        if _evidence_ok(state):
+            extracted = _fallback_extract(state["patient"], state.get("evidence_hits", []) or [], strict=True)
+            if extracted.get("matched_rules"):
+                state["extracted"] = extracted
+                _set_path(state, "deterministic")
         return state
 
+    def route_after_rerank(state: AssessorState) -> str:
+        return "decide" if state.get("extracted") else "extract_criteria"
+
     def extract_criteria(state: AssessorState):
         """
         Try LLM extraction first.
         If it returns empty/invalid output, fall back to deterministic extraction
         so E2E paths (PT-110/PT-104/PT-101) pass reliably.
         """
+        user = _extract_prompt(state)
+        if user is None:
+            return state
+        return _apply_extraction(state, llm.generate_json(ASSESSOR_SYSTEM, user, schema_name="assessor_extract"))
+
+    async def aextract_criteria(state: AssessorState):
+        user = _extract_prompt(state)
+        if user is None:
+            return state
+        extracted = await call_async(llm, "generate_json", ASSESSOR_SYSTEM, user, schema_name="assessor_extract")
+        return _apply_extraction(state, extracted)
+
+    def _extract_prompt(state: AssessorState) -> Optional[str]:
+        """The extraction prompt, or None (state marked insufficient) when the evidence gate fails."""
         p = state["patient"]
         hits = state.get("evidence_hits", []) or []
-        debug = state.get("retrieval_debug", {}) or {}
-
-        count = int(debug.get("count", 0))
-        top_score = float(debug.get("top_score", 0.0))
-        evidence_ok = (count > 0) and (top_score >= 0.55)
 
-        if (not evidence_ok) or (not hits):
+        if not _evidence_ok(state):
             state["extracted"] = {"insufficient_evidence": True, "matched_rules": []}
-            return state
+            _set_path(state, "insufficient_evidence")
+            return None
 
         # Build evidence for LLM
         top_hits = hits[:3]
@@ -357,7 +558,7 @@ def build_assessor_graph(patient_repo, retriever, llm, policy):
 
         evidence = "\n\n".join(fmt_hit(h) for h in top_hits)
 
-        user = ASSESSOR_USER_TEMPLATE.format(
+        return ASSESSOR_USER_TEMPLATE.format(
             age=p.age,
             smoking=p.smoking_history,
             symptoms=p.symptoms,
@@ -365,16 +566,34 @@ def build_assessor_graph(patient_repo, retriever, llm, policy):
             evidence=evidence,
         )
 
-        extracted = llm.generate_json(ASSESSOR_SYSTEM, user, schema_name="assessor_extract") or {}
+    def _apply_extraction(state: AssessorState, extracted: Any) -> AssessorState:
+        p = state["patient"]
+        hits = state.get("evidence_hits", []) or []
+        extracted = extracted or {}
 
         # If LLM returned nothing useful, fall back
         matched = extracted.get("matched_rules") if isinstance(extracted, dict) else None
         if (not isinstance(extracted, dict)) or (not isinstance(matched, list)) or (len(matched) == 0):
             extracted = _fallback_extract(p, hits)
+            _set_path(state, "llm_fallback")
+        else:
+            _set_path(state, "llm")
 
         state["extracted"] = extracted
         return state
 
+    def _set_path(state: AssessorState, path: str) -> None:
+        """
+        retrieval_debug.path, the one record of which path answered:
+          rule_table            ingest rule table, no retrieval (match_rule_table)
+          deterministic         _fallback_extract rule on strong evidence, no LLM extraction
+          llm                   LLM extraction
+          llm_fallback          LLM extraction returned nothing usable, _fallback_extract used
+          insufficient_evidence evidence gate failed, no LLM call
+        How the evidence was retrieved is under retrieval_debug.speculative (_speculative_debug).
+        """
+        state["retrieval_debug"] = {**(state.get("retrieval_debug", {}) or {}), "path": path}
+
     def decide(state: AssessorState):
         state["decision"] = policy.decide(state["patient"], state.get("extracted", {}) or {})
         return state
@@ -404,8 +623,15 @@ def build_assessor_graph(patient_repo, retriever, llm, policy):
                         continue
 
                     page = int(c.get("page") or _get_page(hit) or 0)
-                    excerpt = _best_excerpt(_hit_text(hit), state["patient"], window=240)
-                    citations.append(Citation(page=page, chunk_id=chunk_id, excerpt=excerpt))
+                    excerpt = _best_excerpt(hit, state["patient"], window=240)
+                    citations.append(
+                        Citation(
+                            page=page,
+                            chunk_id=chunk_id,
+                            excerpt=excerpt,
+                            alias_pages=alias_pages(hit.get("metadata")),
+                        )
+                    )
                 except Exception:
                     continue
 
@@ -437,20 +663,40 @@ def build_assessor_graph(patient_repo, retriever, llm, policy):
     # ------------------------
     g = StateGraph(AssessorState)
     g.add_node("fetch_patient", fetch_patient)
-    g.add_node("infer_site_with_agent", infer_site_with_agent)
-    g.add_node("build_query_with_agent", build_query_with_agent)
-    g.add_node("retrieve_ng12", retrieve_ng12)
+    g.add_node("match_rule_table", match_rule_table)
+    g.add_node("plan_query_with_agent", _io_node(plan_query_with_agent, aplan_query_with_agent))
+    if speculative_margin is not None:
+        g.add_node("speculative_retrieve", _io_node(speculative_retrieve, aspeculative_retrieve))
+    g.add_node("retrieve_ng12", _io_node(retrieve_ng12, aretrieve_ng12))
     g.add_node("rerank_and_filter_hits", rerank_and_filter_hits)
-    g.add_node("extract_criteria", extract_criteria)
+    if deterministic_fast_path:
+        g.add_node("match_deterministic_rules", match_deterministic_rules)
+    g.add_node("extract_criteria", _io_node(extract_criteria, aextract_criteria))
     g.add_node("decide", decide)
     g.add_node("validate_and_format", validate_and_format)
 
     g.set_entry_point("fetch_patient")
-    g.add_edge("fetch_patient", "infer_site_with_agent")
-    g.add_edge("infer_site_with_agent", "build_query_with_agent")
-    g.add_edge("build_query_with_agent", "retrieve_ng12")
+    g.add_edge("fetch_patient", "match_rule_table")
+    g.add_conditional_edges(
+        "match_rule_table",
+        route_after_rules,
+        ["decide", "plan_query_with_agent"] + (["speculative_retrieve"] if speculative_margin is not None else []),
+    )
+    if speculative_margin is not None:
+        # join: retrieve_ng12 waits for both branches
+        g.add_edge(["plan_query_with_agent", "speculative_retrieve"], "retrieve_ng12")
+    else:
+        g.add_edge("plan_query_with_agent", "retrieve_ng12")
     g.add_edge("retrieve_ng12", "rerank_and_filter_hits")
-    g.add_edge("rerank_and_filter_hits", "extract_criteria")
+    if deterministic_fast_path:
+        g.add_edge("rerank_and_filter_hits", "match_deterministic_rules")
+        g.add_conditional_edges(
+            "match_deterministic_rules",
+            route_after_rerank,
+            {"decide": "decide", "extract_criteria": "extract_criteria"},
+        )
+    else:
+        g.add_edge("rerank_and_filter_hits", "extract_criteria")
     g.add_edge("extract_criteria", "decide")
     g.add_edge("decide", "validate_and_format")
     g.add_edge("validate_and_format", END)
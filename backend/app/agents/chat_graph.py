@@ -6,8 +6,11 @@ from typing import TypedDict, List, Dict, Any, Optional
 
 from langgraph.graph import StateGraph, END
 
+from app.agents.assessor_graph import _io_node
 from app.domain.models import Citation
 from app.validation.citation_verifier import CitationVerifier
+from app.retrieval.dedupe import alias_pages
+from app.utils.concurrency import call_async
 
 
 CHAT_SYSTEM = """You are an NG12 clinical guidance assistant.
@@ -113,6 +116,13 @@ def build_chat_graph(memory_store, retriever, llm):
 
     def retrieve(state: ChatState):
         hits, debug = retriever.retrieve(state["query"], top_k=int(state.get("top_k", 5)))
+        return _apply_retrieval(state, hits, debug)
+
+    async def aretrieve(state: ChatState):
+        hits, debug = await call_async(retriever, "retrieve", state["query"], top_k=int(state.get("top_k", 5)))
+        return _apply_retrieval(state, hits, debug)
+
+    def _apply_retrieval(state: ChatState, hits, debug) -> ChatState:
         state["evidence_hits"] = hits or []
         state["retrieval_debug"] = debug or {
             "count": 0,
@@ -123,6 +133,16 @@ def build_chat_graph(memory_store, retriever, llm):
         return state
 
     def ask_llm(state: ChatState):
+        out = llm.generate_json(CHAT_SYSTEM, _answer_prompt(state), schema_name="chat_answer") or {}
+        state["model_json"] = out
+        return state
+
+    async def aask_llm(state: ChatState):
+        out = await call_async(llm, "generate_json", CHAT_SYSTEM, _answer_prompt(state), schema_name="chat_answer") or {}
+        state["model_json"] = out
+        return state
+
+    def _answer_prompt(state: ChatState) -> str:
         hist = state.get("history") or []
         tail = hist[-6:] if len(hist) > 6 else hist
 
@@ -149,16 +169,12 @@ def build_chat_graph(memory_store, retriever, llm):
 
         evidence_text = "\n\n".join(fmt_hit(h) for h in top_hits) or "(no evidence retrieved)"
 
-        user_prompt = CHAT_USER_TEMPLATE.format(
+        return CHAT_USER_TEMPLATE.format(
             history=history_text,
             message=state.get("message", ""),
             evidence=evidence_text,
         )
 
-        out = llm.generate_json(CHAT_SYSTEM, user_prompt, schema_name="chat_answer") or {}
-        state["model_json"] = out
-        return state
-
     def validate_and_save(state: ChatState):
         hits = state.get("evidence_hits") or []
         hits_by_id: Dict[str, Dict[str, Any]] = {}
@@ -187,7 +203,7 @@ def build_chat_graph(memory_store, retriever, llm):
                 meta = hit.get("metadata") or {}
                 page = int(c.get("page") or meta.get("page") or 0)
                 excerpt = _clip(_hit_text(hit), 220)
-                citations.append(Citation(page=page, chunk_id=cid, excerpt=excerpt))
+                citations.append(Citation(page=page, chunk_id=cid, excerpt=excerpt, alias_pages=alias_pages(meta)))
                 cited_ids.append(cid)
             except Exception:
                 continue
@@ -205,7 +221,7 @@ def build_chat_graph(memory_store, retriever, llm):
                     meta = hit.get("metadata") or {}
                     page = int(prior.get("page") or meta.get("page") or 0)
                     excerpt = _clip(_hit_text(hit), 220)
-                    citations.append(Citation(page=page, chunk_id=cid, excerpt=excerpt))
+                    citations.append(Citation(page=page, chunk_id=cid, excerpt=excerpt, alias_pages=alias_pages(meta)))
                 else:
                     # reuse prior excerpt if we can't locate it in current hits
                     try:
@@ -214,6 +230,7 @@ def build_chat_graph(memory_store, retriever, llm):
                                 page=int(prior.get("page") or 0),
                                 chunk_id=cid,
                                 excerpt=_clip(prior.get("excerpt") or "", 220),
+                                alias_pages=list(prior.get("alias_pages") or []),
                             )
                         )
                     except Exception:
@@ -251,8 +268,9 @@ def build_chat_graph(memory_store, retriever, llm):
     g = StateGraph(ChatState)
     g.add_node("load_history", load_history)
     g.add_node("build_query", build_query)
-    g.add_node("retrieve", retrieve)
-    g.add_node("ask_llm", ask_llm)
+    # invoke() runs the sync node, ainvoke() awaits the async one
+    g.add_node("retrieve", _io_node(retrieve, aretrieve))
+    g.add_node("ask_llm", _io_node(ask_llm, aask_llm))
     g.add_node("validate_and_save", validate_and_save)
 
     g.set_entry_point("load_history")
@@ -1,5 +1,7 @@
 # app/agents/prompts.py
 
+from app.utils.text import sha256
+
 ASSESSOR_SYSTEM = """
 You are a clinical decision support assistant.
 You MUST follow NICE NG12 cancer referral guidelines strictly.
@@ -30,6 +32,30 @@ Task:
 - Return JSON only.
 """
 
+ASSESSOR_PLAN_SYSTEM = """
+You plan a NICE NG12 guideline search for one patient.
+Return valid JSON only. No markdown. No extra text.
+
+Return JSON in this exact shape:
+{"site": string, "query": string}
+"""
+
+ASSESSOR_PLAN_USER_TEMPLATE = """
+Patient details:
+- Age: {age}
+- Symptoms: {symptoms}
+- Symptom duration (days): {duration}
+- Smoking history: {smoking}
+
+Task:
+- site: the NICE NG12 site bucket, exactly one of: {sites}
+- query: ONE natural-language vector search query to retrieve NG12 recommendation criteria
+  - NO quotes, NO AND/OR, NO parentheses, NO boolean operators
+  - Include symptom phrases exactly as written
+  - Include: suspected cancer pathway referral, refer, consider, aged
+  - If site is not general, include that site word
+"""
+
 # ----------------------------
 # CHAT: Final grounded answer (must handle follow-ups)
 # ----------------------------
@@ -58,3 +84,8 @@ Answer rules:
 - If support_status != "supported", your answer MUST clearly say it is not supported or not found.
 - Do NOT include page/chunk_id text in the answer itself.
 """
+
+# Changes whenever an assessor prompt changes (part of the assessment result cache key)
+PROMPT_TEMPLATE_VERSION = sha256(
+    "\n".join([ASSESSOR_SYSTEM, ASSESSOR_USER_TEMPLATE, ASSESSOR_PLAN_SYSTEM, ASSESSOR_PLAN_USER_TEMPLATE])
+)[:12]
@@ -3,7 +3,8 @@
 import logging
 from fastapi import APIRouter, Depends, HTTPException
 
-from app.domain.models import AssessRequest, AssessResponse
+from app.config.settings import settings
+from app.domain.models import AssessBatchRequest, AssessBatchResponse, AssessRequest, AssessResponse
 from app.config.container import Container
 from app.api.deps import get_container
 
@@ -12,11 +13,25 @@ router = APIRouter(prefix="/assess", tags=["assess"])
 
 
 @router.post("", response_model=AssessResponse)
-def assess(req: AssessRequest, c: Container = Depends(get_container)):
+async def assess(req: AssessRequest, c: Container = Depends(get_container)):
     try:
-        return c.assessor_service.assess(req.patient_id, req.top_k)
+        return await c.assessor_service.aassess(req.patient_id, req.top_k)
     except KeyError:
         raise HTTPException(status_code=404, detail="Patient not found")
     except Exception:
         log.exception("Assess failed for patient_id=%s", req.patient_id)
         raise HTTPException(status_code=500, detail="Assessment failed. Check server logs.")
+
+
+@router.post("/batch", response_model=AssessBatchResponse)
+async def assess_batch(req: AssessBatchRequest, c: Container = Depends(get_container)):
+    if len(req.patient_ids) > settings.ASSESS_BATCH_MAX_PATIENTS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.ASSESS_BATCH_MAX_PATIENTS} patients per batch.",
+        )
+    try:
+        return await c.assessor_service.aassess_batch(req.patient_ids, req.top_k)
+    except Exception:
+        log.exception("Batch assess failed (%d patients)", len(req.patient_ids))
+        raise HTTPException(status_code=500, detail="Batch assessment failed. Check server logs.")
@@ -10,9 +10,9 @@ router = APIRouter(tags=["chat"])
 
 
 @router.post("/chat", response_model=ChatResponse)
-def chat(req: ChatRequest, c: Container = Depends(get_container)):
+async def chat(req: ChatRequest, c: Container = Depends(get_container)):
     try:
-        return c.chat_service.chat(req.session_id, req.message, req.top_k)
+        return await c.chat_service.achat(req.session_id, req.message, req.top_k)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
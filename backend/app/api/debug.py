@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter, Depends
 from pydantic import BaseModel
@@ -14,23 +14,59 @@ router = APIRouter(prefix="/debug", tags=["debug"])
 class DebugQueryRequest(BaseModel):
     query: str
     top_k: int = 5
+    site: Optional[str] = None
 
 
-@router.post("/retrieve")
-def debug_retrieve(req: DebugQueryRequest, c: Container = Depends(get_container)):
-    hits, debug = c.retriever.retrieve(req.query, req.top_k)
+class DebugBatchQueryRequest(BaseModel):
+    queries: List[str]
+    top_k: int = 5
+    site: Optional[str] = None
+
 
+def _trim_hits(hits: List[Dict[str, Any]], top_k: int) -> List[Dict[str, Any]]:
     trimmed: List[Dict[str, Any]] = []
-    for h in hits[: req.top_k]:
+    for h in hits[:top_k]:
         meta = h.get("metadata") or {}
         trimmed.append(
             {
                 "id": h.get("id"),
                 "page": meta.get("page") or h.get("page"),
+                "site": meta.get("site"),
                 "score": h.get("score"),
                 "distance": h.get("distance"),
+                "rrf_score": h.get("rrf_score"),
+                "bm25_score": h.get("bm25_score"),
                 "snippet": (h.get("document") or h.get("text") or h.get("snippet") or "")[:250],
             }
         )
+    return trimmed
+
+
+@router.post("/retrieve")
+async def debug_retrieve(req: DebugQueryRequest, c: Container = Depends(get_container)):
+    hits, debug = await c.retriever.aretrieve(req.query, req.top_k, site=req.site)
+    return {"debug": debug, "hits": _trim_hits(hits, req.top_k)}
+
+
+@router.post("/retrieve/batch")
+async def debug_retrieve_batch(req: DebugBatchQueryRequest, c: Container = Depends(get_container)):
+    results = await c.retriever.aretrieve_many(req.queries, req.top_k, site=req.site)
+    return {
+        "results": [
+            {"query": q, "debug": debug, "hits": _trim_hits(hits, req.top_k)}
+            for q, (hits, debug) in zip(req.queries, results)
+        ]
+    }
+
 
-    return {"debug": debug, "hits": trimmed}
+@router.get("/cache")
+def debug_cache(c: Container = Depends(get_container)):
+    embedder = getattr(c.retriever, "_embedder", None)
+    emb_stats = getattr(embedder, "stats", None)
+    return {
+        "index_version": c.retriever.index_version(),
+        "retrieval": c.retriever.cache_stats(),
+        "embeddings": emb_stats() if callable(emb_stats) else {},
+        "llm": c.llm.cache_stats(),
+        "assessments": c.assessor_service.cache_stats(),
+    }
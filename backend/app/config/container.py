@@ -10,8 +10,15 @@ from app.repositories.patient_repo import PatientRepository
 from app.repositories.chat_memory_repo import InMemoryChatRepository
 
 # Vector store + retriever
+from app.domain.interfaces import VectorIndex
 from app.stores.chroma_store import ChromaVectorStore
+from app.stores.numpy_store import NumpyVectorStore
+from app.stores.snapshot_store import SnapshotVectorStore
+from app.stores.memory_cache import TTLMemoryCache
+from app.stores.disk_cache import SqliteDiskCache
 from app.retrieval.ng12_retriever import NG12Retriever
+from app.retrieval.reranker import HitReranker, load_rerank_weights
+from app.retrieval.recommendations import RecommendationIndex
 
 # Providers / policy
 from app.providers.llm_provider import LLMProvider
@@ -33,9 +40,14 @@ class Container:
     Creates and owns all singletons.
     """
 
-    store: ChromaVectorStore | None = None
+    store: VectorIndex | None = None
+    retrieval_cache: TTLMemoryCache | None = None
     retriever: NG12Retriever | None = None
+    reranker: HitReranker | None = None
+    rules: RecommendationIndex | None = None
     llm: LLMProvider | None = None
+    llm_cache: TTLMemoryCache | None = None
+    assess_cache: TTLMemoryCache | None = None
 
     patients: PatientRepository | None = None
     memory: InMemoryChatRepository | None = None
@@ -50,20 +62,62 @@ class Container:
 
     def __post_init__(self) -> None:
         # 1) Vector store (uses settings internally)
-        self.store = ChromaVectorStore()
+        kind = (settings.VECTOR_STORE or "chroma").lower().strip()
+        if kind == "numpy":
+            self.store = NumpyVectorStore()
+        elif kind == "snapshot":
+            self.store = SnapshotVectorStore()
+        elif kind == "chroma":
+            self.store = ChromaVectorStore()
+        else:
+            raise ValueError(f"Unknown VECTOR_STORE={settings.VECTOR_STORE!r} (expected chroma | numpy | snapshot)")
 
         # 2) Retriever ✅ CORRECT ARGUMENTS
+        self.retrieval_cache = TTLMemoryCache(
+            maxsize=settings.RETRIEVAL_CACHE_MAX_ITEMS,
+            default_ttl_s=settings.RETRIEVAL_CACHE_TTL_S,
+            name="retrieval",
+        )
         self.retriever = NG12Retriever(
             store=self.store,
-            embedding_provider=settings.EMBEDDING_MODEL,
+            embedding_provider=settings.EMBEDDING_PROVIDER,
             top_k_default=settings.DEFAULT_TOP_K,
+            cache=self.retrieval_cache,
+            cache_ttl_s=settings.RETRIEVAL_CACHE_TTL_S,
+            bm25_path=str(settings.BM25_INDEX_PATH) if settings.HYBRID_RETRIEVAL else None,
+            rrf_k=settings.RRF_K,
+            hybrid_candidates=settings.HYBRID_CANDIDATES,
+            site_filter=settings.SITE_FILTER_ENABLED,
+            site_min_score=settings.MIN_TOP_SCORE,
+            features_path=str(settings.CHUNK_FEATURES_PATH),
+            mmr=settings.MMR_ENABLED,
+            mmr_lambda=settings.MMR_LAMBDA,
         )
 
-        # 3) LLM provider
+        self.reranker = HitReranker(load_rerank_weights(settings.RERANK_WEIGHTS_PATH))
+        if settings.RULE_TABLE_ENABLED:
+            self.rules = RecommendationIndex(settings.RULE_TABLE_PATH)
+
+        # 3) LLM provider (+ response cache for repeat prompts)
+        if settings.LLM_CACHE_ENABLED:
+            self.llm_cache = TTLMemoryCache(
+                maxsize=settings.LLM_CACHE_MAX_ITEMS,
+                default_ttl_s=settings.LLM_CACHE_TTL_S,
+                name="llm",
+            )
+        llm_disk_cache = (
+            SqliteDiskCache(settings.LLM_CACHE_PATH, table="llm_responses")
+            if (settings.LLM_CACHE_ENABLED and settings.LLM_CACHE_PATH)
+            else None
+        )
         self.llm = LLMProvider(
             model=settings.LLM_MODEL,
             project=settings.GCP_PROJECT,
             location=settings.GCP_LOCATION,
+            cache=self.llm_cache,
+            disk_cache=llm_disk_cache,
+            cache_ttl_s=settings.LLM_CACHE_TTL_S,
+            max_concurrency=settings.LLM_MAX_CONCURRENCY,
         )
 
         # 4) Repositories
@@ -83,6 +137,11 @@ class Container:
             retriever=self.retriever,
             llm=self.llm,
             policy=self.policy,
+            reranker=self.reranker,
+            rules=self.rules,
+            min_top_score=float(settings.MIN_TOP_SCORE),
+            speculative_margin=float(settings.SPECULATIVE_SCORE_MARGIN) if settings.SPECULATIVE_RETRIEVAL else None,
+            deterministic_fast_path=bool(settings.DETERMINISTIC_FAST_PATH),
         )
 
         self.chat_graph = build_chat_graph(
@@ -91,6 +150,26 @@ class Container:
             llm=self.llm,
         )
 
-        # 7) Services
-        self.assessor_service = AssessorService(self.assessor_graph)
-        self.chat_service = ChatService(self.chat_graph, self.memory)
+        # 7) Services (+ assessment result cache)
+        if settings.ASSESS_CACHE_ENABLED:
+            self.assess_cache = TTLMemoryCache(
+                maxsize=settings.ASSESS_CACHE_MAX_ITEMS,
+                default_ttl_s=settings.ASSESS_CACHE_TTL_S,
+                name="assess",
+            )
+        self.assessor_service = AssessorService(
+            self.assessor_graph,
+            patient_repo=self.patients,
+            rules=self.rules,
+            batch_workers=settings.ASSESS_BATCH_WORKERS,
+            cache=self.assess_cache,
+            cache_ttl_s=settings.ASSESS_CACHE_TTL_S,
+            index_version=self.retriever.index_version,
+            model=self.llm.model,
+            max_concurrency=settings.GRAPH_MAX_CONCURRENCY,
+        )
+        self.chat_service = ChatService(
+            self.chat_graph,
+            self.memory,
+            max_concurrency=settings.GRAPH_MAX_CONCURRENCY,
+        )
@@ -16,9 +16,18 @@ class Settings(BaseSettings):
     LLM_TEMPERATURE: float = Field(default=0.0)
     LLM_API_KEY: str | None = Field(default=None)
 
-    EMBEDDING_PROVIDER: str = Field(default="vertex")  # must match NG12Retriever implementation
+    EMBEDDING_PROVIDER: str = Field(default="vertex")  # vertex | local (see app/providers/embedding_registry.py)
     EMBEDDING_MODEL: str = Field(default="gemini-embedding-001")
 
+    # Offline provider (EMBEDDING_PROVIDER=local): hashed n-gram TF-IDF, no network
+    LOCAL_EMBEDDING_DIM: int = Field(default=768, ge=64)
+    LOCAL_EMBEDDING_IDF_PATH: Path = Field(default=BASE_DIR / "vector_store" / "local_idf.npy")
+
+    # Embedding cache (in-memory LRU + on-disk store, keyed on sha256(model + text))
+    EMBEDDING_CACHE_ENABLED: bool = Field(default=True)
+    EMBEDDING_CACHE_MAX_ITEMS: int = Field(default=4096, ge=1)
+    EMBEDDING_CACHE_PATH: Path | None = Field(default=BASE_DIR / "vector_store" / "embedding_cache.sqlite3")
+
     # Vertex / GCP
     VERTEX_PROJECT: str | None = Field(default=None)
     VERTEX_LOCATION: str = Field(default="us-central1")
@@ -40,6 +49,14 @@ class Settings(BaseSettings):
     CHROMA_DIR: Path = Field(default=BASE_DIR / "vector_store" / "chroma")
     CHROMA_COLLECTION: str = Field(default="ng12")
 
+    VECTOR_STORE: str = Field(default="chroma")  # chroma | numpy | snapshot
+    NUMPY_INDEX_DIR: Path = Field(default=BASE_DIR / "vector_store" / "numpy")
+    NUMPY_INDEX_MMAP: bool = Field(default=True)
+    NUMPY_INDEX_QUANTIZATION: str = Field(default="none")  # none | int8 | float16
+    NUMPY_INDEX_RESCORE_FACTOR: int = Field(default=4, ge=1, le=50)  # exact re-score pool = top_k * this
+    # VECTOR_STORE=snapshot: single memory-mapped file (embeddings, texts, metadata, features), written at ingest
+    SNAPSHOT_PATH: Path = Field(default=BASE_DIR / "vector_store" / "ng12.snapshot")
+
     # -------------------------
     # Retrieval & gating
     # -------------------------
@@ -48,6 +65,69 @@ class Settings(BaseSettings):
     MIN_TOP_SCORE: float = Field(default=0.55, ge=0.0, le=1.0)
     MIN_SCORE_GAP: float = Field(default=0.02, ge=0.0, le=1.0)
 
+    # Hybrid retrieval: BM25 (built at ingest) fused with vector search via reciprocal-rank fusion
+    HYBRID_RETRIEVAL: bool = Field(default=True)
+    BM25_INDEX_PATH: Path = Field(default=BASE_DIR / "vector_store" / "bm25.json")
+    RRF_K: int = Field(default=60, ge=1)
+    HYBRID_CANDIDATES: int = Field(default=3, ge=1, le=10)  # per-retriever pool = top_k * this
+
+    # Ingest: collapse near-duplicate chunks (MinHash-LSH, word 3-shingle Jaccard >= threshold over the text
+    # without page furniture, and the duplicate's words a contiguous run of the canonical's) into one
+    # canonical chunk that keeps the duplicates' pages as alias_pages
+    DEDUPE_ENABLED: bool = Field(default=True)
+    DEDUPE_THRESHOLD: float = Field(default=0.75, gt=0.0, le=1.0)
+
+    # Ingest pipeline: page extraction processes (0 = min(4, cpu count), 1 = in-process), embedding batches
+    # in flight at once, retries per batch (exponential backoff + jitter), rows per vector store upsert
+    INGEST_WORKERS: int = Field(default=0, ge=0, le=32)
+    INGEST_EMBED_BATCH: int = Field(default=32, ge=1, le=250)
+    INGEST_EMBED_CONCURRENCY: int = Field(default=4, ge=1, le=32)
+    INGEST_EMBED_RETRIES: int = Field(default=5, ge=1, le=20)
+    INGEST_UPSERT_BATCH: int = Field(default=256, ge=1)
+
+    # MMR diversity: pick top_k from top_k * HYBRID_CANDIDATES candidates, penalizing near-duplicate /
+    # same-page adjacent chunks (1.0 = pure relevance)
+    MMR_ENABLED: bool = Field(default=True)
+    MMR_LAMBDA: float = Field(default=0.7, ge=0.0, le=1.0)
+
+    # Site filter: search only chunks tagged with the suspected site (tags written at ingest);
+    # falls back to the full corpus when the filtered set returns < top_k hits or top score < MIN_TOP_SCORE
+    SITE_FILTER_ENABLED: bool = Field(default=True)
+
+    # Speculative retrieval: the deterministic query (symptoms, age, site) is retrieved in parallel with the
+    # LLM planning call; its hits are used alone when top score >= MIN_TOP_SCORE + margin, else fused with
+    # the LLM-query hits
+    SPECULATIVE_RETRIEVAL: bool = Field(default=True)
+    SPECULATIVE_SCORE_MARGIN: float = Field(default=0.05, ge=0.0, le=1.0)
+
+    # Deterministic fast path: visible haematuria 45+ / dysphagia / haemoptysis 40+ (asserted, not negated) with a
+    # retrieved chunk that names the symptom and itself scores >= MIN_TOP_SCORE skip the LLM extraction call
+    # (retrieval_debug.path = "deterministic"). Off by default: opt in per deployment
+    DETERMINISTIC_FAST_PATH: bool = Field(default=False)
+
+    # Per-chunk reranker features (normalized text, boilerplate/marker/criteria bits, symptom offsets), built at ingest
+    CHUNK_FEATURES_PATH: Path = Field(default=BASE_DIR / "vector_store" / "chunk_features.json")
+    # Optional JSON {feature: weight} overriding the assessor reranker weights (app/retrieval/reranker.py)
+    RERANK_WEIGHTS_PATH: Path | None = Field(default=None)
+
+    # NG12 rule table (numbered recommendations parsed at ingest: site, ages, symptom terms, action, timeframe);
+    # a patient meeting a "refer" recommendation is answered from the table without retrieval or LLM extraction.
+    # Off by default: opt in after scripts/check_rule_table.py passes against the current table
+    RULE_TABLE_ENABLED: bool = Field(default=False)
+    RULE_TABLE_PATH: Path = Field(default=BASE_DIR / "vector_store" / "ng12_rules.json")
+
+    # POST /assess/batch: patients with the same (age band, symptoms, smoking, sex, duration band) profile are assessed once;
+    # distinct profiles run on a pool of this many workers
+    ASSESS_BATCH_WORKERS: int = Field(default=4, ge=1, le=32)
+    ASSESS_BATCH_MAX_PATIENTS: int = Field(default=500, ge=1)
+
+    # -------------------------
+    # Async request path: explicit concurrency limits (per process) instead of the threadpool size
+    # -------------------------
+    LLM_MAX_CONCURRENCY: int = Field(default=16, ge=1, le=256)  # async LLM completions in flight
+    EMBEDDING_MAX_CONCURRENCY: int = Field(default=8, ge=1, le=256)  # async embedding calls in flight
+    GRAPH_MAX_CONCURRENCY: int = Field(default=32, ge=1, le=1024)  # assessor / chat graph runs in flight
+
     # -------------------------
     # Cache TTLs (seconds)
     # -------------------------
@@ -55,6 +135,19 @@ class Settings(BaseSettings):
     RETRIEVAL_CACHE_TTL_S: int = Field(default=300, ge=30)
     LLM_CACHE_TTL_S: int = Field(default=120, ge=30)
 
+    # Cache sizes (entries); oldest entries are evicted first once full
+    RETRIEVAL_CACHE_MAX_ITEMS: int = Field(default=1024, ge=1)
+    LLM_CACHE_MAX_ITEMS: int = Field(default=512, ge=1)
+
+    # Assessment result cache, keyed on (patient clinical fields, top_k, index version, LLM model, prompt version)
+    ASSESS_CACHE_ENABLED: bool = Field(default=True)
+    ASSESS_CACHE_TTL_S: int = Field(default=300, ge=30)
+    ASSESS_CACHE_MAX_ITEMS: int = Field(default=1024, ge=1)
+
+    # LLM response cache (deterministic calls only); set LLM_CACHE_PATH to persist across restarts
+    LLM_CACHE_ENABLED: bool = Field(default=True)
+    LLM_CACHE_PATH: Path | None = Field(default=None)
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
@@ -22,11 +22,19 @@ class LLMProvider(ABC):
     @abstractmethod
     def generate_json(self, system: str, user: str, schema_name: str) -> Dict[str, Any]: ...
 
-class VectorStore(ABC):
+class VectorIndex(ABC):
+    """Read side of a vector store: what retrieval needs (read-only indexes implement only this)."""
     @abstractmethod
-    def upsert(self, ids: List[str], documents: List[str], metadatas: List[Dict[str, Any]], embeddings: List[List[float]]): ...
+    def query(self, query_embedding: List[float], top_k: int, where: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]: ...
+    @abstractmethod
+    def query_many(self, query_embeddings: List[List[float]], top_k: int, where: Optional[Dict[str, Any]] = None) -> List[List[Dict[str, Any]]]: ...
     @abstractmethod
-    def query(self, query_embedding: List[float], top_k: int) -> List[Dict[str, Any]]: ...
+    def get(self, ids: List[str], query_embedding: Optional[List[float]] = None) -> List[Dict[str, Any]]: ...
+
+class VectorStore(VectorIndex):
+    """Writable vector store (ingest target)."""
+    @abstractmethod
+    def upsert(self, ids: List[str], documents: List[str], metadatas: List[Dict[str, Any]], embeddings: List[List[float]]): ...
 
 class PolicyEngine(ABC):
     @abstractmethod
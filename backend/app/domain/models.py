@@ -19,6 +19,7 @@ class Citation(BaseModel):
     page: int
     chunk_id: str
     excerpt: str = ""
+    alias_pages: List[int] = Field(default_factory=list)  # pages of near-duplicate text collapsed at ingest
 
 
 class AssessRequest(BaseModel):
@@ -35,6 +36,22 @@ class AssessResponse(BaseModel):
     retrieval_debug: Dict[str, Any] = Field(default_factory=dict)
 
 
+class AssessBatchRequest(BaseModel):
+    patient_ids: List[str]
+    top_k: int = 5
+
+
+class AssessBatchItem(BaseModel):
+    patient_id: str
+    result: Optional[AssessResponse] = None
+    error: Optional[str] = None
+
+
+class AssessBatchResponse(BaseModel):
+    results: List[AssessBatchItem] = Field(default_factory=list)
+    groups: int = 0  # distinct profiles actually assessed
+
+
 class ChatRequest(BaseModel):
     session_id: str
     message: str
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from array import array
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from cachetools import LRUCache
+
+from app.config.settings import settings
+from app.domain.interfaces import EmbeddingProvider
+from app.stores.disk_cache import SqliteDiskCache
+from app.utils.concurrency import call_async
+from app.utils.text import sha256
+
+
+class CachedEmbeddingProvider(EmbeddingProvider):
+    """
+    Content-addressed embedding cache in front of any embedding provider.
+
+    Lookup order per text:
+      1) bounded in-memory LRU
+      2) on-disk SQLite store (shared by ingest + API workers)
+      3) the wrapped provider, called ONCE with only the misses
+
+    Key: sha256(model_name + text), so switching EMBEDDING_MODEL never
+    returns vectors from another model.
+    Results are always returned in the original input order, as fresh lists
+    (never the objects held by the LRU).
+    aembed_texts does the same lookups and awaits the wrapped provider for the
+    misses (its aembed_texts, or embed_texts in a worker thread); the SQLite
+    reads and writes run in a worker thread too.
+    """
+
+    def __init__(
+        self,
+        inner: EmbeddingProvider,
+        max_items: int = 4096,
+        disk_path: Optional[str | Path] = None,
+    ) -> None:
+        self.inner = inner
+
+        self._lru: LRUCache = LRUCache(maxsize=max(1, int(max_items)))
+        self._disk = SqliteDiskCache(disk_path, table="embeddings") if disk_path else None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @property
+    def model_name(self) -> str:
+        # read through: some providers (local IDF fit) change their model tag at runtime
+        return str(getattr(self.inner, "model_name", type(self.inner).__name__))
+
+    @staticmethod
+    def _clean(text: str) -> str:
+        # mirror VertexEmbeddingProvider so the key matches what was embedded
+        s = (text or "").strip()
+        return s or " "
+
+    @staticmethod
+    def _encode(vec: List[float]) -> bytes:
+        return array("d", vec).tobytes()
+
+    @staticmethod
+    def _decode(blob: bytes) -> List[float]:
+        a = array("d")
+        a.frombytes(blob)
+        return a.tolist()
+
+    def embed_texts(self, texts: List[str]) -> List[List[float]]:
+        clean, out, pending = self._lookup(texts)
+        if pending and self._disk is not None:
+            self._disk_lookup(pending, out)
+        if pending:
+            miss_keys = list(pending.keys())
+            fresh = self._store(miss_keys, self.inner.embed_texts([clean[pending[k][0]] for k in miss_keys]), pending, out)
+            if fresh:
+                self._disk.set_many(fresh)
+        return self._copies(out)
+
+    async def aembed_texts(self, texts: List[str]) -> List[List[float]]:
+        clean, out, pending = self._lookup(texts)
+        if pending and self._disk is not None:
+            await asyncio.to_thread(self._disk_lookup, pending, out)
+        if pending:
+            miss_keys = list(pending.keys())
+            vecs = await call_async(self.inner, "embed_texts", [clean[pending[k][0]] for k in miss_keys])
+            fresh = self._store(miss_keys, vecs, pending, out)
+            if fresh:
+                await asyncio.to_thread(self._disk.set_many, fresh)
+        return self._copies(out)
+
+    @staticmethod
+    def _copies(out: List[Optional[List[float]]]) -> List[List[float]]:
+        # one fresh list per position: callers may mutate results, LRU entries stay intact
+        return [list(v) if v is not None else [] for v in out]
+
+    def _lookup(self, texts: List[str]) -> Tuple[List[str], List[Optional[List[float]]], Dict[str, List[int]]]:
+        """(clean texts, output slots filled from the LRU, {key: positions} still missing)."""
+        clean = [self._clean(t) for t in (texts or [])]
+        model_name = self.model_name
+        keys = [sha256(model_name + t) for t in clean]
+        out: List[Optional[List[float]]] = [None] * len(clean)
+
+        # key -> positions (dedupes repeated texts inside one call)
+        pending: Dict[str, List[int]] = {}
+        with self._lock:
+            for i, k in enumerate(keys):
+                vec = self._lru.get(k)
+                if vec is not None:
+                    out[i] = vec
+                    self.hits += 1
+                else:
+                    pending.setdefault(k, []).append(i)
+        return clean, out, pending
+
+    def _disk_lookup(self, pending: Dict[str, List[int]], out: List[Optional[List[float]]]) -> None:
+        """Fill `out` from the SQLite store; found keys leave `pending`."""
+        found = self._disk.get_many(pending.keys())
+        with self._lock:
+            for k, blob in found.items():
+                vec = self._decode(blob)
+                self._lru[k] = vec
+                for i in pending.pop(k):
+                    out[i] = vec
+                    self.disk_hits += 1
+
+    def _store(
+        self,
+        miss_keys: List[str],
+        vecs: List[List[float]],
+        pending: Dict[str, List[int]],
+        out: List[Optional[List[float]]],
+    ) -> Dict[str, bytes]:
+        """Fill `out` and the LRU with fresh vectors; returns the encoded rows for the disk store."""
+        if len(vecs) != len(miss_keys):
+            raise RuntimeError(
+                f"Embedding provider returned {len(vecs)} vectors for {len(miss_keys)} texts"
+            )
+
+        fresh: Dict[str, bytes] = {}
+        with self._lock:
+            for k, vec in zip(miss_keys, vecs):
+                vec = list(vec)
+                self._lru[k] = vec
+                for i in pending[k]:
+                    out[i] = vec
+                self.misses += len(pending[k])
+                if self._disk is not None:
+                    fresh[k] = self._encode(vec)
+        return fresh
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.disk_hits + self.misses
+            return {
+                "model": self.model_name,
+                "size": len(self._lru),
+                "maxsize": int(self._lru.maxsize),
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": ((self.hits + self.disk_hits) / total) if total else 0.0,
+            }
+
+
+def with_embedding_cache(inner: EmbeddingProvider) -> EmbeddingProvider:
+    """
+    Wrap a provider with the cache configured in settings.
+    Shared by the retriever and scripts/ingest_ng12.py so both hit the same store.
+    """
+    if not settings.EMBEDDING_CACHE_ENABLED:
+        return inner
+
+    return CachedEmbeddingProvider(
+        inner,
+        max_items=settings.EMBEDDING_CACHE_MAX_ITEMS,
+        disk_path=settings.EMBEDDING_CACHE_PATH,
+    )
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from typing import Callable, Dict, Optional
+
+from app.config.settings import settings
+from app.domain.interfaces import EmbeddingProvider
+from app.providers.cached_embeddings import with_embedding_cache
+
+
+def _vertex() -> EmbeddingProvider:
+    from app.providers.vertex_embeddings import VertexEmbeddingProvider
+
+    return VertexEmbeddingProvider()
+
+
+def _local() -> EmbeddingProvider:
+    from app.providers.local_embeddings import HashingEmbeddingProvider
+
+    return HashingEmbeddingProvider()
+
+
+# EMBEDDING_PROVIDER -> factory (lazy imports: "local" must work without GCP libraries)
+_REGISTRY: Dict[str, Callable[[], EmbeddingProvider]] = {
+    "vertex": _vertex,
+    "local": _local,
+}
+
+
+def register_embedding_provider(name: str, factory: Callable[[], EmbeddingProvider]) -> None:
+    _REGISTRY[name.lower().strip()] = factory
+
+
+def get_embedding_provider(name: Optional[str] = None, cached: bool = True) -> EmbeddingProvider:
+    """
+    Build the embedding provider selected by EMBEDDING_PROVIDER (or `name`).
+    Used by both scripts/ingest_ng12.py and NG12Retriever so the index and the
+    queries are always embedded the same way.
+    """
+    key = (name or settings.EMBEDDING_PROVIDER or "vertex").lower().strip()
+    factory = _REGISTRY.get(key)
+    if factory is None:
+        raise ValueError(
+            f"Unknown EMBEDDING_PROVIDER={key!r} (expected one of: {', '.join(sorted(_REGISTRY))})"
+        )
+    provider = factory()
+    return with_embedding_cache(provider) if cached else provider
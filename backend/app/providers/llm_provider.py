@@ -2,10 +2,18 @@
 
 from __future__ import annotations
 
+import asyncio
+import copy
 import json
+import threading
 from typing import Any, Dict, Optional
 
 from app.config.settings import settings
+from app.domain.interfaces import Cache
+from app.stores.disk_cache import SqliteDiskCache
+from app.utils.text import sha256
+
+_JSON_GUARD = "\n\nReturn ONLY valid JSON. No markdown. No extra keys. No trailing comments.\n"
 
 # If you already have vertex_llm.py in _trash_unused or elsewhere, we can reuse it.
 # For now, this provider is a thin wrapper that supports:
@@ -21,6 +29,16 @@ class LLMProvider:
     Expected interface:
       - generate_text(system: str, user: str) -> str
       - generate_json(system: str, user: str, schema_name: str) -> Dict[str, Any]
+      - agenerate_text / agenerate_json: same, awaiting the client's async API;
+        at most `max_concurrency` async completions are in flight per process.
+        Client construction and the on-disk cache tier run in a worker thread,
+        so the event loop never waits on vertexai.init or SQLite.
+
+    Optional response cache (deterministic calls only, i.e. temperature == 0):
+      key = (model, temperature, system, user, schema_name)
+      - in-memory TTL cache (`cache`)
+      - optional on-disk tier (`disk_cache`) so repeats survive restarts
+      Pass use_cache=False to force a fresh completion.
     """
 
     def __init__(
@@ -31,6 +49,10 @@ class LLMProvider:
         api_key: Optional[str] = None,
         project: Optional[str] = None,
         location: Optional[str] = None,
+        cache: Optional[Cache] = None,
+        disk_cache: Optional[SqliteDiskCache] = None,
+        cache_ttl_s: int = 120,
+        max_concurrency: Optional[int] = None,
     ) -> None:
         self.provider = (provider or "vertex").lower()
         self.model = model or settings.LLM_MODEL
@@ -42,6 +64,20 @@ class LLMProvider:
 
         # Lazy init client to avoid import errors if not used in some environments
         self._client = None
+        self._client_lock = threading.Lock()
+
+        # Response cache
+        self._cache = cache
+        self._disk_cache = disk_cache
+        self.cache_ttl_s = int(cache_ttl_s)
+        self._stats_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_disk_hits = 0
+        self.cache_misses = 0
+
+        # async path: explicit bound on concurrent completions (not the threadpool size)
+        self.max_concurrency = max(1, int(max_concurrency or settings.LLM_MAX_CONCURRENCY))
+        self._async_limit = asyncio.Semaphore(self.max_concurrency)
 
     # -----------------------------
     # Internal: Vertex client
@@ -49,7 +85,12 @@ class LLMProvider:
     def _get_vertex_client(self):
         if self._client is not None:
             return self._client
+        with self._client_lock:
+            if self._client is None:
+                self._init_client()
+        return self._client
 
+    def _init_client(self) -> None:
         # NOTE:
         # The simplest stable approach is using google-generativeai OR vertexai preview chat.
         # Since your environment may already have one installed, we try vertexai first.
@@ -58,9 +99,9 @@ class LLMProvider:
             from vertexai.generative_models import GenerativeModel
 
             vertexai.init(project=self.project, location=self.location)
-            self._client = GenerativeModel(self.model)
             self._client_kind = "vertexai"
-            return self._client
+            self._client = GenerativeModel(self.model)
+            return
         except Exception:
             pass
 
@@ -74,21 +115,121 @@ class LLMProvider:
                 raise RuntimeError("Missing GOOGLE_API_KEY / LLM_API_KEY for google.generativeai fallback")
 
             genai.configure(api_key=api_key)
-            self._client = genai.GenerativeModel(self.model)
             self._client_kind = "genai"
-            return self._client
+            self._client = genai.GenerativeModel(self.model)
         except Exception as e:
             raise RuntimeError(
                 "No supported LLM client available. Install vertexai or google-generativeai, and set project/location or API key."
             ) from e
 
+    # -----------------------------
+    # Internal: response cache
+    # -----------------------------
+    def _cacheable(self, use_cache: bool) -> bool:
+        # sampling at temperature > 0 is intentionally non-deterministic
+        return bool(use_cache) and self.temperature == 0.0 and (self._cache is not None or self._disk_cache is not None)
+
+    def _cache_key(self, system: str, user: str, schema_name: str) -> str:
+        payload = json.dumps([self.model, self.temperature, system or "", user or "", schema_name or ""])
+        return "llm:" + sha256(payload)
+
+    def _cache_get(self, key: str) -> Any:
+        hit = self._memory_get(key)
+        if hit is None and self._disk_cache is not None:
+            hit = self._disk_get(key)
+        if hit is None:
+            self._count_miss()
+        return hit
+
+    async def _acache_get(self, key: str) -> Any:
+        hit = self._memory_get(key)
+        if hit is None and self._disk_cache is not None:
+            hit = await asyncio.to_thread(self._disk_get, key)
+        if hit is None:
+            self._count_miss()
+        return hit
+
+    def _memory_get(self, key: str) -> Any:
+        hit = self._cache.get(key) if self._cache is not None else None
+        if hit is not None:
+            with self._stats_lock:
+                self.cache_hits += 1
+        return hit
+
+    def _disk_get(self, key: str) -> Any:
+        blob = self._disk_cache.get(key)
+        if blob is None:
+            return None
+        try:
+            value = json.loads(blob.decode("utf-8"))["v"]
+        except Exception:
+            return None
+        if value is not None:
+            if self._cache is not None:
+                self._cache.set(key, value, self.cache_ttl_s)
+            with self._stats_lock:
+                self.cache_disk_hits += 1
+        return value
+
+    def _count_miss(self) -> None:
+        with self._stats_lock:
+            self.cache_misses += 1
+
+    def _cache_set(self, key: str, value: Any) -> None:
+        # never cache empty completions; they're usually transient failures
+        if not value:
+            return
+        if self._cache is not None:
+            self._cache.set(key, value, self.cache_ttl_s)
+        if self._disk_cache is not None:
+            self._disk_set(key, value)
+
+    async def _acache_set(self, key: str, value: Any) -> None:
+        if not value:
+            return
+        if self._cache is not None:
+            self._cache.set(key, value, self.cache_ttl_s)
+        if self._disk_cache is not None:
+            await asyncio.to_thread(self._disk_set, key, value)
+
+    def _disk_set(self, key: str, value: Any) -> None:
+        self._disk_cache.set(key, json.dumps({"v": value}).encode("utf-8"), ttl_s=self.cache_ttl_s)
+
+    def cache_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            total = self.cache_hits + self.cache_disk_hits + self.cache_misses
+            return {
+                "model": self.model,
+                "hits": self.cache_hits,
+                "disk_hits": self.cache_disk_hits,
+                "misses": self.cache_misses,
+                "hit_rate": ((self.cache_hits + self.cache_disk_hits) / total) if total else 0.0,
+            }
+
     # -----------------------------
     # Public API
     # -----------------------------
-    def generate_text(self, system: str, user: str) -> str:
+    def generate_text(self, system: str, user: str, use_cache: bool = True) -> str:
+        if not self._cacheable(use_cache):
+            return self._complete(system, user)
+
+        key = self._cache_key(system, user, "")
+        cached = self._cache_get(key)
+        if cached is not None:
+            return str(cached)
+
+        text = self._complete(system, user)
+        self._cache_set(key, text)
+        return text
+
+    @staticmethod
+    def _prompt(system: str, user: str) -> str:
+        return (system or "").strip() + "\n\n" + (user or "").strip()
+
+    def _complete(self, system: str, user: str) -> str:
         client = self._get_vertex_client()
 
-        prompt = (system or "").strip() + "\n\n" + (user or "").strip()
+        prompt = self._prompt(system, user)
 
         if getattr(self, "_client_kind", "") == "vertexai":
             resp = client.generate_content(prompt)
@@ -98,16 +239,30 @@ class LLMProvider:
         resp = client.generate_content(prompt)
         return (getattr(resp, "text", None) or "").strip()
 
-    def generate_json(self, system: str, user: str, schema_name: str) -> Dict[str, Any]:
+    def generate_json(self, system: str, user: str, schema_name: str, use_cache: bool = True) -> Dict[str, Any]:
         """
         We ask the model to return JSON only, then parse.
         If parsing fails, return {} (graphs already handle empty output safely).
+        Only successfully parsed results are cached.
         """
-        json_guard = (
-            "\n\nReturn ONLY valid JSON. No markdown. No extra keys. No trailing comments.\n"
-        )
-        text = self.generate_text(system + json_guard, user)
+        if not self._cacheable(use_cache):
+            return self._complete_json(system, user)
+
+        key = self._cache_key(system, user, schema_name)
+        cached = self._cache_get(key)
+        if isinstance(cached, dict):
+            # graphs annotate the extracted dict; keep the cached copy pristine
+            return copy.deepcopy(cached)
+
+        out = self._complete_json(system, user)
+        self._cache_set(key, copy.deepcopy(out))
+        return out
+
+    def _complete_json(self, system: str, user: str) -> Dict[str, Any]:
+        return self._parse_json(self._complete(system + _JSON_GUARD, user))
 
+    @staticmethod
+    def _parse_json(text: str) -> Dict[str, Any]:
         # Strip common wrappers
         t = (text or "").strip()
         if t.startswith("```"):
@@ -119,3 +274,40 @@ class LLMProvider:
             return json.loads(t)
         except Exception:
             return {}
+
+    # -----------------------------
+    # Async API (async routes / graph ainvoke)
+    # -----------------------------
+    async def _acomplete(self, system: str, user: str) -> str:
+        # one-off client construction (vertexai.init, model load) blocks: run it off the loop
+        client = self._client if self._client is not None else await asyncio.to_thread(self._get_vertex_client)
+        async with self._async_limit:
+            resp = await client.generate_content_async(self._prompt(system, user))
+        return (getattr(resp, "text", None) or "").strip()
+
+    async def agenerate_text(self, system: str, user: str, use_cache: bool = True) -> str:
+        if not self._cacheable(use_cache):
+            return await self._acomplete(system, user)
+
+        key = self._cache_key(system, user, "")
+        cached = await self._acache_get(key)
+        if cached is not None:
+            return str(cached)
+
+        text = await self._acomplete(system, user)
+        await self._acache_set(key, text)
+        return text
+
+    async def agenerate_json(self, system: str, user: str, schema_name: str, use_cache: bool = True) -> Dict[str, Any]:
+        """Async generate_json (same parsing and caching rules)."""
+        if not self._cacheable(use_cache):
+            return self._parse_json(await self._acomplete(system + _JSON_GUARD, user))
+
+        key = self._cache_key(system, user, schema_name)
+        cached = await self._acache_get(key)
+        if isinstance(cached, dict):
+            return copy.deepcopy(cached)
+
+        out = self._parse_json(await self._acomplete(system + _JSON_GUARD, user))
+        await self._acache_set(key, copy.deepcopy(out))
+        return out
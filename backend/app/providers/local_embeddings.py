@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import math
+import re
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.config.settings import settings
+from app.domain.interfaces import EmbeddingProvider
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+class HashingEmbeddingProvider(EmbeddingProvider):
+    """
+    Offline CPU embeddings: hashed n-gram TF-IDF projected to a fixed dimension.
+
+    Features per text:
+      - word unigrams and bigrams
+      - character 3..5-grams inside each word (robust to haematuria / hematuria)
+    Each feature is hashed (crc32, stable across processes) to one of `dim`
+    buckets with a +/- sign, weighted by 1 + log(tf), then by the bucket IDF
+    (if fitted) and L2-normalized.
+
+    fit(documents) learns bucket IDF from the corpus at ingest and saves it to
+    `idf_path`; the retriever loads the same file. The IDF fingerprint is part
+    of `model_name`, so the embedding cache and index metadata never mix
+    vectors from different fits. A long-running process reloads the file when
+    its mtime changes (a re-ingest refit it), like ChunkFeatureStore, so query
+    vectors follow the stored ones.
+
+    No network, no credentials: used for local ingest, tests and benchmarks.
+    """
+
+    def __init__(self, dim: Optional[int] = None, idf_path: Optional[str | Path] = None) -> None:
+        self.dim = int(dim or settings.LOCAL_EMBEDDING_DIM)
+        self.idf_path = Path(idf_path) if idf_path else Path(settings.LOCAL_EMBEDDING_IDF_PATH)
+        self._idf: Optional[np.ndarray] = None
+        self._idf_tag = ""
+        self._idf_mtime: Optional[float] = None
+        self._load_idf()
+
+    @property
+    def model_name(self) -> str:
+        self._load_idf()
+        base = f"local-hash-{self.dim}"
+        return f"{base}-idf{self._idf_tag}" if self._idf_tag else base
+
+    @property
+    def fitted(self) -> bool:
+        self._load_idf()
+        return self._idf is not None
+
+    # -----------------------------
+    # IDF
+    # -----------------------------
+    def _set_idf(self, idf: np.ndarray) -> None:
+        self._idf = idf.astype(np.float32)
+        self._idf_tag = format(zlib.crc32(self._idf.tobytes()), "08x")
+
+    def _load_idf(self) -> None:
+        try:
+            mtime = self.idf_path.stat().st_mtime
+        except OSError:
+            self._idf, self._idf_tag, self._idf_mtime = None, "", None
+            return
+        if mtime == self._idf_mtime:
+            return
+        idf = np.load(str(self.idf_path))
+        if idf.shape == (self.dim,):
+            self._set_idf(idf)
+        else:
+            self._idf, self._idf_tag = None, ""
+        self._idf_mtime = mtime
+
+    def fit(self, documents: List[str]) -> None:
+        n = len(documents)
+        if n == 0:
+            return
+        df = np.zeros(self.dim, dtype=np.float64)
+        for doc in documents:
+            buckets = set(self._features(doc))
+            if buckets:
+                df[list(buckets)] += 1.0
+        self._set_idf(np.log((1.0 + n) / (1.0 + df)) + 1.0)
+
+        self.idf_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.idf_path.with_name(self.idf_path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.save(f, self._idf)
+        tmp.replace(self.idf_path)
+        self._idf_mtime = self.idf_path.stat().st_mtime
+
+    # -----------------------------
+    # Features
+    # -----------------------------
+    def _bucket(self, feature: str) -> int:
+        return zlib.crc32(feature.encode("utf-8")) % self.dim
+
+    def _sign(self, feature: str) -> float:
+        return 1.0 if (zlib.crc32(b"s:" + feature.encode("utf-8")) & 1) else -1.0
+
+    def _raw_features(self, text: str) -> Dict[str, int]:
+        words = _WORD_RE.findall((text or "").lower())
+        counts: Dict[str, int] = {}
+
+        def add(f: str) -> None:
+            counts[f] = counts.get(f, 0) + 1
+
+        for i, w in enumerate(words):
+            add("w:" + w)
+            if i + 1 < len(words):
+                add("b:" + w + " " + words[i + 1])
+            padded = f"<{w}>"
+            for n in (3, 4, 5):
+                for j in range(0, max(0, len(padded) - n + 1)):
+                    add("c:" + padded[j : j + n])
+        return counts
+
+    def _features(self, text: str) -> Dict[int, float]:
+        vec: Dict[int, float] = {}
+        for f, tf in self._raw_features(text).items():
+            b = self._bucket(f)
+            vec[b] = vec.get(b, 0.0) + self._sign(f) * (1.0 + math.log(tf))
+        return vec
+
+    # -----------------------------
+    # EmbeddingProvider
+    # -----------------------------
+    def embed_texts(self, texts: List[str]) -> List[List[float]]:
+        self._load_idf()
+        idf = self._idf
+        out = np.zeros((len(texts or []), self.dim), dtype=np.float32)
+        for i, t in enumerate(texts or []):
+            feats = self._features(t)
+            if not feats:
+                continue
+            idx = np.fromiter(feats.keys(), dtype=np.int64, count=len(feats))
+            out[i, idx] = np.fromiter(feats.values(), dtype=np.float32, count=len(feats))
+
+        if idf is not None:
+            out *= idf[None, :]
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        out /= norms
+        return out.tolist()
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import asyncio
+import threading
 from typing import List
 import os
 
@@ -16,6 +18,9 @@ class VertexEmbeddingProvider:
       - Uses Vertex AI Text Embeddings model (via google-cloud-aiplatform).
       - Requires GOOGLE_APPLICATION_CREDENTIALS env var set (service account json)
         OR `gcloud auth application-default login`.
+      - aembed_texts awaits get_embeddings_async; at most EMBEDDING_MAX_CONCURRENCY
+        async calls are in flight per process. The one-off model init
+        (vertexai.init, from_pretrained) runs in a worker thread.
     """
 
     def __init__(self, model_name: str | None = None, project: str | None = None, location: str | None = None):
@@ -30,11 +35,17 @@ class VertexEmbeddingProvider:
         # Lazy init so import doesn't crash if deps missing until used
         self._inited = False
         self._model = None
+        self._init_lock = threading.Lock()
+        self._async_limit = asyncio.Semaphore(max(1, int(getattr(settings, "EMBEDDING_MAX_CONCURRENCY", 8))))
 
     def _init(self) -> None:
         if self._inited:
             return
+        with self._init_lock:
+            if not self._inited:
+                self._load_model()
 
+    def _load_model(self) -> None:
         try:
             import vertexai
             from vertexai.preview.language_models import TextEmbeddingModel
@@ -49,20 +60,30 @@ class VertexEmbeddingProvider:
         self._model = TextEmbeddingModel.from_pretrained(self.model_name)
         self._inited = True
 
-    def embed_texts(self, texts: List[str]) -> List[List[float]]:
-        self._init()
-
+    @staticmethod
+    def _clean(texts: List[str]) -> List[str]:
         clean = []
         for t in texts or []:
             s = (t or "").strip()
             if not s:
                 s = " "  # Vertex doesn't like empty strings
             clean.append(s)
+        return clean
+
+    def embed_texts(self, texts: List[str]) -> List[List[float]]:
+        self._init()
 
         # Vertex returns objects with .values for embedding vector
-        res = self._model.get_embeddings(clean)
+        res = self._model.get_embeddings(self._clean(texts))
         out: List[List[float]] = []
         for r in res:
             # r.values is a list[float]
             out.append(list(r.values))
         return out
+
+    async def aembed_texts(self, texts: List[str]) -> List[List[float]]:
+        if not self._inited:
+            await asyncio.to_thread(self._init)
+        async with self._async_limit:
+            res = await self._model.get_embeddings_async(self._clean(texts))
+        return [list(r.values) for r in res]
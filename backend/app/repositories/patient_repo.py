@@ -3,7 +3,7 @@ from __future__ import annotations
 import json
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, Iterator, List
 
 from app.domain.models import Patient
 
@@ -76,3 +76,8 @@ class PatientRepository:
     def get_patient(self, patient_id: str) -> Optional[Patient]:
         self._load()
         return self._cache.get(str(patient_id).strip())
+
+    def iter_patients(self) -> Iterator[Patient]:
+        """All patients, in file order."""
+        self._load()
+        yield from list(self._cache.values())
@@ -0,0 +1,130 @@
+# app/retrieval/bm25.py
+
+from __future__ import annotations
+
+import json
+import math
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[-'][a-z0-9]+)*")
+
+# kept deliberately small: "over", "under", "and over" thresholds carry meaning in NG12
+_STOPWORDS = frozenset(
+    "a an the of to in on for with by or is are be been this that these those it its as at from "
+    "if they their them who which should can may".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    t = (text or "").lower()
+    t = t.replace("hemoptysis", "haemoptysis").replace("hematuria", "haematuria").replace("anemia", "anaemia")
+    return [w for w in _TOKEN_RE.findall(t) if w not in _STOPWORDS]
+
+
+class BM25Index:
+    """
+    Compact inverted index (Okapi BM25) over the ingested NG12 chunks.
+
+    Built once by scripts/ingest_ng12.py and saved as JSON:
+      {"k1", "b", "ids": [...], "doc_len": [...], "postings": {term: [doc, tf, doc, tf, ...]}}
+
+    At load time every posting list is turned into (doc_idx, weight) arrays, so a
+    query is a handful of NumPy scatter-adds, one per query term.
+    """
+
+    def __init__(self, ids: List[str], doc_len: List[int], postings: Dict[str, List[int]], k1: float = 1.5, b: float = 0.75):
+        self.ids = list(ids)
+        self.k1 = float(k1)
+        self.b = float(b)
+        self._doc_len = list(doc_len)
+        self._postings = postings
+        self._row: Dict[str, int] = {cid: i for i, cid in enumerate(self.ids)}
+
+        n = len(self.ids)
+        dl = np.asarray(doc_len, dtype=np.float32) if n else np.zeros(0, dtype=np.float32)
+        avgdl = float(dl.mean()) if n else 0.0
+        norm = self.k1 * (1.0 - self.b + self.b * (dl / avgdl)) if avgdl > 0 else np.full(n, self.k1, dtype=np.float32)
+
+        self._weights: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for term, flat in postings.items():
+            docs = np.asarray(flat[0::2], dtype=np.int32)
+            tfs = np.asarray(flat[1::2], dtype=np.float32)
+            df = len(docs)
+            idf = math.log(1.0 + (n - df + 0.5) / (df + 0.5))
+            w = idf * tfs * (self.k1 + 1.0) / (tfs + norm[docs])
+            self._weights[term] = (docs, w.astype(np.float32))
+
+    # -----------------------------
+    # Build / persist
+    # -----------------------------
+    @classmethod
+    def build(cls, ids: List[str], documents: List[str], k1: float = 1.5, b: float = 0.75) -> "BM25Index":
+        postings: Dict[str, List[int]] = {}
+        doc_len: List[int] = []
+        for di, doc in enumerate(documents):
+            toks = tokenize(doc)
+            doc_len.append(len(toks))
+            for term, tf in Counter(toks).items():
+                postings.setdefault(term, []).extend((di, tf))
+        return cls(ids, doc_len, postings, k1=k1, b=b)
+
+    def save(self, path: str | Path) -> Path:
+        p = Path(path)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "k1": self.k1,
+            "b": self.b,
+            "ids": self.ids,
+            "doc_len": self._doc_len,
+            "postings": self._postings,
+        }
+        tmp = p.with_suffix(p.suffix + ".tmp")
+        tmp.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+        tmp.replace(p)
+        return p
+
+    @classmethod
+    def load(cls, path: str | Path) -> "BM25Index":
+        raw = json.loads(Path(path).read_text(encoding="utf-8"))
+        return cls(
+            ids=raw.get("ids") or [],
+            doc_len=raw.get("doc_len") or [],
+            postings=raw.get("postings") or {},
+            k1=float(raw.get("k1", 1.5)),
+            b=float(raw.get("b", 0.75)),
+        )
+
+    # -----------------------------
+    # Query
+    # -----------------------------
+    def search(self, query: str, top_k: int, restrict_ids: Optional[Iterable[str]] = None) -> List[Tuple[str, float]]:
+        """Top-k (id, score); `restrict_ids` limits the ranking to that subset (site filter)."""
+        n = len(self.ids)
+        if n == 0 or top_k <= 0:
+            return []
+
+        scores = np.zeros(n, dtype=np.float32)
+        matched = False
+        for term in set(tokenize(query)):
+            entry = self._weights.get(term)
+            if entry is None:
+                continue
+            docs, w = entry
+            scores[docs] += w  # doc indices are unique within a posting list
+            matched = True
+        if not matched:
+            return []
+        if restrict_ids is not None:
+            keep = np.zeros(n, dtype=bool)
+            keep[[self._row[c] for c in restrict_ids if c in self._row]] = True
+            scores[~keep] = 0.0
+
+        k = min(int(top_k), n)
+        idx = np.argpartition(-scores, k - 1)[:k] if k < n else np.arange(n)
+        idx = idx[np.argsort(-scores[idx], kind="stable")]
+        return [(self.ids[int(i)], float(scores[int(i)])) for i in idx if scores[int(i)] > 0.0]
@@ -0,0 +1,182 @@
+# app/retrieval/chunk_features.py
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.retrieval.lexicon import (
+    BOILERPLATE_PHRASES,
+    CLINICAL_MARKERS,
+    SYMPTOM_TERMS,
+    all_phrases,
+)
+from app.retrieval.phrase_matcher import lexicon_matcher
+
+FEATURES_VERSION = 2
+
+# criteria-phrase flags read by the assessor reranker (bit i = CRITERIA_FLAGS[i])
+CRITERIA_FLAGS: Tuple[str, ...] = (
+    "symptom_table",  # "symptom and specific features" + "recommendation"
+    "suspected_pathway",  # "suspected cancer pathway"
+    "action_verb",  # refer / consider / offer
+    "haemoptysis",
+    "unexplained_haemoptysis",
+    "lung_or_respiratory",
+)
+
+SYMPTOM_TERM_SET = frozenset(SYMPTOM_TERMS)
+
+
+def normalize(text: str) -> str:
+    """Same normalization the assessor applies: lower-case, single spaces."""
+    return " ".join((text or "").lower().split())
+
+
+def _bits(flags: List[bool]) -> int:
+    out = 0
+    for i, on in enumerate(flags):
+        if on:
+            out |= 1 << i
+    return out
+
+
+def flag_bit(name: str) -> int:
+    return 1 << CRITERIA_FLAGS.index(name)
+
+
+def compute_features(text: str) -> Dict[str, Any]:
+    """
+    Request-independent text features for one chunk.
+
+      norm:        normalized text
+      boilerplate: bool (no clinical marker and at least one boilerplate phrase)
+      markers:     bitmask over CLINICAL_MARKERS
+      flags:       bitmask over CRITERIA_FLAGS
+      matches:     lexicon phrases present in norm (sorted)
+      terms:       {symptom term present in norm: first offset in text.strip().lower(),
+                    or -1 when the phrase only occurs across a line break}
+    """
+    raw = (text or "").strip()
+    t = normalize(raw)
+
+    matcher = lexicon_matcher()
+    found = matcher.match(t)
+
+    marker_hits = [m in found for m in CLINICAL_MARKERS]
+    boilerplate = (not t) or ((not any(marker_hits)) and any(b in found for b in BOILERPLATE_PHRASES))
+
+    flags = _bits(
+        [
+            "symptom and specific features" in found and "recommendation" in found,
+            "suspected cancer pathway" in found,
+            ("refer" in found) or ("consider" in found) or ("offer" in found),
+            "haemoptysis" in found or "hemoptysis" in found,
+            "unexplained haemoptysis" in found or "unexplained hemoptysis" in found,
+            "lung" in found or "respiratory" in found,
+        ]
+    )
+
+    low = raw.lower()
+    terms: Dict[str, int] = {term: low.find(term) for term in SYMPTOM_TERMS if term in found}
+
+    return {
+        "norm": t,
+        "boilerplate": bool(boilerplate),
+        "markers": _bits(marker_hits),
+        "flags": flags,
+        "matches": sorted(found),
+        "terms": terms,
+    }
+
+
+def hit_features(h: Dict[str, Any]) -> Dict[str, Any]:
+    """Features attached by the retriever; computed (once, cached on the hit) when missing."""
+    f = h.get("features")
+    if f is None:
+        text = (h.get("document") or h.get("text") or h.get("snippet") or "").strip()
+        f = compute_features(text)
+        h["features"] = f
+    return f
+
+
+def _schema() -> Dict[str, Any]:
+    return {
+        "version": FEATURES_VERSION,
+        "markers": list(CLINICAL_MARKERS),
+        "flags": list(CRITERIA_FLAGS),
+        "terms": list(SYMPTOM_TERMS),
+        "lexicon": list(all_phrases()),
+    }
+
+
+def chunk_features_payload(ids: List[str], documents: List[str]) -> Dict[str, Any]:
+    """{schema..., "chunks": {id: features}}: the sidecar body (also embedded in index snapshots)."""
+    return {**_schema(), "chunks": {cid: compute_features(doc) for cid, doc in zip(ids, documents)}}
+
+
+def features_from_payload(raw: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Per-chunk features of a payload, or {} when it was written with another layout."""
+    schema_ok = all(raw.get(k) == v for k, v in _schema().items())
+    return (raw.get("chunks") or {}) if schema_ok else {}
+
+
+def write_chunk_features(
+    path: str | Path, ids: List[str], documents: List[str], payload: Optional[Dict[str, Any]] = None
+) -> Path:
+    """Sidecar written by scripts/ingest_ng12.py next to the vector store."""
+    p = Path(path)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    payload = payload if payload is not None else chunk_features_payload(ids, documents)
+    tmp = p.with_suffix(p.suffix + ".tmp")
+    tmp.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+    tmp.replace(p)
+    return p
+
+
+class ChunkFeatureStore:
+    """
+    Read side of the features sidecar; reloads after a re-ingest (mtime check).
+
+    A sidecar written with a different marker/flag/term layout is ignored, so
+    bitmasks and phrase lists are never misread; callers then compute features on the fly.
+    """
+
+    def __init__(self, path: Optional[str | Path]) -> None:
+        self.path = Path(path) if path else None
+        self._chunks: Dict[str, Dict[str, Any]] = {}
+        self._mtime: Optional[float] = None
+
+    @classmethod
+    def from_payload(cls, raw: Dict[str, Any]) -> "ChunkFeatureStore":
+        """Fixed features (e.g. from an index snapshot); no file, no reload."""
+        fs = cls(None)
+        fs._chunks = features_from_payload(raw)
+        return fs
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self.path is None:
+            return self._chunks
+        try:
+            mtime = self.path.stat().st_mtime
+        except OSError:
+            self._chunks, self._mtime = {}, None
+            return self._chunks
+        if mtime != self._mtime:
+            self._chunks = features_from_payload(json.loads(self.path.read_text(encoding="utf-8")))
+            self._mtime = mtime
+        return self._chunks
+
+    def get(self, chunk_id: str) -> Optional[Dict[str, Any]]:
+        return self._load().get(chunk_id)
+
+    def attach(self, hits: List[Dict[str, Any]]) -> None:
+        """Set hit["features"] in place for every hit with a precomputed entry."""
+        chunks = self._load()
+        if not chunks:
+            return
+        for h in hits:
+            f = chunks.get(str(h.get("id") or ""))
+            if f is not None:
+                h["features"] = f
@@ -0,0 +1,207 @@
+# app/retrieval/dedupe.py
+
+from __future__ import annotations
+
+import re
+import zlib
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.retrieval.site_tagging import SITE_BUCKETS, site_flag
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+# page furniture clean_text leaves in chunks (the NG12 footer wraps over several lines)
+_FURNITURE_RE = re.compile(
+    r"^(suspected cancer: recognition and referral(?: \(ng12\))?|.*notice-of-rights.*|page \d+ of(?: \d+)?|\d+)$"
+)
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+def shingles(text: str, n: int = 3) -> Set[str]:
+    """Word n-gram shingles of the lower-cased text (whole text if shorter than n words)."""
+    words = _WORD_RE.findall((text or "").lower())
+    if len(words) <= n:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i : i + n]) for i in range(len(words) - n + 1)}
+
+
+def content_words(text: str) -> List[str]:
+    """Words of a chunk without page furniture (footer, page numbers)."""
+    lines = [ln for ln in (text or "").lower().splitlines() if not _FURNITURE_RE.match(ln.strip())]
+    return _WORD_RE.findall("\n".join(lines))
+
+
+def is_contained(part: List[str], whole: List[str]) -> bool:
+    """
+    True when `part` is a contiguous run of `whole`. Its first and last word may be
+    fragments cut at a chunk boundary: they only need to end / start the words
+    around the run ("gkin" of "hodgkin").
+    """
+    if len(part) <= 2:
+        return any(whole[k : k + len(part)] == part for k in range(len(whole) - len(part) + 1))
+    inner = part[1:-1]
+    m = len(inner)
+    for k in range(1, len(whole) - m):
+        if whole[k : k + m] == inner and whole[k - 1].endswith(part[0]) and whole[k + m].startswith(part[-1]):
+            return True
+    return False
+
+
+def _shingle_words(words: List[str], n: int) -> Set[str]:
+    if len(words) <= n:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i : i + n]) for i in range(len(words) - n + 1)}
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / max(1, len(a | b))
+
+
+class MinHasher:
+    """num_perm universal hash permutations over crc32 shingle hashes (a*x + b mod 2^61-1)."""
+
+    def __init__(self, num_perm: int = 128, seed: int = 1) -> None:
+        rng = np.random.default_rng(seed)
+        self.num_perm = int(num_perm)
+        self._a = rng.integers(1, _MAX_HASH, size=self.num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _MAX_HASH, size=self.num_perm, dtype=np.uint64)
+
+    def signature(self, sh: Set[str]) -> np.ndarray:
+        if not sh:
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint64)
+        x = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in sh), dtype=np.uint64, count=len(sh))
+        # 32-bit inputs x 32-bit multipliers fit in uint64 before the modulus
+        return ((x[:, None] * self._a[None, :] + self._b[None, :]) % _PRIME).min(axis=0)
+
+
+def lsh_bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """(bands, rows) whose LSH S-curve midpoint (1/b)^(1/r) sits safely below `threshold`."""
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        if (1.0 / bands) ** (1.0 / rows) <= threshold * 0.9:
+            best = (bands, rows)
+    return best
+
+
+def near_duplicate_groups(
+    documents: List[str], threshold: float = 0.75, num_perm: int = 128, shingle_size: int = 3
+) -> List[int]:
+    """
+    canonical[i] = index of the document that i collapses into (i itself if unique).
+
+    Shingles come from content_words (page furniture stripped), so a shared footer
+    cannot make two different chunks look alike. MinHash-LSH proposes candidate
+    pairs (any band collision); a candidate pair needs the exact shingle Jaccard
+    >= threshold, and then j collapses into i only when j's content words occur
+    in i as one contiguous run. Repeated table notes ("Separate recommendations
+    have been made ...") can push two different rows over the Jaccard threshold;
+    the run check keeps both, so dropping j never drops text i lacks.
+    A document only collapses into one ranked before it (longer content, then
+    earlier): no cycles, chains resolve to the last container.
+    """
+    n = len(documents)
+    parent = list(range(n))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    words = [content_words(d) for d in documents]
+    sh = [_shingle_words(w, shingle_size) for w in words]
+    hasher = MinHasher(num_perm)
+    sigs = [hasher.signature(s) for s in sh]
+    bands, rows = lsh_bands(num_perm, threshold)
+    rank = {i: r for r, i in enumerate(sorted(range(n), key=lambda i: (-len(words[i]), i)))}
+
+    checked: Set[Tuple[int, int]] = set()
+    for b in range(bands):
+        buckets: Dict[bytes, List[int]] = {}
+        for i, sig in enumerate(sigs):
+            if sh[i]:
+                buckets.setdefault(sig[b * rows : (b + 1) * rows].tobytes(), []).append(i)
+        for members in buckets.values():
+            for x in range(len(members)):
+                for y in range(x + 1, len(members)):
+                    i, j = members[x], members[y]
+                    if (i, j) in checked:
+                        continue
+                    checked.add((i, j))
+                    if rank[j] < rank[i]:
+                        i, j = j, i
+                    if parent[j] == j and jaccard(sh[i], sh[j]) >= threshold and is_contained(words[j], words[i]):
+                        parent[j] = i
+
+    return [find(i) for i in range(n)]
+
+
+def _csv(values: List[Any]) -> str:
+    return ",".join(str(v) for v in values)
+
+
+def alias_pages(meta: Optional[Dict[str, Any]]) -> List[int]:
+    """Pages of the near-duplicates collapsed into a chunk (metadata "alias_pages": "38,45")."""
+    raw = str((meta or {}).get("alias_pages") or "")
+    return [int(p) for p in raw.split(",") if p.strip().isdigit()]
+
+
+def collapse_near_duplicates(
+    ids: List[str],
+    documents: List[str],
+    metadatas: List[Dict[str, Any]],
+    threshold: float = 0.75,
+) -> Tuple[List[str], List[str], List[Dict[str, Any]], Dict[str, List[str]]]:
+    """
+    Keep one canonical chunk per near-duplicate group (near_duplicate_groups:
+    a chunk is dropped only when its content is a run of the canonical's).
+
+    The canonical chunk's metadata gains:
+      alias_ids:   "ng12_0079_01,ng12_0080_01" (collapsed chunk ids)
+      alias_pages: "79,80"                     (their pages, for citations)
+    and has_criteria / site_<bucket> flags are OR-ed over the group so site
+    filters still reach it from every section it appeared in.
+
+    Returns (ids, documents, metadatas, {canonical_id: [alias ids]}).
+    """
+    canonical = near_duplicate_groups(documents, threshold=threshold)
+    members: Dict[int, List[int]] = {}
+    for i, c in enumerate(canonical):
+        if i != c:
+            members.setdefault(c, []).append(i)
+
+    out_ids: List[str] = []
+    out_docs: List[str] = []
+    out_metas: List[Dict[str, Any]] = []
+    groups: Dict[str, List[str]] = {}
+    flags = [site_flag(b) for b in SITE_BUCKETS if b != "general"]
+
+    for i, c in enumerate(canonical):
+        if i != c:
+            continue
+        meta = dict(metadatas[i])
+        dups = members.get(i, [])
+        if dups:
+            page = meta.get("page")
+            pages = sorted({int(metadatas[j].get("page") or 0) for j in dups} - {page})
+            meta["alias_ids"] = _csv([ids[j] for j in dups])
+            meta["alias_pages"] = _csv(pages)
+            meta["has_criteria"] = bool(meta.get("has_criteria")) or any(
+                bool(metadatas[j].get("has_criteria")) for j in dups
+            )
+            for f in flags:
+                if f in meta:
+                    meta[f] = bool(meta[f]) or any(bool(metadatas[j].get(f)) for j in dups)
+            groups[ids[i]] = [ids[j] for j in dups]
+        out_ids.append(ids[i])
+        out_docs.append(documents[i])
+        out_metas.append(meta)
+
+    return out_ids, out_docs, out_metas, groups
@@ -0,0 +1,157 @@
+# app/retrieval/lexicon.py
+
+from __future__ import annotations
+
+from typing import Dict, Tuple
+
+# Central phrase lists for NG12 text scanning. Everything here is matched as a
+# lower-case substring by the shared PhraseMatcher (app/retrieval/phrase_matcher.py),
+# at ingest (has_criteria, chunk features) and in the assessor graph.
+
+# has_criteria metadata flag written by scripts/ingest_ng12.py
+CRITERIA_SIGNALS: Tuple[str, ...] = (
+    "refer",
+    "consider",
+    "offer",
+    "suspected cancer pathway",
+    "symptom and specific features",
+    "possible cancer",
+    "recommendation",
+    "aged",
+    "and over",
+    "within",
+    "weeks",
+)
+
+# any of these means the chunk carries clinical content (not boilerplate)
+CLINICAL_MARKERS: Tuple[str, ...] = (
+    "refer",
+    "consider",
+    "offer",
+    "should be referred",
+    "suspected cancer pathway",
+    "symptom and specific features",
+    "possible cancer",
+    "recommendation",
+    "aged",
+    "and over",
+    "within",
+    "weeks",
+    "haematuria",
+    "hematuria",
+    "dysphagia",
+    "hoarseness",
+    "haemoptysis",
+    "hemoptysis",
+    "x-ray",
+)
+
+BOILERPLATE_PHRASES: Tuple[str, ...] = (
+    "all rights reserved",
+    "notice of rights",
+    "terms-and-conditions",
+    "www.nice.org.uk",
+    "suspected cancer: recognition and referral",
+    "recommendations organised by site of cancer",
+    "use this guideline to guide referrals",
+    "this guideline covers",
+    "contents",
+    "introduction",
+)
+
+# phrases behind the assessor's criteria-phrase flags (see chunk_features.CRITERIA_FLAGS)
+CRITERIA_PHRASES: Tuple[str, ...] = (
+    "symptom and specific features",
+    "recommendation",
+    "suspected cancer pathway",
+    "refer",
+    "consider",
+    "offer",
+    "haemoptysis",
+    "hemoptysis",
+    "unexplained haemoptysis",
+    "unexplained hemoptysis",
+    "lung",
+    "respiratory",
+)
+
+# symptom phrases (patient symptom matching, excerpt anchoring)
+SYMPTOM_TERMS: Tuple[str, ...] = (
+    "visible haematuria",
+    "non-visible haematuria",
+    "haematuria",
+    "hematuria",
+    "haemoptysis",
+    "hemoptysis",
+    "unexplained haemoptysis",
+    "unexplained hemoptysis",
+    "persistent cough",
+    "cough",
+    "shortness of breath",
+    "chest pain",
+    "chest x-ray",
+    "dysphagia",
+    "dyspepsia",
+    "reflux",
+    "upper abdominal pain",
+    "abdominal pain",
+    "abdominal mass",
+    "weight loss",
+    "appetite loss",
+    "nausea",
+    "vomiting",
+    "iron-deficiency anaemia",
+    "iron deficiency anaemia",
+    "anaemia",
+    "rectal bleeding",
+    "change in bowel habit",
+    "breast lump",
+    "unexplained breast lump",
+    "nipple",
+    "hoarseness",
+    "persistent hoarseness",
+    "sore throat",
+    "neck lump",
+    "mouth ulceration",
+    "fatigue",
+    "thrombocytosis",
+    "lymphadenopathy",
+    "bone pain",
+    "back pain",
+    "postmenopausal bleeding",
+    "pelvic mass",
+    "bloating",
+    "urinary tract infection",
+    "dysuria",
+    "testicular",
+    "erectile dysfunction",
+    "skin lesion",
+    "pigmented",
+    "jaundice",
+    "night sweats",
+    "fever",
+    "bruising",
+    "headache",
+)
+
+# symptom terms of the assessor's deterministic fallback rules: the patient must assert the term
+# and the cited chunk must contain it (whole tokens, UK spelling after normalize_term)
+EVIDENCE_TERMS: Dict[str, Tuple[str, ...]] = {
+    "visible_haematuria": ("visible haematuria",),
+    "dysphagia": ("dysphagia",),
+    "haemoptysis": ("haemoptysis",),
+}
+# longer terms that contain an evidence term but are not it (longest match wins)
+EVIDENCE_BLOCKERS: Tuple[str, ...] = ("non-visible haematuria",)
+
+
+def all_phrases() -> Tuple[str, ...]:
+    """Every lexicon phrase once, in first-seen order (stable pattern ids)."""
+    seen: Dict[str, None] = {}
+    for group in (CRITERIA_SIGNALS, CLINICAL_MARKERS, BOILERPLATE_PHRASES, CRITERIA_PHRASES, SYMPTOM_TERMS):
+        for p in group:
+            seen.setdefault(p, None)
+    for terms in (*EVIDENCE_TERMS.values(), EVIDENCE_BLOCKERS):
+        for p in terms:
+            seen.setdefault(p, None)
+    return tuple(seen)
@@ -1,30 +1,105 @@
 from __future__ import annotations
 
+import asyncio
+import json
 from dataclasses import dataclass
+from pathlib import Path
 from typing import Any, Dict, List, Tuple, Optional
 
-from app.utils.text import normalize_query
-from app.stores.chroma_store import ChromaVectorStore
-from app.providers.vertex_embeddings import VertexEmbeddingProvider
+import numpy as np
+
+from app.domain.interfaces import Cache, VectorIndex
+from app.utils.concurrency import call_async
+from app.utils.text import normalize_query, sha256
+from app.providers.embedding_registry import get_embedding_provider
+from app.retrieval.bm25 import BM25Index
+from app.retrieval.site_tagging import filterable_site, site_flag
+from app.retrieval.chunk_features import ChunkFeatureStore
 
 
 @dataclass
 class NG12Retriever:
     """
-    Retrieves top-k chunks from Chroma for a query.
+    Retrieves top-k chunks from the vector store (Chroma, NumPy or snapshot) for a query.
 
     Returns:
       hits: [{id, document, metadata, distance, score}]
-      debug: {count, top_score, k_score, query}
+      debug: {count, top_score, k_score, query, cache_hit, site_filter, site_fallback}
+
+    If a cache is supplied, results are memoized on
+    (normalized query, top_k, index version) for cache_ttl_s seconds,
+    skipping both the embedding call and the store query.
+
+    Hybrid mode (bm25_path set and present on disk):
+      vector top-N and BM25 top-N (N = top_k * hybrid_candidates) are fused with
+      reciprocal-rank fusion: rrf = sum(1 / (rrf_k + rank)).
+      `score` stays the vector similarity (used for evidence gating);
+      `rrf_score` decides the order.
+
+    Site filter (site=lung | upper_gi | ...; "general" = no filter):
+      both the vector and the BM25 candidates are restricted to chunks tagged
+      site_<site>=True at ingest. If the filtered result is thin (fewer than
+      top_k hits, or top score below site_min_score) the query is re-run on the
+      full corpus and the stronger of the two results is kept.
+
+    Diversity (mmr=True):
+      the candidate pool (top_k * hybrid_candidates) is reduced to top_k by
+      maximal marginal relevance: each pick maximizes
+        mmr_lambda * relevance - (1 - mmr_lambda) * max similarity to picks so far
+      with cosine similarity of the stored embeddings, raised to
+      mmr_adjacency_sim for chunks adjacent on the same page (prev_id/next_id
+      metadata), whose text overlaps by construction.
+
+    Async (aretrieve / aretrieve_many): same results and cache; the query
+    embedding is awaited (provider aembed_texts) and the CPU-bound store query,
+    fusion and MMR run in a worker thread, so the event loop never blocks.
+
+    Hits whose id is in the ingest-time feature sidecar (features_path, or the
+    features embedded in an index snapshot) carry
+    `features` (see app/retrieval/chunk_features.py) for the assessor reranker.
     """
-    store: ChromaVectorStore
-    embedding_provider: str = "vertex"  # kept for compatibility with Container
+    store: VectorIndex
+    embedding_provider: str = "vertex"  # EMBEDDING_PROVIDER key (vertex | local)
     top_k_default: int = 5
+    cache: Optional[Cache] = None
+    cache_ttl_s: int = 300
+    bm25_path: Optional[str] = None
+    rrf_k: int = 60
+    hybrid_candidates: int = 3
+    site_filter: bool = True
+    site_min_score: float = 0.0
+    features_path: Optional[str] = None
+    mmr: bool = True
+    mmr_lambda: float = 0.7
+    mmr_adjacency_sim: float = 0.9
 
     def __post_init__(self) -> None:
-        # For now we only support Vertex embedding provider as your ingest script uses it.
-        # If you later add another provider, branch here.
-        self._embedder = VertexEmbeddingProvider()
+        # Must match the provider used by scripts/ingest_ng12.py. The registry wraps it in the
+        # embedding cache (EMBEDDING_CACHE_ENABLED); whole results are memoized separately in self.cache.
+        self._embedder = get_embedding_provider(self.embedding_provider)
+
+        self._bm25: Optional[BM25Index] = None
+        self._bm25_mtime: Optional[float] = None
+        self._site_ids: Dict[Tuple[str, str], List[str]] = {}
+        # an index snapshot carries its own features; otherwise read the ingest sidecar
+        embedded = getattr(self.store, "chunk_features", None)
+        self._features = (
+            ChunkFeatureStore.from_payload(embedded()) if callable(embedded) else ChunkFeatureStore(self.features_path)
+        )
+
+    def _lexical_index(self) -> Optional[BM25Index]:
+        """Load (or reload after a re-ingest) the BM25 index; None if hybrid is off."""
+        if not self.bm25_path:
+            return None
+        try:
+            mtime = Path(self.bm25_path).stat().st_mtime
+        except OSError:
+            self._bm25, self._bm25_mtime = None, None
+            return None
+        if mtime != self._bm25_mtime:
+            self._bm25 = BM25Index.load(self.bm25_path)
+            self._bm25_mtime = mtime
+        return self._bm25
 
     @staticmethod
     def _distance_to_score(distance: float) -> float:
@@ -39,33 +114,288 @@ class NG12Retriever:
             d = 999999.0
         return 1.0 / (1.0 + max(0.0, d))
 
-    def retrieve(self, query: str, top_k: Optional[int] = None) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    def index_version(self) -> str:
+        fn = getattr(self.store, "index_version", None)
+        return str(fn()) if callable(fn) else "unversioned"
+
+    def _cache_key(self, q: str, k: int, site: Optional[str] = None) -> str:
+        # whitespace-insensitive: "Visible  haematuria" and "visible haematuria" share an entry
+        q_key = " ".join(q.split())
+        return "retrieve:" + sha256(json.dumps([q_key, k, site or "", self.index_version()]))
+
+    def cache_stats(self) -> Dict[str, Any]:
+        fn = getattr(self.cache, "stats", None)
+        return fn() if callable(fn) else {}
+
+    @staticmethod
+    def _empty_debug(q: str) -> Dict[str, Any]:
+        return {"count": 0, "top_score": 0.0, "k_score": 0.0, "query": q}
+
+    def _ids_where(self, where: Dict[str, Any]) -> Optional[List[str]]:
+        """Chunk ids matching a site filter (memoized per index version); None if unsupported."""
+        fn = getattr(self.store, "ids_where", None)
+        if not callable(fn):
+            return None
+        key = (self.index_version(), json.dumps(where, sort_keys=True))
+        ids = self._site_ids.get(key)
+        if ids is None:
+            ids = list(fn(where))
+            self._site_ids = {key: ids, **{k: v for k, v in self._site_ids.items() if k[0] == key[0]}}
+        return ids
+
+    def retrieve(
+        self, query: str, top_k: Optional[int] = None, site: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        return self.retrieve_many([query], top_k, site=site)[0]
+
+    def retrieve_many(
+        self, queries: List[str], top_k: Optional[int] = None, site: Optional[str] = None
+    ) -> List[Tuple[List[Dict[str, Any]], Dict[str, Any]]]:
+        """
+        Batched retrieval: one (hits, debug) pair per query, in input order.
+
+        Cache hits are served directly; all remaining queries are embedded in a
+        single embed_texts call and sent to the store as one batched query.
+        Identical (normalized) queries inside a batch are computed once.
+        `site` (optional) applies the site filter to every query in the batch.
+        """
+        k, site_key, results, todo = self._from_cache(queries, top_k, site)
+        if todo:
+            uniq = list(todo.keys())
+            computed = self._retrieve_uncached_many(uniq, k, site_key, self._embedder.embed_texts(uniq) or [])
+            self._fill(results, todo, computed, k, site_key)
+        return [r if r is not None else ([], self._empty_debug("")) for r in results]
+
+    async def aretrieve(
+        self, query: str, top_k: Optional[int] = None, site: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        return (await self.aretrieve_many([query], top_k, site=site))[0]
+
+    async def aretrieve_many(
+        self, queries: List[str], top_k: Optional[int] = None, site: Optional[str] = None
+    ) -> List[Tuple[List[Dict[str, Any]], Dict[str, Any]]]:
+        k, site_key, results, todo = self._from_cache(queries, top_k, site)
+        if todo:
+            uniq = list(todo.keys())
+            q_embs = await call_async(self._embedder, "embed_texts", uniq) or []
+            computed = await asyncio.to_thread(self._retrieve_uncached_many, uniq, k, site_key, q_embs)
+            self._fill(results, todo, computed, k, site_key)
+        return [r if r is not None else ([], self._empty_debug("")) for r in results]
+
+    def _from_cache(self, queries: List[str], top_k: Optional[int], site: Optional[str]):
+        """(k, site key, result slots filled from the cache, {normalized query: positions} to compute)."""
         k = int(top_k or self.top_k_default or 5)
-        q = normalize_query(query or "")
+        site_key = filterable_site(site) if self.site_filter else None
+        qs = [normalize_query(x or "") for x in (queries or [])]
+        results: List[Optional[Tuple[List[Dict[str, Any]], Dict[str, Any]]]] = [None] * len(qs)
 
-        if not q.strip():
-            return [], {"count": 0, "top_score": 0.0, "k_score": 0.0, "query": q}
+        todo: Dict[str, List[int]] = {}
+        for i, q in enumerate(qs):
+            if not q.strip():
+                results[i] = ([], self._empty_debug(q))
+                continue
 
-        # Embed query
-        q_embs = self._embedder.embed_texts([q])
-        if not q_embs or not q_embs[0]:
-            return [], {"count": 0, "top_score": 0.0, "k_score": 0.0, "query": q}
+            if self.cache is not None:
+                cached = self.cache.get(self._cache_key(q, k, site_key))
+                if cached is not None:
+                    hits, debug = cached
+                    # callers annotate hits/debug downstream; never hand out the cached objects
+                    results[i] = ([dict(h) for h in hits], {**debug, "cache_hit": True})
+                    continue
 
-        # Query store
-        hits = self.store.query(query_embedding=q_embs[0], top_k=k) or []
+            todo.setdefault(q, []).append(i)
 
+        return k, site_key, results, todo
+
+    def _fill(self, results, todo: Dict[str, List[int]], computed, k: int, site_key: Optional[str]) -> None:
+        for q, (hits, debug) in zip(todo.keys(), computed):
+            if self.cache is not None:
+                if hits:
+                    self.cache.set(self._cache_key(q, k, site_key), ([dict(h) for h in hits], dict(debug)), self.cache_ttl_s)
+                debug = {**debug, "cache_hit": False}
+            for i in todo[q]:
+                results[i] = ([dict(h) for h in hits], dict(debug))
+
+    def _query_store_many(
+        self, q_embs: List[List[float]], n: int, where: Optional[Dict[str, Any]] = None
+    ) -> List[List[Dict[str, Any]]]:
+        if not q_embs:
+            return []
+        kwargs = {"where": where} if where else {}
+        query_many = getattr(self.store, "query_many", None)
+        if callable(query_many):
+            return query_many(query_embeddings=q_embs, top_k=n, **kwargs)
+        return [self.store.query(query_embedding=e, top_k=n, **kwargs) or [] for e in q_embs]
+
+    def _thin(self, debug: Dict[str, Any], k: int) -> bool:
+        return int(debug.get("count", 0)) < k or float(debug.get("top_score", 0.0)) < self.site_min_score
+
+    def _retrieve_uncached_many(
+        self, qs: List[str], k: int, site: Optional[str], q_embs: List[List[float]]
+    ) -> List[Tuple[List[Dict[str, Any]], Dict[str, Any]]]:
+        """qs were embedded by the caller in one call (q_embs, same order)."""
+        where = {site_flag(site): True} if site else None
+
+        valid = [i for i in range(len(qs)) if i < len(q_embs) and q_embs[i]]
+
+        bm25 = self._lexical_index()
+        n_cand = k * max(1, int(self.hybrid_candidates)) if (bm25 is not None or self.mmr) else k
+        restrict = self._ids_where(where) if where else None
+
+        # Query store (one batched call)
+        store_hits = dict(zip(valid, self._query_store_many([q_embs[i] for i in valid], n_cand, where)))
+
+        out: List[Tuple[List[Dict[str, Any]], Dict[str, Any]]] = []
+        for i, q in enumerate(qs):
+            if i not in store_hits:
+                out.append(([], self._empty_debug(q)))
+                continue
+            out.append(self._finalize(q, q_embs[i], store_hits[i] or [], bm25, n_cand, k, restrict))
+
+        if not where:
+            return out
+
+        # thin filtered results: re-run those queries on the full corpus (one batched call)
+        thin = [i for i in valid if self._thin(out[i][1], k)]
+        full_hits = dict(zip(thin, self._query_store_many([q_embs[i] for i in thin], n_cand)))
+        for i in valid:
+            hits, debug = out[i]
+            debug["site_filter"] = site
+            debug["site_fallback"] = False
+            if i in full_hits:
+                f_hits, f_debug = self._finalize(qs[i], q_embs[i], full_hits[i] or [], bm25, n_cand, k)
+                if (f_debug["count"], f_debug["top_score"]) > (debug["count"], debug["top_score"]):
+                    out[i] = (f_hits, {**f_debug, "site_filter": site, "site_fallback": True})
+        return out
+
+    def _finalize(
+        self,
+        q: str,
+        q_emb: List[float],
+        hits: List[Dict[str, Any]],
+        bm25: Optional[BM25Index],
+        n_cand: int,
+        k: int,
+        restrict: Optional[List[str]] = None,
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
         # Add score field (derived from distance) for downstream logic
         for h in hits:
             dist = h.get("distance", 999999.0)
             h["score"] = self._distance_to_score(dist)
 
-        top_score = float(hits[0]["score"]) if hits else 0.0
-        k_score = float(hits[-1]["score"]) if hits else 0.0
+        mode = "vector"
+        lexical_count = 0
+        if bm25 is not None:
+            lexical = bm25.search(q, n_cand, restrict_ids=restrict)
+            lexical_count = len(lexical)
+            hits = self._fuse(hits, lexical, q_emb, n_cand if self.mmr else k)
+            mode = "hybrid_rrf"
+
+        candidates = len(hits)
+        hits = self._diversify(hits, k) if self.mmr else hits[:k]
+        self._features.attach(hits)
+        scores = [float(h.get("score", 0.0)) for h in hits]
 
         debug = {
             "count": len(hits),
-            "top_score": top_score,
-            "k_score": k_score,
+            "top_score": max(scores) if scores else 0.0,
+            "k_score": min(scores) if scores else 0.0,
             "query": q,
+            "mode": mode,
         }
+        if bm25 is not None:
+            debug["lexical_count"] = lexical_count
+        if self.mmr:
+            debug["mmr_candidates"] = candidates
         return hits, debug
+
+    def _diversify(self, hits: List[Dict[str, Any]], k: int) -> List[Dict[str, Any]]:
+        """Maximal-marginal-relevance pick of k hits from the ranked candidate list."""
+        m = len(hits)
+        if m <= k:
+            return hits
+
+        ids = [str(h.get("id") or "") for h in hits]
+        rel = np.asarray([float(h.get("rrf_score", h.get("score", 0.0))) for h in hits], dtype=np.float64)
+        top = float(rel.max())
+        if top > 0:
+            rel = rel / top
+
+        getter = getattr(self.store, "get_embeddings", None)
+        E = np.asarray(getter(ids), dtype=np.float64) if callable(getter) else np.zeros((m, 0))
+        if E.size:
+            norms = np.linalg.norm(E, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            E = E / norms
+            S = E @ E.T
+        else:
+            S = np.zeros((m, m))
+
+        pos = {cid: i for i, cid in enumerate(ids)}
+        for i, h in enumerate(hits):
+            meta = h.get("metadata") or {}
+            for nb in (meta.get("prev_id"), meta.get("next_id")):
+                j = pos.get(nb) if nb else None
+                if j is not None:
+                    S[i, j] = S[j, i] = max(S[i, j], self.mmr_adjacency_sim)
+
+        lam = float(self.mmr_lambda)
+        first = int(np.argmax(rel))
+        picked = [first]
+        taken = np.zeros(m, dtype=bool)
+        taken[first] = True
+        max_sim = S[:, first].copy()
+        while len(picked) < k:
+            mmr = lam * rel - (1.0 - lam) * max_sim
+            mmr[taken] = -np.inf
+            j = int(np.argmax(mmr))
+            picked.append(j)
+            taken[j] = True
+            max_sim = np.maximum(max_sim, S[:, j])
+        return [hits[i] for i in picked]
+
+    def _fuse(
+        self,
+        vector_hits: List[Dict[str, Any]],
+        lexical: List[Tuple[str, float]],
+        q_emb: List[float],
+        k: int,
+    ) -> List[Dict[str, Any]]:
+        """Reciprocal-rank fusion of vector hits and BM25 (id, score) pairs."""
+        by_id: Dict[str, Dict[str, Any]] = {}
+        rrf: Dict[str, float] = {}
+
+        for rank, h in enumerate(vector_hits, start=1):
+            cid = str(h.get("id") or "")
+            if not cid:
+                continue
+            by_id[cid] = h
+            h["vector_rank"] = rank
+            rrf[cid] = rrf.get(cid, 0.0) + 1.0 / (self.rrf_k + rank)
+
+        bm25_scores: Dict[str, float] = {}
+        for rank, (cid, s) in enumerate(lexical, start=1):
+            bm25_scores[cid] = s
+            rrf[cid] = rrf.get(cid, 0.0) + 1.0 / (self.rrf_k + rank)
+
+        ranked = sorted(rrf.items(), key=lambda x: x[1], reverse=True)[:k]
+
+        # lexical-only winners: fetch text + similarity from the store
+        missing = [cid for cid, _ in ranked if cid not in by_id]
+        if missing:
+            getter = getattr(self.store, "get", None)
+            fetched = getter(missing, query_embedding=q_emb) if callable(getter) else []
+            for h in fetched:
+                h["score"] = self._distance_to_score(h.get("distance", 999999.0))
+                by_id[str(h.get("id"))] = h
+
+        out: List[Dict[str, Any]] = []
+        for cid, fused in ranked:
+            h = by_id.get(cid)
+            if h is None:
+                continue
+            h["rrf_score"] = fused
+            if cid in bm25_scores:
+                h["bm25_score"] = bm25_scores[cid]
+            out.append(h)
+        return out
@@ -0,0 +1,58 @@
+# app/retrieval/phrase_matcher.py
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Iterable, List, Set, Tuple
+
+import ahocorasick
+
+from app.retrieval.lexicon import all_phrases
+
+
+class PhraseMatcher:
+    """
+    Compiled multi-pattern substring matcher (Aho-Corasick, pyahocorasick).
+
+    Built once from a phrase list; one pass over the text reports every phrase
+    occurrence, including overlapping and nested ones ("visible haematuria"
+    also reports "haematuria"). Matching is case-sensitive: callers pass
+    lower-cased / normalized text, exactly what the old `phrase in text`
+    scans compared against.
+
+    Pattern ids are positions in `phrases`.
+    """
+
+    def __init__(self, phrases: Iterable[str]) -> None:
+        self.phrases: Tuple[str, ...] = tuple(dict.fromkeys(p for p in phrases if p))
+
+        self._automaton = ahocorasick.Automaton()
+        for i, p in enumerate(self.phrases):
+            self._automaton.add_word(p, i)
+        if self.phrases:
+            self._automaton.make_automaton()
+
+    def match_ids(self, text: str) -> Set[int]:
+        """Ids of all phrases occurring in `text` (one pass)."""
+        if not text or not self.phrases:
+            return set()
+        return {pid for _, pid in self._automaton.iter(text)}
+
+    def match(self, text: str) -> Set[str]:
+        return {self.phrases[i] for i in self.match_ids(text)}
+
+    def spans(self, text: str) -> List[Tuple[int, int, str]]:
+        """Every occurrence as (start, end, phrase), end exclusive, in order of end position."""
+        if not text or not self.phrases:
+            return []
+        out: List[Tuple[int, int, str]] = []
+        for last, pid in self._automaton.iter(text):
+            p = self.phrases[pid]
+            out.append((last + 1 - len(p), last + 1, p))
+        return out
+
+
+@lru_cache(maxsize=1)
+def lexicon_matcher() -> PhraseMatcher:
+    """Process-wide matcher over the central lexicon (app/retrieval/lexicon.py)."""
+    return PhraseMatcher(all_phrases())
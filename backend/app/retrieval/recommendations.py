@@ -0,0 +1,617 @@
+# app/retrieval/recommendations.py
+
+from __future__ import annotations
+
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.domain.models import Patient
+from app.retrieval.lexicon import SYMPTOM_TERMS
+from app.retrieval.phrase_matcher import PhraseMatcher, lexicon_matcher
+from app.retrieval.site_tagging import SECTION_SITES
+
+RULES_VERSION = 3
+
+# "1.1.1 Refer people using a suspected cancer pathway referral for lung cancer if they:"
+_REC_START_RE = re.compile(r"^(1\.(\d{1,2})\.(\d{1,2}))\s+(\S.*)$")
+# "[2015]" / "[2015, amended 2025]" closes a recommendation
+_YEAR_RE = re.compile(r"\[(\d{4})[^\]]*\]")
+_SECTION_HEADING_RE = re.compile(r"^1\.\d{1,2}\s+[A-Z][a-z]")
+# page furniture left by clean_text (the footer wraps over several lines)
+_NOISE_RE = re.compile(
+    r"^(suspected cancer: recognition and referral|conditions#notice-of-rights|page \d+ of$|\d+$)",
+    re.IGNORECASE,
+)
+_BULLET = "•"
+_SUB_BULLETS = ("－", "-", "–")
+
+_AGE_MIN_RE = re.compile(r"\baged (\d{1,2}) (?:and|or) over\b")
+_AGE_UNDER_RE = re.compile(r"\baged under (\d{1,2})\b")
+_AGE_RANGE_RE = re.compile(r"\baged (\d{1,2}) to (\d{1,2})\b")
+# where the symptom part of a clause starts: "... with X", "... have X", "... reports X"
+_CLAUSE_RE = re.compile(r"\b(?:with|have|has|having|reports?)\b")
+_FOLLOWING_RE = re.compile(r"\b(\d+ or more|any|either|one or more|all) of the following")
+_MIN_N_RE = re.compile(r"\b(\d+) or more of the following")
+_SMOKER_N_RE = re.compile(r"ever smoked and (?:have|has) (\d+) or more")
+_CANCER_RE = re.compile(
+    r"\bfor ((?:suspected )?[a-z'’ -]{0,40}?(?:cancers?|mesothelioma|myeloma|lymphoma|leukaemia|melanoma|sarcoma|tumours?|carcinoma))\b"
+)
+
+# negated / conditional context is not a required symptom:
+# "visible haematuria without urinary tract infection or ..." -> "visible haematuria or ..."
+_NEGATION_RE = re.compile(r"\b(?:without|after|despite|except|in the absence of)\b.*?(?=\bor\b|$)")
+_STOPWORDS = frozenset(
+    "a an the or and if in of to who that they are is be their people person adults children "
+    "young with have has having report reports presenting unexplained persistent symptoms either any both following".split()
+)
+# "breast lump with or without pain": the alternative is not a requirement
+_WITH_OR_WITHOUT_RE = re.compile(r"\bwith or without\b.*?(?=\bor\b|$)")
+_EVER_SMOKED_RE = re.compile(r"\b(?:have|has) ever smoked\b")
+_FEMALE_RE = re.compile(r"\b(?:wom[ae]n|female|postmenopausal)\b")
+_MALE_RE = re.compile(r"\b(?:m[ae]n|male)\b")
+_MALE_CANCERS = ("prostate", "testicular", "penile")
+
+_ACTIONS = ("refer", "offer", "consider")
+_SPELLINGS = (
+    (re.compile(r"\bhemo"), "haemo"),
+    (re.compile(r"\bhematuria"), "haematuria"),
+    (re.compile(r"\banemia"), "anaemia"),
+    (re.compile(r"\besophag"), "oesophag"),
+)
+_QUALIFIERS = ("unexplained ",)
+
+# patient-side matching: a rule term counts only as a whole token run ("breast lump" is not in
+# "breast lumpectomy", "visible haematuria" is not in "non-visible haematuria") and not negated.
+_WORD_CHAR_RE = re.compile(r"[a-z0-9-]")
+# the negation scope of a symptom string ends at a sentence break or "but"; commas do not end it
+# ("denies nausea, vomiting and dysphagia"), so a negated list is dropped whole
+_SCOPE_BREAK_RE = re.compile(r"[.;]|\bbut\b")
+_NEGATED_BEFORE_RE = re.compile(
+    r"\b(?:no|not|nil|never|denies|denied|deny|without|negative for|free of|absence of)\b|\bnon\s"
+)
+_NEGATED_AFTER_RE = re.compile(r"\b(?:resolved|resolving|settled|absent|denied|ruled out|excluded|negative)\b")
+
+
+def normalize_term(s: str) -> str:
+    """Lower-case, UK spelling, single spaces: shared by rule terms and patient symptoms."""
+    t = " ".join((s or "").lower().split())
+    for us, uk in _SPELLINGS:
+        t = us.sub(uk, t)
+    return t
+
+
+def _clean_item(s: str) -> str:
+    t = normalize_term(_YEAR_RE.sub(" ", s))
+    t = re.sub(r"[.:;,]+$", "", t).strip()
+    t = re.sub(r"\s+(or|and|who|that|if they)$", "", t).strip()
+    t = re.sub(r"^(a|an|the)\s+", "", t)
+    for q in _QUALIFIERS:
+        t = t.replace(q, "")
+    return re.sub(r"^(a|an|the)\s+", "", t.strip())
+
+
+def _symptom_terms(text: str) -> List[str]:
+    """Maximal lexicon symptom terms in text ("unexplained haemoptysis" hides "haemoptysis"), qualifiers dropped."""
+    found = lexicon_matcher().match(normalize_term(text)) & _SYMPTOM_SET
+    maximal = [t for t in found if not any(t != o and t in o for o in found)]
+    out: List[str] = []
+    for t in sorted(maximal):
+        c = _clean_item(t)
+        if c and c not in out:
+            out.append(c)
+    return out
+
+
+_SYMPTOM_SET = frozenset(SYMPTOM_TERMS)
+
+
+def _age_bounds(text: str) -> Tuple[Optional[int], Optional[int]]:
+    """(age_min, age_max), both inclusive; None when the text sets no bound."""
+    t = normalize_term(text)
+    m = _AGE_RANGE_RE.search(t)
+    if m:
+        return int(m.group(1)), int(m.group(2))
+    lo = _AGE_MIN_RE.search(t)
+    hi = _AGE_UNDER_RE.search(t)
+    age_min = int(lo.group(1)) if lo else None
+    age_max = int(hi.group(1)) - 1 if hi else None
+    # NG12 age groups: children are under 16, young people 16 to 24
+    if age_max is None and "children and young people" in t:
+        age_max = 24
+    elif age_max is None and re.search(r"\bchildren\b", t) and "adults" not in t:
+        age_max = 15
+    return age_min, age_max
+
+
+def _clause_text(text: str, keyword: bool = True) -> Optional[str]:
+    """Normalized text after the first "with / have / reports" (None for a stem without one)."""
+    t = normalize_term(_YEAR_RE.sub(" ", text))
+    m = _CLAUSE_RE.search(t)
+    if m:
+        return t[m.end():]
+    return None if keyword else t
+
+
+def _covered(texts: Iterable[str]) -> bool:
+    """
+    True when every content word of a criterion's source text is an age bound or
+    a lexicon symptom term. Anything else - a "with ..." qualifier, a score, a
+    test result, an investigation finding, an exclusion ("without ...") - is a
+    condition the criterion does not check, so a match cannot stand on its own.
+    """
+    for text in texts:
+        t = _WITH_OR_WITHOUT_RE.sub(" ", text)
+        t = _AGE_RANGE_RE.sub(" ", _AGE_MIN_RE.sub(" ", _AGE_UNDER_RE.sub(" ", t)))
+        t = _EVER_SMOKED_RE.sub(" ", _FOLLOWING_RE.sub(" ", t))
+        for term in sorted(lexicon_matcher().match(t) & _SYMPTOM_SET, key=len, reverse=True):
+            t = re.sub(rf"(?<![a-z0-9-]){re.escape(term)}(?![a-z0-9-])", " ", t)
+        if any(w not in _STOPWORDS for w in re.findall(r"[a-z0-9][a-z0-9'-]*", t)):
+            return False
+    return True
+
+
+def _exclusions(texts: Iterable[str]) -> List[str]:
+    """Negated / conditional qualifiers the symptom groups drop ("without urinary tract infection")."""
+    out: List[str] = []
+    for text in texts:
+        for m in _NEGATION_RE.finditer(_WITH_OR_WITHOUT_RE.sub(" ", text)):
+            q = _clean_item(m.group(0))
+            if q and q not in out:
+                out.append(q)
+    return out
+
+
+def _unique_groups(groups: Iterable[List[str]]) -> List[List[str]]:
+    """Groups in order, repeats dropped (two bullets can reduce to the same term once qualifiers go)."""
+    out: List[List[str]] = []
+    for g in groups:
+        if g not in out:
+            out.append(g)
+    return out
+
+
+def _clause_groups(text: str, keyword: bool = True) -> List[List[str]]:
+    """
+    Required symptom groups of a clause: the first sentence after "with / have / reports",
+    cut at "... of the following", negations dropped, split on " and "; each part's
+    terms are alternatives. A part with content words but no lexicon term becomes a
+    literal term, so an unrecognised requirement narrows the rule instead of vanishing.
+    Stems need the keyword ("Refer people ... if they:" has no requirement); bullets
+    ("persistent unexplained hoarseness or") do not.
+    """
+    t = _clause_text(text, keyword)
+    if t is None:
+        return []
+    t = re.split(r"\.(?:\s|$)", t, maxsplit=1)[0]
+    f = _FOLLOWING_RE.search(t)
+    if f:
+        t = t[: f.start()]
+    t = _NEGATION_RE.sub(" ", t)
+    groups: List[List[str]] = []
+    for part in re.split(r"\band\b", t):
+        part = _AGE_RANGE_RE.sub(" ", _AGE_MIN_RE.sub(" ", _AGE_UNDER_RE.sub(" ", part)))
+        terms = _symptom_terms(part)
+        if terms:
+            groups.append(terms)
+        elif any(w not in _STOPWORDS for w in re.findall(r"[a-z][a-z'-]+", part)):
+            literal = _clean_item(part)
+            if literal:
+                groups.append([literal])
+    return groups
+
+
+def _item_terms(text: str) -> List[str]:
+    """Alternatives for one listed symptom: its lexicon terms, else the item text itself."""
+    text = _NEGATION_RE.sub(" ", normalize_term(text))
+    return _symptom_terms(text) or ([c] if (c := _clean_item(text)) else [])
+
+
+def _action(stem: str) -> str:
+    t = normalize_term(stem)
+    first = t.split(" ", 1)[0] if t else ""
+    for a in _ACTIONS:
+        if first.startswith(a):
+            return a
+    positions = [(t.find(a), a) for a in _ACTIONS if t.find(a) != -1]
+    return min(positions)[1] if positions else "other"
+
+
+def _timeframe(text: str) -> str:
+    t = normalize_term(text)
+    if "very urgent" in t or "within 48 hours" in t:
+        return "48_hours"
+    if "suspected cancer pathway" in t:
+        return "suspected_cancer_pathway"
+    if "non-urgent" in t:
+        return "non_urgent"
+    if "urgent" in t or "within 2 weeks" in t:
+        return "2_weeks"
+    return ""
+
+
+def _criterion(
+    text: str,
+    age: Tuple[Optional[int], Optional[int]],
+    all_of: List[List[str]],
+    any_of: List[List[str]],
+    min_any: int = 1,
+    min_any_smoker: Optional[int] = None,
+    sources: Iterable[str] = (),
+) -> Optional[Dict[str, Any]]:
+    # a criterion with no symptom terms would match on age alone: not a lookup rule
+    if not all_of and not any_of:
+        return None
+    sources = list(sources)
+    all_of = _unique_groups(all_of)
+    any_of = _unique_groups(g for g in any_of if g not in all_of)
+    exclusions = _exclusions(sources)
+    return {
+        "text": " ".join(text.split()),
+        "age_min": age[0],
+        "age_max": age[1],
+        "all_of": all_of,
+        "any_of": any_of,
+        "min_any": min_any if any_of else 0,
+        "min_any_smoker": min_any_smoker if any_of else None,
+        "exclusions": exclusions,
+        # every condition in the source text is modelled above (see _covered); an exclusion is not
+        "bypass": not exclusions and _covered(sources),
+    }
+
+
+def _split_blocks(lines: List[str]) -> Tuple[str, List[Tuple[str, List[str]]]]:
+    """(stem, [(bullet, [sub-bullets])]); continuation lines join the open item until it ends a sentence."""
+    stem: List[str] = []
+    bullets: List[Tuple[List[str], List[List[str]]]] = []
+    closed = False
+    for ln in lines:
+        s = ln.strip()
+        if s.startswith(_BULLET):
+            bullets.append(([s[1:].strip()], []))
+            closed = False
+        elif s[:1] in _SUB_BULLETS and bullets:
+            bullets[-1][1].append([s[1:].strip()])
+            closed = False
+        elif closed:
+            continue  # trailing notes after the last item ("FIT should be offered even if ...")
+        elif not bullets:
+            stem.append(s)
+        elif bullets[-1][1]:
+            bullets[-1][1][-1].append(s)
+        else:
+            bullets[-1][0].append(s)
+        if bullets:
+            last = bullets[-1][1][-1] if bullets[-1][1] else bullets[-1][0]
+            closed = last[-1].rstrip().endswith(".")
+    return " ".join(stem), [(" ".join(b), [" ".join(x) for x in subs]) for b, subs in bullets]
+
+
+def _parse_rule(rec_id: str, lines: List[str]) -> Dict[str, Any]:
+    text = "\n".join(lines)
+    body = _YEAR_RE.split(text)[0] if _YEAR_RE.search(text) else text
+    year = _YEAR_RE.search(text)
+    stem, bullets = _split_blocks(body.splitlines())
+    stem_norm = normalize_term(stem)
+    stem_age = _age_bounds(stem)
+
+    stem_clause = _clause_text(stem) or ""
+    criteria: List[Dict[str, Any]] = []
+    following = _FOLLOWING_RE.search(stem_norm)
+    if bullets and following:
+        # stem: "... aged 40 and over with 2 or more of the following:" -> bullets are a symptom list
+        n = _MIN_N_RE.search(stem_norm)
+        smoker = _SMOKER_N_RE.search(stem_norm)
+        c = _criterion(
+            stem,
+            stem_age,
+            _clause_groups(stem),
+            [t for t in (_item_terms(b) for b, _ in bullets) if t],
+            min_any=int(n.group(1)) if n else 1,
+            min_any_smoker=int(smoker.group(1)) if smoker else None,
+            sources=[stem_clause] + [normalize_term(b) for b, _ in bullets],
+        )
+        if c:
+            criteria.append(c)
+    elif bullets:
+        # stem: "Refer people ... if they:" -> each bullet is an alternative criterion
+        # (a stem requirement, "... with vaginal discharge who:", applies to every bullet)
+        stem_groups = _clause_groups(stem)
+        for b, subs in bullets:
+            age = _age_bounds(b)
+            age = (age[0] if age[0] is not None else stem_age[0], age[1] if age[1] is not None else stem_age[1])
+            n = _MIN_N_RE.search(normalize_term(b))
+            c = _criterion(
+                b,
+                age,
+                stem_groups + _clause_groups(b, keyword=False),
+                [t for t in (_item_terms(x) for x in subs) if t],
+                min_any=int(n.group(1)) if n else 1,
+                sources=[stem_clause, normalize_term(b)] + [normalize_term(x) for x in subs],
+            )
+            if c:
+                criteria.append(c)
+    if not criteria:
+        c = _criterion(stem, stem_age, _clause_groups(stem), [], sources=[stem_clause])
+        if c:
+            criteria.append(c)
+
+    section = rec_id.rsplit(".", 1)[0]
+    cancer = _CANCER_RE.search(stem_norm)
+    cancer_name = cancer.group(1).strip() if cancer else ""
+    # the ovarian / endometrial / cervical / vulval / vaginal section applies to women
+    if section == "1.5" or _FEMALE_RE.search(stem_norm):
+        sex = "female"
+    elif _MALE_RE.search(stem_norm) or any(c in cancer_name for c in _MALE_CANCERS):
+        sex = "male"
+    else:
+        sex = ""
+    symptoms: List[str] = []
+    for c in criteria:
+        for g in c["all_of"] + c["any_of"]:
+            symptoms.extend(t for t in g if t not in symptoms)
+
+    return {
+        "rec_id": rec_id,
+        "section": section,
+        "site": SECTION_SITES.get(section, "general"),
+        "cancer": cancer_name,
+        "sex": sex,
+        "action": _action(stem),
+        "timeframe": _timeframe(stem),
+        "age_min": min((c["age_min"] for c in criteria if c["age_min"] is not None), default=None),
+        "symptoms": symptoms,
+        "criteria": criteria,
+        "year": year.group(0) if year else "",
+        "text": " ".join(text.split()),
+    }
+
+
+def _rec_key(rec_id: str) -> Tuple[int, ...]:
+    return tuple(int(x) for x in rec_id.split("."))
+
+
+def _chunk_for(rec_id: str, page: int, ids: List[str], documents: List[str], metadatas: List[Dict[str, Any]]) -> str:
+    """First chunk on `page` (else anywhere, e.g. a collapsed duplicate) whose text starts a line with rec_id."""
+    pat = re.compile(rf"(^|\n){re.escape(rec_id)}\s")
+    fallback = ""
+    for cid, doc, meta in zip(ids, documents, metadatas):
+        if pat.search(doc or ""):
+            if int((meta or {}).get("page") or 0) == page:
+                return cid
+            fallback = fallback or cid
+    return fallback
+
+
+def parse_recommendations(
+    pages: Dict[int, str],
+    ids: List[str],
+    documents: List[str],
+    metadatas: List[Dict[str, Any]],
+) -> List[Dict[str, Any]]:
+    """
+    Rule table for the numbered site recommendations (sections 1.1 - 1.12).
+
+    One rule per recommendation id, in document order:
+      rec_id, section, site, cancer, sex ("" | female | male), action (refer | offer | consider | other),
+      timeframe (suspected_cancer_pathway | 48_hours | 2_weeks | non_urgent | ""),
+      criteria [{age_min, age_max, all_of, any_of, min_any, min_any_smoker, exclusions, bypass}],
+      symptoms, page, chunk_id, text.
+
+    all_of / any_of are lists of alternative terms; a criterion needs every
+    all_of group and at least min_any any_of groups (min_any_smoker for people
+    who have ever smoked, when the recommendation says so). exclusions are the
+    qualifiers the groups leave out ("without urinary tract infection").
+    bypass is False when the source text has a condition the criterion cannot
+    check (exclusion, score, test result, finding, qualifier); such a match is
+    only a hint.
+    Recommendations without symptom terms (test results, examination findings)
+    keep an empty criteria list and never match a lookup.
+    """
+    rules: List[Dict[str, Any]] = []
+    cur: Optional[Tuple[str, int, List[str]]] = None
+    last_key: Tuple[int, ...] = ()
+
+    def close() -> None:
+        if cur:
+            rec_id, page, lines = cur
+            rule = _parse_rule(rec_id, lines)
+            rule["page"] = page
+            rule["chunk_id"] = _chunk_for(rec_id, page, ids, documents, metadatas)
+            rules.append(rule)
+
+    for page in sorted(pages):
+        for ln in (pages[page] or "").splitlines():
+            s = ln.strip()
+            if not s or _NOISE_RE.match(s):
+                continue
+            m = _REC_START_RE.match(s)
+            # ids only increase through the site sections; later cross references ("1.1.1") are not starts
+            if m and m.group(2) in {k.split(".")[1] for k in SECTION_SITES} and _rec_key(m.group(1)) > last_key:
+                close()
+                last_key = _rec_key(m.group(1))
+                cur = (m.group(1), page, [s[len(m.group(1)) :].strip()])
+                continue
+            if cur is None:
+                continue
+            if _SECTION_HEADING_RE.match(s) or _YEAR_RE.search("\n".join(cur[2])):
+                continue  # between recommendations (headings, notes)
+            cur[2].append(s)
+    close()
+    return rules
+
+
+def write_recommendations(path: str | Path, rules: List[Dict[str, Any]], index_version: str = "") -> Path:
+    """Rule table written by scripts/ingest_ng12.py next to the vector store."""
+    p = Path(path)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    payload = {"version": RULES_VERSION, "index_version": index_version, "rules": rules}
+    tmp = p.with_suffix(p.suffix + ".tmp")
+    tmp.write_text(json.dumps(payload, indent=1), encoding="utf-8")
+    tmp.replace(p)
+    return p
+
+
+def _at_boundary(text: str, start: int, end: int) -> bool:
+    return not (start > 0 and _WORD_CHAR_RE.match(text[start - 1])) and not (
+        end < len(text) and _WORD_CHAR_RE.match(text[end])
+    )
+
+
+def _negated(text: str, start: int, end: int) -> bool:
+    before = _SCOPE_BREAK_RE.split(text[:start])[-1]
+    after = _SCOPE_BREAK_RE.split(text[end:], maxsplit=1)[0]
+    return bool(_NEGATED_BEFORE_RE.search(before) or _NEGATED_AFTER_RE.search(after))
+
+
+def _token_spans(matcher: PhraseMatcher, t: str) -> List[Tuple[int, int, str]]:
+    """Whole-token occurrences in normalized text, the longest of overlapping ones kept."""
+    spans = [sp for sp in matcher.spans(t) if _at_boundary(t, sp[0], sp[1])]
+    kept: List[Tuple[int, int, str]] = []
+    for start, end, term in sorted(spans, key=lambda sp: (sp[0] - sp[1], sp[0])):
+        if all(end <= k_start or start >= k_end for k_start, k_end, _ in kept):
+            kept.append((start, end, term))
+    return kept
+
+
+def phrase_matches(matcher: PhraseMatcher, text: str) -> Set[str]:
+    """Terms occurring in text as whole tokens, longest match ("non-visible haematuria" hides "visible haematuria")."""
+    return {term for _, _, term in _token_spans(matcher, normalize_term(text))}
+
+
+def symptom_matches(matcher: PhraseMatcher, symptom: str) -> Set[str]:
+    """
+    Rule terms a patient symptom string asserts: whole-token occurrences only,
+    the longest of overlapping occurrences ("non-visible haematuria" does not
+    also give "visible haematuria"), and none in a negated or resolved phrasing
+    ("no haemoptysis", "denies dysphagia", "dysphagia resolved").
+    """
+    t = normalize_term(symptom)
+    return {term for start, end, term in _token_spans(matcher, t) if not _negated(t, start, end)}
+
+
+def _is_smoker(patient: Patient) -> bool:
+    s = normalize_term(getattr(patient, "smoking_history", "") or "")
+    return bool(s) and not s.startswith("never") and s not in {"no", "none", "non-smoker"}
+
+
+class RecommendationIndex:
+    """
+    In-memory symptom -> recommendation lookup over the ingest rule table.
+
+    Every rule term is a pattern of one Aho-Corasick matcher; a patient's
+    normalized symptoms are scanned once (symptom_matches: whole tokens,
+    longest match, negations dropped), the matched terms select candidate
+    rules through a term -> rule postings map, and only those candidates'
+    criteria (age bounds, all_of / any_of groups) are checked.
+    Reloads after a re-ingest (mtime check), like ChunkFeatureStore.
+    """
+
+    def __init__(self, path: Optional[str | Path]) -> None:
+        self.path = Path(path) if path else None
+        self.rules: List[Dict[str, Any]] = []
+        self.index_version = ""
+        self._matcher: Optional[PhraseMatcher] = None
+        self._postings: Dict[str, Set[int]] = {}
+        self._mtime: Optional[float] = None
+
+    def _load(self) -> None:
+        if self.path is None:
+            return
+        try:
+            mtime = self.path.stat().st_mtime
+        except OSError:
+            self.rules, self._matcher, self._postings, self._mtime = [], None, {}, None
+            return
+        if mtime == self._mtime:
+            return
+        raw = json.loads(self.path.read_text(encoding="utf-8"))
+        rules = (raw.get("rules") or []) if raw.get("version") == RULES_VERSION else []
+        self._build(rules, str(raw.get("index_version") or ""))
+        self._mtime = mtime
+
+    def _build(self, rules: List[Dict[str, Any]], index_version: str = "") -> None:
+        self.rules = list(rules)
+        self.index_version = index_version
+        postings: Dict[str, Set[int]] = {}
+        for i, r in enumerate(self.rules):
+            for c in r.get("criteria") or []:
+                for g in (c.get("all_of") or []) + (c.get("any_of") or []):
+                    for t in g:
+                        postings.setdefault(t, set()).add(i)
+        self._postings = postings
+        self._matcher = PhraseMatcher(postings.keys()) if postings else None
+
+    @classmethod
+    def from_rules(cls, rules: Iterable[Dict[str, Any]]) -> "RecommendationIndex":
+        idx = cls(None)
+        idx._build(list(rules))
+        return idx
+
+    def __len__(self) -> int:
+        self._load()
+        return len(self.rules)
+
+    def age_boundaries(self) -> List[int]:
+        """Sorted ages at which some criterion starts or stops applying (age_min, age_max + 1)."""
+        self._load()
+        out: Set[int] = set()
+        for r in self.rules:
+            for c in r.get("criteria") or []:
+                if c.get("age_min") is not None:
+                    out.add(int(c["age_min"]))
+                if c.get("age_max") is not None:
+                    out.add(int(c["age_max"]) + 1)
+        return sorted(out)
+
+    @staticmethod
+    def _criterion_met(c: Dict[str, Any], age: int, terms: Set[str], smoker: bool) -> bool:
+        if c.get("age_min") is not None and age < int(c["age_min"]):
+            return False
+        if c.get("age_max") is not None and age > int(c["age_max"]):
+            return False
+        if not all(any(t in terms for t in g) for g in c.get("all_of") or []):
+            return False
+        any_of = c.get("any_of") or []
+        if any_of:
+            need = int(c.get("min_any") or 1)
+            if smoker and c.get("min_any_smoker") is not None:
+                need = min(need, int(c["min_any_smoker"]))
+            if sum(1 for g in any_of if any(t in terms for t in g)) < need:
+                return False
+        return True
+
+    def lookup(self, patient: Patient) -> List[Dict[str, Any]]:
+        """
+        Rules the patient meets, in document order:
+          [{"rule": rule, "criterion": met criterion, "terms": matched rule terms}]
+        """
+        self._load()
+        if self._matcher is None:
+            return []
+
+        terms: Set[str] = set()
+        for s in patient.symptoms or []:
+            terms |= symptom_matches(self._matcher, s)
+        if not terms:
+            return []
+
+        candidates: Set[int] = set()
+        for t in terms:
+            candidates |= self._postings.get(t, set())
+
+        age = int(getattr(patient, "age", 0) or 0)
+        smoker = _is_smoker(patient)
+        sex = normalize_term(getattr(patient, "gender", "") or "")
+        out: List[Dict[str, Any]] = []
+        for i in sorted(candidates):
+            rule = self.rules[i]
+            if rule.get("sex") and sex in {"female", "male"} and rule["sex"] != sex:
+                continue
+            for c in rule.get("criteria") or []:
+                if self._criterion_met(c, age, terms, smoker):
+                    used = {t for g in c["all_of"] + c["any_of"] for t in g if t in terms}
+                    out.append({"rule": rule, "criterion": c, "terms": sorted(used)})
+                    break
+        return out
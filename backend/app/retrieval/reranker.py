@@ -0,0 +1,156 @@
+# app/retrieval/reranker.py
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.domain.models import Patient
+from app.retrieval.chunk_features import CRITERIA_FLAGS, SYMPTOM_TERM_SET, hit_features
+from app.retrieval.site_tagging import site_flag
+
+# Feature columns of the rerank matrix (hits x features), in order
+RERANK_FEATURES: Tuple[str, ...] = (
+    "score",  # vector similarity from the retriever
+    "has_criteria",  # ingest metadata flag
+    "symptom_table",  # "symptom and specific features" + "recommendation"
+    "suspected_pathway",
+    "action_verb",  # refer / consider / offer
+    "symptom_terms",  # patient symptoms found in the chunk (capped at MAX_TERM_HITS)
+    "haemoptysis",
+    "unexplained_haemoptysis",
+    "site_tagged",  # chunk tagged with the suspected site at ingest
+    "site_text",  # untagged chunks: site word in text
+    "site_lung_text",  # untagged chunks, site=lung: "lung" / "respiratory" in text
+    "boilerplate",
+)
+
+DEFAULT_RERANK_WEIGHTS: Dict[str, float] = {
+    "score": 1.0,
+    "has_criteria": 0.22,
+    "symptom_table": 0.16,
+    "suspected_pathway": 0.12,
+    "action_verb": 0.08,
+    "symptom_terms": 0.03,
+    "haemoptysis": 0.18,
+    "unexplained_haemoptysis": 0.10,
+    "site_tagged": 0.12,
+    "site_text": 0.06,
+    "site_lung_text": 0.06,
+    "boilerplate": -0.35,
+}
+
+MAX_TERM_HITS = 6  # symptom_terms contributes at most 6 * 0.03 = 0.18 with default weights
+MAX_PATIENT_TERMS = 14
+
+# CRITERIA_FLAGS bits copied straight into feature columns
+_FLAG_COLUMNS: Tuple[Tuple[int, int], ...] = tuple(
+    (CRITERIA_FLAGS.index(name), RERANK_FEATURES.index(name))
+    for name in ("symptom_table", "suspected_pathway", "action_verb", "haemoptysis", "unexplained_haemoptysis")
+)
+_LUNG_BIT = CRITERIA_FLAGS.index("lung_or_respiratory")
+
+
+def load_rerank_weights(path: Optional[str | Path] = None) -> Dict[str, float]:
+    """Defaults, overridden by a JSON object {feature: weight} at `path` (RERANK_WEIGHTS_PATH)."""
+    weights = dict(DEFAULT_RERANK_WEIGHTS)
+    if path:
+        raw = json.loads(Path(path).read_text(encoding="utf-8"))
+        unknown = sorted(set(raw) - set(RERANK_FEATURES))
+        if unknown:
+            raise ValueError(f"Unknown rerank features in {path}: {unknown} (expected {list(RERANK_FEATURES)})")
+        weights.update({k: float(v) for k, v in raw.items()})
+    return weights
+
+
+def _norm(s: str) -> str:
+    return " ".join((s or "").lower().split())
+
+
+class HitReranker:
+    """
+    Linear reranker over precomputed chunk features.
+
+    For a batch of (hits, patient, suspected_site) requests, every hit of every
+    request becomes one row of a [total_hits, len(RERANK_FEATURES)] matrix; the
+    scores are a single matrix-vector product with the weight vector, then
+    split back per request. Boilerplate hits are dropped unless a request has
+    nothing else, and each list is returned best-first.
+    """
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None) -> None:
+        w = {**DEFAULT_RERANK_WEIGHTS, **(weights or {})}
+        self.weights = w
+        self._w = np.asarray([w[name] for name in RERANK_FEATURES], dtype=np.float64)
+
+    @staticmethod
+    def _patient_terms(patient: Patient) -> List[str]:
+        return [t for t in (_norm(s) for s in (patient.symptoms or [])) if t][:MAX_PATIENT_TERMS]
+
+    @staticmethod
+    def _term_hits(f: Dict[str, Any], terms: List[str]) -> int:
+        # lexicon terms are looked up; anything else scans the normalized text
+        return sum(1 for t in terms if t in f["terms"] or (t not in SYMPTOM_TERM_SET and t in f["norm"]))
+
+    def features(self, hits: List[Dict[str, Any]], patient: Patient, suspected_site: str) -> np.ndarray:
+        """[len(hits), len(RERANK_FEATURES)] feature matrix for one request."""
+        X = np.zeros((len(hits), len(RERANK_FEATURES)), dtype=np.float64)
+        if not hits:
+            return X
+
+        feats = [hit_features(h) for h in hits]
+        metas = [h.get("metadata") or {} for h in hits]
+        flags = np.fromiter((int(f["flags"]) for f in feats), dtype=np.int64, count=len(hits))
+
+        X[:, 0] = [float(h.get("score", 0.0)) for h in hits]
+        X[:, 1] = [1.0 if bool(m.get("has_criteria", False)) else 0.0 for m in metas]
+        for bit, col in _FLAG_COLUMNS:
+            X[:, col] = (flags >> bit) & 1
+
+        terms = self._patient_terms(patient)
+        if terms:
+            X[:, 5] = [min(MAX_TERM_HITS, self._term_hits(f, terms)) for f in feats]
+
+        site = (suspected_site or "").lower().strip()
+        if site and site != "general":
+            key = site_flag(site)
+            for i, (m, f) in enumerate(zip(metas, feats)):
+                tagged = m.get(key)
+                if tagged is not None:
+                    X[i, 8] = 1.0 if tagged else 0.0
+                else:
+                    X[i, 9] = 1.0 if site in f["norm"] else 0.0
+                    X[i, 10] = 1.0 if (site == "lung" and (int(f["flags"]) >> _LUNG_BIT) & 1) else 0.0
+
+        X[:, 11] = [1.0 if f["boilerplate"] else 0.0 for f in feats]
+        return X
+
+    def score_many(self, requests: Sequence[Tuple[List[Dict[str, Any]], Patient, str]]) -> List[np.ndarray]:
+        """One score vector per request, from a single stacked matrix-vector product."""
+        mats = [self.features(hits, patient, site) for hits, patient, site in requests]
+        if not mats:
+            return []
+        scores = np.vstack(mats) @ self._w
+        bounds = np.cumsum([m.shape[0] for m in mats])[:-1]
+        return list(np.split(scores, bounds))
+
+    def rerank_many(
+        self, requests: Sequence[Tuple[List[Dict[str, Any]], Patient, str]]
+    ) -> List[List[Dict[str, Any]]]:
+        pools: List[Tuple[List[Dict[str, Any]], Patient, str]] = []
+        for hits, patient, site in requests:
+            hits = hits or []
+            filtered = [h for h in hits if not hit_features(h)["boilerplate"]]
+            pools.append((filtered if filtered else hits, patient, site))
+
+        out: List[List[Dict[str, Any]]] = []
+        for (pool, _, _), scores in zip(pools, self.score_many(pools)):
+            order = np.argsort(-scores, kind="stable")
+            out.append([pool[int(i)] for i in order])
+        return out
+
+    def rerank(self, hits: List[Dict[str, Any]], patient: Patient, suspected_site: str) -> List[Dict[str, Any]]:
+        return self.rerank_many([(hits, patient, suspected_site)])[0]
@@ -0,0 +1,126 @@
+# app/retrieval/site_tagging.py
+
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+# Site buckets used by the assessor (plan_query_with_agent); "general" means no filter
+SITE_BUCKETS: Tuple[str, ...] = ("lung", "upper_gi", "colorectal", "breast", "urology", "head_neck", "general")
+
+# NG12 "Recommendations organised by site of cancer" sections -> site tag.
+# Sections outside the assessor buckets keep a descriptive tag (no filter flag).
+SECTION_SITES: Dict[str, str] = {
+    "1.1": "lung",
+    "1.2": "upper_gi",
+    "1.3": "colorectal",
+    "1.4": "breast",
+    "1.5": "gynaecological",
+    "1.6": "urology",
+    "1.7": "skin",
+    "1.8": "head_neck",
+    "1.9": "brain_cns",
+    "1.10": "haematological",
+    "1.11": "sarcoma",
+    "1.12": "childhood",
+}
+
+# Page ranges from the NG12 contents; only used until the first heading is seen
+# (e.g. when tagging starts mid-document). (first_page, last_page, section)
+SECTION_PAGE_RANGES: List[Tuple[int, int, Optional[str]]] = [
+    (9, 11, "1.1"),
+    (12, 14, "1.2"),
+    (15, 16, "1.3"),
+    (17, 17, "1.4"),
+    (18, 19, "1.5"),
+    (20, 22, "1.6"),
+    (23, 24, "1.7"),
+    (25, 25, "1.8"),
+    (26, 26, "1.9"),
+    (27, 29, "1.10"),
+    (29, 30, "1.11"),
+    (30, 31, "1.12"),
+]
+
+# "1.1 Lung and pleural cancers" (but not "1.1.1 Refer people ...")
+_SECTION_HEADING_RE = re.compile(r"^(1\.\d{1,2})\s+[A-Z][a-z]")
+# recommendation ids in text or symptom-table cross references: 1.6.4 / [1.6.4]
+_REC_REF_RE = re.compile(r"\b(1\.\d{1,2})\.\d{1,2}\b")
+_SYMPTOM_TABLES_RE = re.compile(r"^recommendations organised by symptom", re.IGNORECASE)
+
+
+def site_flag(site: str) -> str:
+    """Metadata key of the boolean filter flag for a site bucket."""
+    return f"site_{site}"
+
+
+def filterable_site(site: Optional[str]) -> Optional[str]:
+    s = (site or "").lower().strip()
+    return s if (s in SITE_BUCKETS and s != "general") else None
+
+
+class SiteTagger:
+    """
+    Tags chunks with their NG12 site section while pages are ingested in order.
+
+    - Section headings ("1.6 Urological cancers") switch the current section.
+    - Recommendation ids ("1.6.4", "[1.6.4]") add the site of the section they
+      belong to; this is what tags the symptom tables, whose rows point back
+      to site recommendations.
+
+    Chunk metadata produced:
+      site:        primary tag (current section's site, else most referenced, else "general")
+      site_<bucket>: bool flag for each assessor bucket (used as a store filter)
+    """
+
+    def __init__(self) -> None:
+        self._section: Optional[str] = None
+        self._seen_heading = False
+
+    @staticmethod
+    def _section_for_page(page: int) -> Optional[str]:
+        for first, last, section in SECTION_PAGE_RANGES:
+            if first <= page <= last:
+                return section
+        return None
+
+    def tag_chunk(self, page: int, text: str) -> Dict[str, Any]:
+        if not self._seen_heading:
+            self._section = self._section_for_page(page)
+
+        sections: List[str] = []
+        if self._section:
+            sections.append(self._section)
+
+        for line in (text or "").splitlines():
+            s = line.strip()
+            if _SYMPTOM_TABLES_RE.match(s):
+                self._section = None
+                self._seen_heading = True
+                continue
+            m = _SECTION_HEADING_RE.match(s)
+            if m:
+                self._section = m.group(1)
+                self._seen_heading = True
+                sections.append(self._section)
+
+        refs: Dict[str, int] = {}
+        for sec in _REC_REF_RE.findall(text or ""):
+            refs[sec] = refs.get(sec, 0) + 1
+
+        sites: Set[str] = {SECTION_SITES[s] for s in sections if s in SECTION_SITES}
+        sites |= {SECTION_SITES[s] for s in refs if s in SECTION_SITES}
+
+        primary = "general"
+        if sections and sections[0] in SECTION_SITES:
+            primary = SECTION_SITES[sections[0]]
+        elif refs:
+            top = max((s for s in refs if s in SECTION_SITES), key=lambda s: refs[s], default=None)
+            if top:
+                primary = SECTION_SITES[top]
+
+        meta: Dict[str, Any] = {"site": primary}
+        for b in SITE_BUCKETS:
+            if b != "general":
+                meta[site_flag(b)] = b in sites
+        return meta
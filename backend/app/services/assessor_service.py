@@ -2,26 +2,249 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict
+import asyncio
+import json
+import logging
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
-from app.domain.models import AssessResponse
+from app.agents.prompts import PROMPT_TEMPLATE_VERSION
+from app.domain.interfaces import Cache
+from app.domain.models import AssessBatchItem, AssessBatchResponse, AssessResponse, Patient
+from app.retrieval.recommendations import RecommendationIndex, normalize_term
+from app.utils.concurrency import bounded_map
+from app.utils.text import sha256
+
+log = logging.getLogger("ng12")
+
+# NG12 age thresholds (recommendations start at 18, 25 ... 60; "under 16" / "aged 16 to 24" end a
+# band at 16 / 25). Always used, so batch grouping does not depend on the rule table being enabled;
+# this also covers the graph's deterministic rules (_fallback_extract: 40, 45)
+_NG12_AGE_THRESHOLDS = (16, 18, 25, 30, 35, 40, 45, 50, 55, 60)
+# symptom duration bands (days): unknown (0), up to 3 weeks, over 3 weeks, over 12 months (NG12 wording)
+_DURATION_BOUNDARIES_DAYS = (1, 22, 366)
 
 
 class AssessorService:
     """
     Thin service layer around the assessor LangGraph.
+
+    assess_batch groups patients with the same clinical profile (age band,
+    symptoms, smoking history, sex, symptom duration band) and assesses each
+    group once on a bounded worker pool. Age bands are cut at every NG12 age
+    threshold (the static list, plus the rule table's when loaded) and duration bands at NG12's "more than 3 weeks / 12 months";
+    the group's LLM calls see the first member's exact age and duration.
+
+    Result cache (optional `cache`): assess() memoizes responses on
+      (clinical fingerprint, top_k, index version, model, prompt template version)
+    where the fingerprint covers age, sex, smoking history, symptoms and
+    duration (not name or id). A new ingest, model or prompt changes the key,
+    so stale entries are never read. Reused results carry
+    retrieval_debug.result_cache_hit = True.
+
+    aassess / aassess_batch are the async path (graph.ainvoke); at most
+    `max_concurrency` graph runs are in flight across all requests.
     """
 
-    def __init__(self, assessor_graph) -> None:
+    def __init__(
+        self,
+        assessor_graph,
+        patient_repo=None,
+        rules: Optional[RecommendationIndex] = None,
+        batch_workers: int = 4,
+        cache: Optional[Cache] = None,
+        cache_ttl_s: int = 300,
+        index_version: Optional[Callable[[], str]] = None,
+        model: str = "",
+        max_concurrency: int = 32,
+    ) -> None:
         self._graph = assessor_graph
+        self._patients = patient_repo
+        self._rules = rules
+        self.batch_workers = max(1, int(batch_workers))
+        self._cache = cache
+        self.cache_ttl_s = int(cache_ttl_s)
+        self._index_version = index_version or (lambda: "unversioned")
+        self.model = model
+        self._limit = asyncio.Semaphore(max(1, int(max_concurrency)))
+
+    def assess(self, patient_id: str, top_k: int = 5, config: Optional[Dict[str, Any]] = None) -> AssessResponse:
+        """`config` is passed to graph.invoke (e.g. {"callbacks": [...]} for per-node timing)."""
+        if self._graph is None:
+            raise RuntimeError("Assessor graph not initialized")
 
-    def assess(self, patient_id: str, top_k: int = 5) -> AssessResponse:
+        key = self._cache_key(patient_id, top_k)
+        cached = self._from_cache(key, patient_id)
+        if cached is not None:
+            return cached
+
+        state: Dict[str, Any] = {"patient_id": patient_id, "top_k": int(top_k)}
+        out = self._graph.invoke(state, config=config)  # LangGraph returns final state dict
+        return self._to_response(key, out)
+
+    async def aassess(self, patient_id: str, top_k: int = 5, config: Optional[Dict[str, Any]] = None) -> AssessResponse:
         if self._graph is None:
             raise RuntimeError("Assessor graph not initialized")
 
+        key = self._cache_key(patient_id, top_k)
+        cached = self._from_cache(key, patient_id)
+        if cached is not None:
+            return cached
+
         state: Dict[str, Any] = {"patient_id": patient_id, "top_k": int(top_k)}
-        out = self._graph.invoke(state)  # LangGraph returns final state dict
+        async with self._limit:
+            out = await self._graph.ainvoke(state, config=config)
+        return self._to_response(key, out)
+
+    def _to_response(self, key: Optional[str], out: Dict[str, Any]) -> AssessResponse:
         resp = out.get("response") or {}
 
         # Ensure response shape matches AssessResponse model
-        return AssessResponse(**resp)
+        result = AssessResponse(**resp)
+        if key is not None:
+            self._cache.set(key, result.model_dump(), self.cache_ttl_s)
+        return result
+
+    # -----------------------------
+    # Result cache
+    # -----------------------------
+    @staticmethod
+    def fingerprint(patient: Patient) -> str:
+        """Stable hash of the fields the graph reads (name and patient_id excluded)."""
+        payload = {
+            "age": int(patient.age or 0),
+            "gender": normalize_term(patient.gender or ""),
+            "smoking_history": normalize_term(patient.smoking_history or ""),
+            "symptoms": sorted(normalize_term(s) for s in patient.symptoms or [] if normalize_term(s)),
+            "symptom_duration_days": int(patient.symptom_duration_days or 0),
+        }
+        return sha256(json.dumps(payload, sort_keys=True))
+
+    def _from_cache(self, key: Optional[str], patient_id: str) -> Optional[AssessResponse]:
+        cached = self._cache.get(key) if key is not None else None
+        if cached is None:
+            return None
+        debug = {**(cached.get("retrieval_debug") or {}), "result_cache_hit": True}
+        return AssessResponse(**{**cached, "patient_id": patient_id, "retrieval_debug": debug})
+
+    def _cache_key(self, patient_id: str, top_k: int) -> Optional[str]:
+        if self._cache is None or self._patients is None:
+            return None
+        patient = self._patients.get_patient(patient_id)
+        if patient is None:
+            return None  # the graph raises "Patient not found"
+        parts = [self.fingerprint(patient), int(top_k), self._index_version(), self.model, PROMPT_TEMPLATE_VERSION]
+        return "assess:" + sha256(json.dumps(parts))
+
+    def cache_stats(self) -> Dict[str, Any]:
+        fn = getattr(self._cache, "stats", None)
+        return fn() if callable(fn) else {}
+
+    # -----------------------------
+    # Batch
+    # -----------------------------
+    def _age_boundaries(self) -> List[int]:
+        rule_ages = self._rules.age_boundaries() if self._rules is not None else []
+        return sorted(set(rule_ages) | set(_NG12_AGE_THRESHOLDS))
+
+    def profile_key(self, patient: Patient, boundaries: Sequence[int]) -> Tuple[Any, ...]:
+        symptoms = tuple(sorted({normalize_term(s) for s in patient.symptoms or [] if normalize_term(s)}))
+        return (
+            bisect_right(boundaries, int(patient.age or 0)),
+            symptoms,
+            normalize_term(patient.smoking_history or ""),
+            normalize_term(patient.gender or ""),
+            bisect_right(_DURATION_BOUNDARIES_DAYS, int(patient.symptom_duration_days or 0)),
+        )
+
+    def _group(self, patient_ids: Sequence[str]) -> Tuple[List[List[str]], Dict[str, str]]:
+        """(patient-id groups sharing a profile key, {patient_id: error})."""
+        if self._patients is None:
+            raise RuntimeError("Assessor batch needs a patient repository")
+
+        boundaries = self._age_boundaries()
+        errors: Dict[str, str] = {}
+        groups: Dict[Tuple[Any, ...], List[str]] = {}
+        for pid in dict.fromkeys(patient_ids):  # de-duplicated, order kept
+            patient = self._patients.get_patient(pid)
+            if patient is None:
+                errors[pid] = "Patient not found"
+                continue
+            groups.setdefault(self.profile_key(patient, boundaries), []).append(pid)
+        return list(groups.values()), errors
+
+    @staticmethod
+    def _batch_error(members: List[str], e: Exception) -> str:
+        if isinstance(e, KeyError):
+            return "Patient not found"
+        log.error("Batch assess failed for patient_id=%s", members[0], exc_info=e)
+        return "Assessment failed. Check server logs."
+
+    @staticmethod
+    def _fan_out(
+        members: List[str],
+        resp: Optional[AssessResponse],
+        err: Optional[str],
+        results: Dict[str, AssessResponse],
+        errors: Dict[str, str],
+    ) -> None:
+        for pid in members:
+            if resp is None:
+                errors[pid] = err or "Assessment failed"
+                continue
+            debug = {**resp.retrieval_debug, "batch_group": members[0], "batch_group_size": len(members)}
+            results[pid] = resp.model_copy(update={"patient_id": pid, "retrieval_debug": debug})
+
+    def assess_batch(self, patient_ids: Sequence[str], top_k: int = 5) -> AssessBatchResponse:
+        """
+        One item per requested id, in request order: {patient_id, result} or
+        {patient_id, error}. A failing group does not fail the batch.
+        """
+        groups, errors = self._group(patient_ids)
+
+        def run(members: List[str]) -> Tuple[List[str], Optional[AssessResponse], Optional[str]]:
+            try:
+                return members, self.assess(members[0], top_k), None
+            except Exception as e:
+                return members, None, self._batch_error(members, e)
+
+        results: Dict[str, AssessResponse] = {}
+        with ThreadPoolExecutor(max_workers=self.batch_workers, thread_name_prefix="assess-batch") as pool:
+            for members, resp, err in bounded_map(pool, run, groups, self.batch_workers, ordered=False):
+                self._fan_out(members, resp, err, results, errors)
+
+        return self._batch_response(patient_ids, groups, results, errors)
+
+    async def aassess_batch(self, patient_ids: Sequence[str], top_k: int = 5) -> AssessBatchResponse:
+        """Async assess_batch: at most batch_workers groups of this batch run at once."""
+        groups, errors = self._group(patient_ids)
+        batch_limit = asyncio.Semaphore(self.batch_workers)
+
+        async def run(members: List[str]) -> Tuple[List[str], Optional[AssessResponse], Optional[str]]:
+            async with batch_limit:
+                try:
+                    return members, await self.aassess(members[0], top_k), None
+                except Exception as e:
+                    return members, None, self._batch_error(members, e)
+
+        results: Dict[str, AssessResponse] = {}
+        for members, resp, err in await asyncio.gather(*(run(m) for m in groups)):
+            self._fan_out(members, resp, err, results, errors)
+
+        return self._batch_response(patient_ids, groups, results, errors)
+
+    @staticmethod
+    def _batch_response(
+        patient_ids: Sequence[str],
+        groups: List[List[str]],
+        results: Dict[str, AssessResponse],
+        errors: Dict[str, str],
+    ) -> AssessBatchResponse:
+        return AssessBatchResponse(
+            results=[
+                AssessBatchItem(patient_id=pid, result=results.get(pid), error=errors.get(pid))
+                for pid in patient_ids
+            ],
+            groups=len(groups),
+        )
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import asyncio
 from typing import Any, Dict
 
 from app.domain.models import ChatResponse, ChatHistoryResponse, ChatTurn
@@ -10,23 +11,34 @@ from app.domain.models import ChatResponse, ChatHistoryResponse, ChatTurn
 class ChatService:
     """
     Service layer for chat graph + memory.
+    achat runs the graph with ainvoke; at most `max_concurrency` runs are in flight.
     """
 
-    def __init__(self, chat_graph, memory_store) -> None:
+    def __init__(self, chat_graph, memory_store, max_concurrency: int = 32) -> None:
         self._graph = chat_graph
         self._memory = memory_store
+        self._limit = asyncio.Semaphore(max(1, int(max_concurrency)))
 
-    def chat(self, session_id: str, message: str, top_k: int = 5) -> ChatResponse:
+    def _state(self, session_id: str, message: str, top_k: int) -> Dict[str, Any]:
         if self._graph is None:
             raise RuntimeError("Chat graph not initialized")
 
-        state: Dict[str, Any] = {
+        return {
             "session_id": session_id,
             "message": message,
             "top_k": int(top_k),
         }
 
-        out = self._graph.invoke(state)
+    def chat(self, session_id: str, message: str, top_k: int = 5) -> ChatResponse:
+        out = self._graph.invoke(self._state(session_id, message, top_k))
+        resp = out.get("response") or {}
+
+        return ChatResponse(**resp)
+
+    async def achat(self, session_id: str, message: str, top_k: int = 5) -> ChatResponse:
+        state = self._state(session_id, message, top_k)
+        async with self._limit:
+            out = await self._graph.ainvoke(state)
         resp = out.get("response") or {}
 
         return ChatResponse(**resp)
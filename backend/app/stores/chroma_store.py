@@ -1,11 +1,14 @@
 from __future__ import annotations
 
-from typing import List, Dict, Any, Optional
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
 
 import chromadb
+import numpy as np
 from chromadb.config import Settings as ChromaSettings
 
 from app.domain.interfaces import VectorStore
+from app.stores.index_meta import INDEX_META_FILE, read_index_meta
 
 
 class ChromaVectorStore(VectorStore):
@@ -29,12 +32,36 @@ class ChromaVectorStore(VectorStore):
         pdir = persist_dir or str(settings.CHROMA_DIR)
         cname = collection_name or str(settings.CHROMA_COLLECTION)
 
+        self._dir = Path(pdir)
+        self._meta_mtime: float | None = None
+        self._meta: Dict[str, Any] = {}
+
         self._client = chromadb.PersistentClient(
             path=str(pdir),
             settings=ChromaSettings(anonymized_telemetry=False),
         )
         self._col = self._client.get_or_create_collection(name=str(cname))
 
+    def index_version(self) -> str:
+        """
+        Version of the ingested corpus (from index_meta.json written at ingest).
+        Re-read only when the file changes; falls back to collection size.
+        """
+        p = self._dir / INDEX_META_FILE
+        try:
+            mtime = p.stat().st_mtime
+        except OSError:
+            mtime = None
+
+        if mtime != self._meta_mtime:
+            self._meta = read_index_meta(self._dir) if mtime is not None else {}
+            self._meta_mtime = mtime
+
+        v = self._meta.get("index_version")
+        if v:
+            return str(v)
+        return f"{self._col.name}:{self._col.count()}"
+
     def upsert(
         self,
         ids: List[str],
@@ -44,18 +71,137 @@ class ChromaVectorStore(VectorStore):
     ):
         self._col.upsert(ids=ids, documents=documents, metadatas=metadatas, embeddings=embeddings)
 
-    def query(self, query_embedding: List[float], top_k: int) -> List[Dict[str, Any]]:
+    def ids(self) -> List[str]:
+        return list(self._col.get(include=[]).get("ids") or [])
+
+    def delete(self, ids: List[str]) -> None:
+        if ids:
+            self._col.delete(ids=list(ids))
+
+    def dump(self, batch_size: int = 500) -> Dict[str, List[Any]]:
+        """
+        Full export of the collection (ids, documents, metadatas, embeddings).
+        Used to build the in-process NumPy index after ingest.
+        """
+        out: Dict[str, List[Any]] = {"ids": [], "documents": [], "metadatas": [], "embeddings": []}
+        total = self._col.count()
+        for offset in range(0, total, batch_size):
+            res = self._col.get(
+                limit=batch_size,
+                offset=offset,
+                include=["documents", "metadatas", "embeddings"],
+            )
+            out["ids"].extend(res.get("ids") or [])
+            out["documents"].extend(res.get("documents") or [])
+            out["metadatas"].extend(res.get("metadatas") or [])
+            embs = res.get("embeddings")
+            out["embeddings"].extend([list(map(float, e)) for e in (embs if embs is not None else [])])
+        return out
+
+    def get_embeddings(self, ids: List[str]) -> np.ndarray:
+        """[len(ids), dim] float32 stored embeddings in `ids` order (zero rows for unknown ids)."""
+        if not ids:
+            return np.zeros((0, 0), dtype=np.float32)
+        res = self._col.get(ids=list(ids), include=["embeddings"])
+        embs = res.get("embeddings")
+        by_id = {cid: e for cid, e in zip(res.get("ids") or [], embs if embs is not None else [])}
+        dim = len(next(iter(by_id.values()))) if by_id else 0
+        out = np.zeros((len(ids), dim), dtype=np.float32)
+        for i, cid in enumerate(ids):
+            if cid in by_id:
+                out[i] = np.asarray(by_id[cid], dtype=np.float32)
+        return out
+
+    def iter_embeddings(self, ids: List[str], batch_size: int = 500) -> Iterator[np.ndarray]:
+        """
+        Stored embeddings of `ids`, in order, as [<=batch_size, dim] float32 blocks.
+        Lets exports stream the collection instead of holding every vector (dump()).
+        """
+        for start in range(0, len(ids), batch_size):
+            batch = list(ids[start : start + batch_size])
+            res = self._col.get(ids=batch, include=["embeddings"])
+            embs = res.get("embeddings")
+            by_id = {cid: e for cid, e in zip(res.get("ids") or [], embs if embs is not None else [])}
+            missing = [cid for cid in batch if cid not in by_id]
+            if missing:
+                raise KeyError(f"{len(missing)} ids have no stored embedding (first: {missing[0]})")
+            yield np.asarray([by_id[cid] for cid in batch], dtype=np.float32)
+
+    def get(self, ids: List[str], query_embedding: Optional[List[float]] = None) -> List[Dict[str, Any]]:
+        """
+        Fetch chunks by id (same hit shape as query()).
+        If query_embedding is given, distance/score are computed against it
+        in the collection's default "l2" space (squared euclidean).
+        """
+        if not ids:
+            return []
+        res = self._col.get(ids=list(ids), include=["documents", "metadatas", "embeddings"])
+
+        ids0 = res.get("ids") or []
+        docs0 = res.get("documents") or []
+        metas0 = res.get("metadatas") or []
+        embs0 = res.get("embeddings")
+        embs0 = embs0 if embs0 is not None else []
+        q = np.asarray(query_embedding, dtype=np.float32) if query_embedding is not None else None
+
+        by_id: Dict[str, Dict[str, Any]] = {}
+        for i, cid in enumerate(ids0):
+            hit: Dict[str, Any] = {
+                "id": cid,
+                "document": docs0[i] if i < len(docs0) else "",
+                "metadata": metas0[i] if i < len(metas0) else {},
+            }
+            if q is not None and i < len(embs0):
+                diff = np.asarray(embs0[i], dtype=np.float32) - q
+                dist = float(diff @ diff)
+                hit["distance"] = dist
+                hit["score"] = max(0.0, 1.0 - dist)
+            by_id[cid] = hit
+
+        # preserve requested order
+        return [by_id[i] for i in ids if i in by_id]
+
+    def ids_where(self, where: Dict[str, Any]) -> List[str]:
+        """Ids of chunks whose metadata matches `where` (equality filter)."""
+        return list(self._col.get(where=where, include=[]).get("ids") or [])
+
+    def query(
+        self, query_embedding: List[float], top_k: int, where: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        return self.query_many([query_embedding], top_k, where=where)[0]
+
+    def query_many(
+        self, query_embeddings: List[List[float]], top_k: int, where: Optional[Dict[str, Any]] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """One Chroma round trip for several query vectors; one hit list per query."""
+        if not query_embeddings:
+            return []
+        kwargs: Dict[str, Any] = {}
+        if where:
+            kwargs["where"] = where
         res = self._col.query(
-            query_embeddings=[query_embedding],
+            query_embeddings=list(query_embeddings),
             n_results=top_k,
             include=["documents", "metadatas", "distances"],
+            **kwargs,
         )
 
+        out: List[List[Dict[str, Any]]] = []
+        for qi in range(len(query_embeddings)):
+            out.append(self._hits_from_result(res, qi))
+        return out
+
+    @staticmethod
+    def _hits_from_result(res: Dict[str, Any], qi: int) -> List[Dict[str, Any]]:
+        def _row(key: str) -> List[Any]:
+            rows = res.get(key) or []
+            return rows[qi] if qi < len(rows) and rows[qi] is not None else []
+
         hits: List[Dict[str, Any]] = []
-        ids0 = res.get("ids", [[]])[0]
-        docs0 = res.get("documents", [[]])[0]
-        metas0 = res.get("metadatas", [[]])[0]
-        dists0 = res.get("distances", [[]])[0]
+        ids0 = _row("ids")
+        docs0 = _row("documents")
+        metas0 = _row("metadatas")
+        dists0 = _row("distances")
 
         for i in range(len(ids0)):
             dist = float(dists0[i]) if dists0 and i < len(dists0) else 0.0
@@ -0,0 +1,96 @@
+# app/stores/disk_cache.py
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from app.domain.interfaces import Cache
+
+
+class SqliteDiskCache(Cache):
+    """
+    Persistent key/value cache backed by a single SQLite file.
+
+    Used as the on-disk tier behind the in-memory caches:
+      - embeddings (content-addressed, never expire)
+      - LLM completions (TTL-bounded)
+
+    Values are raw bytes; callers own the encoding.
+    WAL mode lets several uvicorn workers / the ingest script share one file.
+    """
+
+    def __init__(self, path: str | Path, table: str = "cache") -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._table = table
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {self._table} ("
+            "  key TEXT PRIMARY KEY,"
+            "  value BLOB NOT NULL,"
+            "  expires_at REAL"
+            ")"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, bytes]:
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+
+        now = time.time()
+        out: Dict[str, bytes] = {}
+        # SQLite caps bound parameters per statement; stay well under it
+        step = 500
+        with self._lock:
+            for start in range(0, len(keys), step):
+                part = keys[start : start + step]
+                marks = ",".join("?" for _ in part)
+                rows = self._conn.execute(
+                    f"SELECT key, value, expires_at FROM {self._table} WHERE key IN ({marks})",
+                    part,
+                ).fetchall()
+                for k, v, exp in rows:
+                    if exp is not None and exp <= now:
+                        continue
+                    out[k] = bytes(v)
+        return out
+
+    def set(self, key: str, value: bytes, ttl_s: Optional[int] = None) -> None:
+        self.set_many({key: value}, ttl_s=ttl_s)
+
+    def set_many(self, items: Dict[str, bytes], ttl_s: Optional[int] = None) -> None:
+        if not items:
+            return
+        expires_at = (time.time() + ttl_s) if ttl_s else None
+        rows = [(k, sqlite3.Binary(v), expires_at) for k, v in items.items()]
+        with self._lock:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO {self._table} (key, value, expires_at) VALUES (?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            cur = self._conn.execute(
+                f"DELETE FROM {self._table} WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                (time.time(),),
+            )
+            self._conn.commit()
+            return int(cur.rowcount or 0)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
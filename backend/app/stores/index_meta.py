@@ -0,0 +1,64 @@
+# app/stores/index_meta.py
+
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.utils.text import sha256
+
+INDEX_META_FILE = "index_meta.json"
+
+
+def compute_index_version(
+    embedding_model: str, ids: List[str], documents: List[str], metadatas: List[Dict[str, Any]]
+) -> str:
+    """
+    Stable fingerprint of an ingested corpus.
+    Changes whenever the embedding model, chunking, any chunk text or any chunk
+    metadata (site flags, prev_id/next_id adjacency: both shape retrieval) changes.
+    """
+    rows = (
+        f"{i}\t{sha256(d)}\t{sha256(json.dumps(m or {}, sort_keys=True))}"
+        for i, d, m in zip(ids, documents, metadatas)
+    )
+    h = sha256(embedding_model + "\n" + "\n".join(rows))
+    return h[:16]
+
+
+def write_index_meta(
+    index_dir: str | Path,
+    embedding_model: str,
+    ids: List[str],
+    documents: List[str],
+    metadatas: List[Dict[str, Any]],
+    extra: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Written by scripts/ingest_ng12.py next to the vector store.
+    Caches key on `index_version` so a re-ingest invalidates them.
+    """
+    meta: Dict[str, Any] = {
+        "index_version": compute_index_version(embedding_model, ids, documents, metadatas),
+        "embedding_model": embedding_model,
+        "chunks": len(ids),
+        "created_at": int(time.time()),
+    }
+    meta.update(extra or {})
+
+    d = Path(index_dir)
+    d.mkdir(parents=True, exist_ok=True)
+    (d / INDEX_META_FILE).write_text(json.dumps(meta, indent=2), encoding="utf-8")
+    return meta
+
+
+def read_index_meta(index_dir: str | Path) -> Dict[str, Any]:
+    p = Path(index_dir) / INDEX_META_FILE
+    if not p.exists():
+        return {}
+    try:
+        return json.loads(p.read_text(encoding="utf-8"))
+    except Exception:
+        return {}
@@ -0,0 +1,126 @@
+# app/stores/ingest_manifest.py
+
+from __future__ import annotations
+
+import json
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List
+
+from app.utils.text import sha256
+
+MANIFEST_FILE = "ingest_manifest.json"
+
+
+def chunk_text_hash(document: str) -> str:
+    return sha256(document or "")[:16]
+
+
+def chunk_meta_hash(metadata: Dict[str, Any]) -> str:
+    return sha256(json.dumps(metadata or {}, sort_keys=True))[:16]
+
+
+@dataclass
+class IngestDiff:
+    """What a re-ingest changes, relative to the previous manifest."""
+    full: bool = False  # no usable manifest or embedding model changed -> everything is (re)embedded
+    pages_added: List[int] = field(default_factory=list)
+    pages_changed: List[int] = field(default_factory=list)
+    pages_removed: List[int] = field(default_factory=list)
+    chunks_added: List[str] = field(default_factory=list)
+    chunks_changed: List[str] = field(default_factory=list)  # text changed -> re-embed
+    chunks_meta_changed: List[str] = field(default_factory=list)  # metadata only -> keep embedding
+    chunks_removed: List[str] = field(default_factory=list)
+    chunks_unchanged: int = 0
+
+    @property
+    def to_embed(self) -> List[str]:
+        return self.chunks_added + self.chunks_changed
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "full": self.full,
+            "pages": {
+                "added": self.pages_added,
+                "changed": self.pages_changed,
+                "removed": self.pages_removed,
+            },
+            "chunks": {
+                "added": len(self.chunks_added),
+                "changed": len(self.chunks_changed),
+                "metadata_only": len(self.chunks_meta_changed),
+                "removed": len(self.chunks_removed),
+                "unchanged": self.chunks_unchanged,
+            },
+            "embedded": len(self.to_embed),
+        }
+
+
+def build_manifest(
+    embedding_model: str,
+    pages: Dict[int, str],
+    ids: List[str],
+    documents: List[str],
+    metadatas: List[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """
+    {embedding_model, pages: {page: text hash}, chunks: {id: {"text": hash, "meta": hash}}}
+    `pages` maps page number -> cleaned page text.
+    """
+    return {
+        "embedding_model": embedding_model,
+        "created_at": int(time.time()),
+        "pages": {str(p): sha256(t)[:16] for p, t in sorted(pages.items())},
+        "chunks": {
+            cid: {"text": chunk_text_hash(doc), "meta": chunk_meta_hash(meta)}
+            for cid, doc, meta in zip(ids, documents, metadatas)
+        },
+    }
+
+
+def diff_manifest(old: Dict[str, Any], new: Dict[str, Any]) -> IngestDiff:
+    old_pages = old.get("pages") or {}
+    new_pages = new.get("pages") or {}
+    old_chunks = old.get("chunks") or {}
+    new_chunks = new.get("chunks") or {}
+
+    d = IngestDiff()
+    d.full = (not old_chunks) or old.get("embedding_model") != new.get("embedding_model")
+
+    d.pages_added = sorted(int(p) for p in new_pages if p not in old_pages)
+    d.pages_removed = sorted(int(p) for p in old_pages if p not in new_pages)
+    d.pages_changed = sorted(int(p) for p in new_pages if p in old_pages and old_pages[p] != new_pages[p])
+    d.chunks_removed = sorted(c for c in old_chunks if c not in new_chunks)
+
+    for cid, h in new_chunks.items():
+        prev = old_chunks.get(cid)
+        if prev is None:
+            d.chunks_added.append(cid)
+        elif d.full or prev.get("text") != h["text"]:
+            d.chunks_changed.append(cid)
+        elif prev.get("meta") != h["meta"]:
+            d.chunks_meta_changed.append(cid)
+        else:
+            d.chunks_unchanged += 1
+    return d
+
+
+def read_manifest(index_dir: str | Path) -> Dict[str, Any]:
+    p = Path(index_dir) / MANIFEST_FILE
+    if not p.exists():
+        return {}
+    try:
+        return json.loads(p.read_text(encoding="utf-8"))
+    except Exception:
+        return {}
+
+
+def write_manifest(index_dir: str | Path, manifest: Dict[str, Any]) -> Path:
+    d = Path(index_dir)
+    d.mkdir(parents=True, exist_ok=True)
+    p = d / MANIFEST_FILE
+    tmp = p.with_suffix(p.suffix + ".tmp")
+    tmp.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    tmp.replace(p)
+    return p
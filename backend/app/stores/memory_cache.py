@@ -0,0 +1,85 @@
+# app/stores/memory_cache.py
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from cachetools import TLRUCache
+
+from app.domain.interfaces import Cache
+
+
+@dataclass(frozen=True)
+class _Entry:
+    value: Any
+    ttl_s: float
+
+
+def _ttu(_key: str, entry: _Entry, now: float) -> float:
+    return now + entry.ttl_s
+
+
+class TTLMemoryCache(Cache):
+    """
+    In-process cache with per-entry TTL plus size-based (LRU) eviction.
+
+    Implements domain.interfaces.Cache:
+      - get(key) -> value | None
+      - set(key, value, ttl_s)
+
+    Thread-safe (sync FastAPI routes run in a threadpool) and keeps
+    hit/miss counters so the cache can be sized from real traffic.
+    """
+
+    def __init__(self, maxsize: int = 1024, default_ttl_s: int = 300, name: str = "cache") -> None:
+        self.name = name
+        self.default_ttl_s = int(default_ttl_s)
+        self._data: TLRUCache = TLRUCache(maxsize=max(1, int(maxsize)), ttu=_ttu, timer=time.monotonic)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.sets = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry.value
+
+    def set(self, key: str, value: Any, ttl_s: Optional[int] = None) -> None:
+        ttl = float(ttl_s if ttl_s is not None else self.default_ttl_s)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = _Entry(value=value, ttl_s=ttl)
+            self.sets += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._data.expire()
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "size": len(self._data),
+                "maxsize": int(self._data.maxsize),
+                "default_ttl_s": self.default_ttl_s,
+                "hits": self.hits,
+                "misses": self.misses,
+                "sets": self.sets,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            }
@@ -0,0 +1,377 @@
+from __future__ import annotations
+
+import json
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.domain.interfaces import VectorIndex
+
+EMBEDDINGS_FILE = "embeddings.npy"
+INT8_FILE = "embeddings.int8.npy"
+INT8_SCALES_FILE = "embeddings.int8.scales.npy"
+FLOAT16_FILE = "embeddings.f16.npy"
+CHUNKS_FILE = "chunks.json"
+
+QUANTIZATION_MODES = ("none", "int8", "float16")
+# quantized rows are widened to float32 this many at a time (per-thread scratch: rows * dim * 4 bytes;
+# small enough to stay in L2 between the widening and the matmul)
+SCORE_BLOCK_ROWS = 256
+
+
+def _normalize_rows(mat: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(mat, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return mat / norms
+
+
+def quantize_int8(mat: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Symmetric per-vector int8: row ~= q[row] * scale[row]."""
+    scales = np.abs(mat).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    q = np.clip(np.rint(mat / scales[:, None]), -127, 127).astype(np.int8)
+    return np.ascontiguousarray(q), scales.astype(np.float32)
+
+
+def _save_npy(path: Path, arr: np.ndarray) -> None:
+    # write-then-rename so a running worker never maps a half-written file
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        np.save(f, arr)
+    tmp.replace(path)
+
+
+def _write_chunks(
+    d: Path, ids: List[str], documents: List[str], metadatas: List[Dict[str, Any]], index_version: str
+) -> None:
+    payload = {
+        "index_version": index_version,
+        "ids": list(ids),
+        "documents": list(documents),
+        "metadatas": list(metadatas),
+    }
+    tmp = d / (CHUNKS_FILE + ".tmp")
+    tmp.write_text(json.dumps(payload), encoding="utf-8")
+    tmp.replace(d / CHUNKS_FILE)
+
+
+class NumpyVectorStore(VectorIndex):
+    """
+    In-process exact vector index for small corpora (NG12 is a few hundred chunks).
+
+    Layout (written by scripts/ingest_ng12.py via NumpyVectorStore.write):
+      <index_dir>/embeddings.npy              float32 [n, dim], rows L2-normalized, C-contiguous
+      <index_dir>/embeddings.int8.npy         int8    [n, dim]  (quantized copy)
+      <index_dir>/embeddings.int8.scales.npy  float32 [n]       (per-vector scale)
+      <index_dir>/embeddings.f16.npy          float16 [n, dim]  (quantized copy)
+      <index_dir>/chunks.json                 {"index_version", "ids", "documents", "metadatas"}
+
+    Query = one matmul against the (optionally memory-mapped) matrix + argpartition.
+
+    Quantized mode (quantization="int8" | "float16"):
+      only the quantized matrix is held in RAM; the coarse top-(k * rescore_factor)
+      comes from it, then that small candidate set is re-scored exactly against
+      the memory-mapped float32 rows, so only touched pages are ever resident.
+      Coarse scoring widens SCORE_BLOCK_ROWS quantized rows at a time into a
+      reused per-thread float32 buffer, never a full float32 copy.
+
+    Hits have the same shape as ChromaVectorStore.query. `distance` is the squared
+    L2 distance between unit vectors (2 - 2*cos), i.e. what Chroma's default "l2"
+    space reports for normalized embeddings, so score thresholds stay comparable.
+    """
+
+    def __init__(
+        self,
+        index_dir: Optional[str] = None,
+        mmap: Optional[bool] = None,
+        quantization: Optional[str] = None,
+        rescore_factor: Optional[int] = None,
+    ):
+        # Lazy import to avoid circular settings imports
+        from app.config.settings import settings
+
+        self._dir = Path(index_dir or settings.NUMPY_INDEX_DIR)
+        self._use_mmap = settings.NUMPY_INDEX_MMAP if mmap is None else bool(mmap)
+        self.quantization = (quantization or settings.NUMPY_INDEX_QUANTIZATION or "none").lower().strip()
+        self.rescore_factor = max(1, int(rescore_factor or settings.NUMPY_INDEX_RESCORE_FACTOR))
+        if self.quantization not in QUANTIZATION_MODES:
+            raise ValueError(f"Unknown quantization {self.quantization!r} (expected one of {QUANTIZATION_MODES})")
+
+        self._qmat: Optional[np.ndarray] = None
+        self._qscales: Optional[np.ndarray] = None
+        self._load()
+
+        self._row: Dict[str, int] = {cid: i for i, cid in enumerate(self._ids)}
+        self._masks: Dict[str, np.ndarray] = {}
+        self._local = threading.local()
+
+        if self._mat.shape[0] != len(self._ids):
+            raise ValueError(
+                f"NumPy index is inconsistent: {self._mat.shape[0]} vectors for {len(self._ids)} ids"
+            )
+        if self._qmat is not None and self._qmat.shape != self._mat.shape:
+            raise ValueError(f"Quantized matrix {self._qmat.shape} does not match {self._mat.shape}")
+
+    def _load(self) -> None:
+        """Set _mat (+ _qmat / _qscales for the quantization mode), _ids, _docs, _metas, _version."""
+        emb_path = self._dir / EMBEDDINGS_FILE
+        chunks_path = self._dir / CHUNKS_FILE
+        if not emb_path.exists() or not chunks_path.exists():
+            raise FileNotFoundError(
+                f"NumPy index not found in {self._dir}. Run scripts/ingest_ng12.py first."
+            )
+
+        # full precision: always mapped when a quantized matrix does the coarse search
+        quantized = self.quantization != "none"
+        self._mat: np.ndarray = np.load(str(emb_path), mmap_mode="r" if (self._use_mmap or quantized) else None)
+
+        if self.quantization == "int8":
+            self._qmat = np.load(str(self._dir / INT8_FILE))
+            self._qscales = np.load(str(self._dir / INT8_SCALES_FILE))
+        elif self.quantization == "float16":
+            self._qmat = np.load(str(self._dir / FLOAT16_FILE))
+
+        chunks = json.loads(chunks_path.read_text(encoding="utf-8"))
+        self._ids: List[str] = list(chunks.get("ids") or [])
+        self._docs: List[str] = list(chunks.get("documents") or [])
+        self._metas: List[Dict[str, Any]] = list(chunks.get("metadatas") or [])
+        self._version = str(chunks.get("index_version") or f"numpy:{len(self._ids)}")
+
+    # -----------------------------
+    # Build
+    # -----------------------------
+    @staticmethod
+    def write(
+        index_dir: str | Path,
+        ids: List[str],
+        documents: List[str],
+        metadatas: List[Dict[str, Any]],
+        embeddings: List[List[float]],
+        index_version: str = "",
+    ) -> Path:
+        d = Path(index_dir)
+        d.mkdir(parents=True, exist_ok=True)
+
+        mat = np.ascontiguousarray(_normalize_rows(np.asarray(embeddings, dtype=np.float32)), dtype=np.float32)
+        _save_npy(d / EMBEDDINGS_FILE, mat)
+
+        # quantized copies are cheap to produce; the store picks one at load time
+        q8, scales = quantize_int8(mat)
+        _save_npy(d / INT8_FILE, q8)
+        _save_npy(d / INT8_SCALES_FILE, scales)
+        _save_npy(d / FLOAT16_FILE, np.ascontiguousarray(mat.astype(np.float16)))
+
+        _write_chunks(d, ids, documents, metadatas, index_version)
+        return d
+
+    @staticmethod
+    def write_blocks(
+        index_dir: str | Path,
+        ids: List[str],
+        documents: List[str],
+        metadatas: List[Dict[str, Any]],
+        blocks: Iterable[np.ndarray],
+        dim: int,
+        index_version: str = "",
+    ) -> Path:
+        """
+        write() from consecutive [b, dim] embedding blocks (in `ids` order): each block is
+        normalized and quantized into memory-mapped .npy files, so only one block is in RAM.
+        """
+        d = Path(index_dir)
+        d.mkdir(parents=True, exist_ok=True)
+        n = len(ids)
+        if n == 0:
+            return NumpyVectorStore.write(d, ids, documents, metadatas, np.zeros((0, dim), dtype=np.float32), index_version)
+
+        specs = {
+            EMBEDDINGS_FILE: (np.float32, (n, dim)),
+            INT8_FILE: (np.int8, (n, dim)),
+            INT8_SCALES_FILE: (np.float32, (n,)),
+            FLOAT16_FILE: (np.float16, (n, dim)),
+        }
+        out = {
+            name: np.lib.format.open_memmap(d / (name + ".tmp"), mode="w+", dtype=dtype, shape=shape)
+            for name, (dtype, shape) in specs.items()
+        }
+        row = 0
+        for block in blocks:
+            b = _normalize_rows(np.asarray(block, dtype=np.float32).reshape(-1, dim))
+            stop = row + b.shape[0]
+            if stop > n:
+                raise ValueError(f"Embedding blocks hold more than {n} rows")
+            q8, scales = quantize_int8(b)
+            out[EMBEDDINGS_FILE][row:stop] = b
+            out[INT8_FILE][row:stop] = q8
+            out[INT8_SCALES_FILE][row:stop] = scales
+            out[FLOAT16_FILE][row:stop] = b.astype(np.float16)
+            row = stop
+        if row != n:
+            raise ValueError(f"Embedding blocks hold {row} rows for {n} ids")
+
+        for arr in out.values():
+            arr.flush()
+        del out, arr  # close the maps before the rename
+        for name in specs:
+            (d / (name + ".tmp")).replace(d / name)
+
+        _write_chunks(d, ids, documents, metadatas, index_version)
+        return d
+
+    # -----------------------------
+    # Introspection
+    # -----------------------------
+    def resident_bytes(self) -> int:
+        """Bytes of embedding data held in process memory (mapped float rows excluded)."""
+        if self._qmat is not None:
+            return int(self._qmat.nbytes + (self._qscales.nbytes if self._qscales is not None else 0))
+        return 0 if isinstance(self._mat, np.memmap) else int(self._mat.nbytes)
+
+    # -----------------------------
+    # VectorIndex (read-only: rebuilt by scripts/ingest_ng12.py via write())
+    # -----------------------------
+    def index_version(self) -> str:
+        return self._version
+
+    @staticmethod
+    def _unit(query_embedding: List[float]) -> Optional[np.ndarray]:
+        q = np.asarray(query_embedding, dtype=np.float32)
+        qn = float(np.linalg.norm(q))
+        if qn == 0.0:
+            return None
+        return q / qn
+
+    def _hit(self, i: int, sim: Optional[float] = None) -> Dict[str, Any]:
+        hit: Dict[str, Any] = {
+            "id": self._ids[i],
+            "document": self._docs[i] if i < len(self._docs) else "",
+            "metadata": self._metas[i] if i < len(self._metas) else {},
+        }
+        if sim is not None:
+            dist = max(0.0, 2.0 - 2.0 * float(sim))
+            hit["distance"] = dist
+            hit["score"] = max(0.0, 1.0 - dist)
+        return hit
+
+    def get(self, ids: List[str], query_embedding: Optional[List[float]] = None) -> List[Dict[str, Any]]:
+        rows = [self._row[i] for i in (ids or []) if i in self._row]
+        if not rows:
+            return []
+        q = self._unit(query_embedding) if query_embedding is not None else None
+        sims = (self._mat[rows] @ q) if q is not None else None
+        return [self._hit(r, float(sims[j]) if sims is not None else None) for j, r in enumerate(rows)]
+
+    def get_embeddings(self, ids: List[str]) -> np.ndarray:
+        """[len(ids), dim] unit rows in `ids` order (zero rows for unknown ids)."""
+        out = np.zeros((len(ids or []), self._mat.shape[1]), dtype=np.float32)
+        pos = [(j, self._row[cid]) for j, cid in enumerate(ids or []) if cid in self._row]
+        if pos:
+            out[[j for j, _ in pos]] = self._mat[[r for _, r in pos]]
+        return out
+
+    def _mask(self, where: Dict[str, Any]) -> np.ndarray:
+        """Boolean row mask for an equality metadata filter (memoized per filter)."""
+        key = json.dumps(where, sort_keys=True)
+        m = self._masks.get(key)
+        if m is None:
+            m = np.fromiter(
+                (all(meta.get(k) == v for k, v in where.items()) for meta in self._metas),
+                dtype=bool,
+                count=len(self._metas),
+            )
+            self._masks[key] = m
+        return m
+
+    def ids_where(self, where: Dict[str, Any]) -> List[str]:
+        m = self._mask(where)
+        return [self._ids[i] for i in np.flatnonzero(m)]
+
+    def query(
+        self, query_embedding: List[float], top_k: int, where: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        return self.query_many([query_embedding], top_k, where=where)[0]
+
+    @staticmethod
+    def _top_rows(sims: np.ndarray, k: int) -> np.ndarray:
+        """Per-row top-k column indices (unsorted) of a [q, n] similarity matrix."""
+        n = sims.shape[1]
+        if k < n:
+            return np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        return np.tile(np.arange(n), (sims.shape[0], 1))
+
+    def _scratch(self) -> np.ndarray:
+        """[SCORE_BLOCK_ROWS, dim] float32 block buffer, one per thread (queries run concurrently)."""
+        buf = getattr(self._local, "buf", None)
+        if buf is None:
+            shape = (max(1, min(SCORE_BLOCK_ROWS, self._qmat.shape[0])), self._qmat.shape[1])
+            buf = np.empty(shape, dtype=np.float32)
+            self._local.buf = buf
+        return buf
+
+    def _coarse_sims(self, Q: np.ndarray) -> np.ndarray:
+        if self._qmat is None:
+            return Q @ self._mat.T
+        # widen one block of quantized rows at a time into the scratch buffer (BLAS float32 matmul)
+        n = self._qmat.shape[0]
+        out = np.empty((n, Q.shape[0]), dtype=np.float32)
+        buf = self._scratch()
+        for start in range(0, n, buf.shape[0]):
+            stop = min(n, start + buf.shape[0])
+            block = buf[: stop - start]
+            np.copyto(block, self._qmat[start:stop], casting="unsafe")
+            np.matmul(block, Q.T, out=out[start:stop])
+        if self._qscales is not None:
+            # int8: (q . x_row) ~= (q . q8_row) * scale_row
+            out *= self._qscales[:, None]
+        return out.T
+
+    def query_many(
+        self, query_embeddings: List[List[float]], top_k: int, where: Optional[Dict[str, Any]] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """All queries in one [q, dim] x [dim, n] matmul; argpartition per row."""
+        n = len(self._ids)
+        if not query_embeddings:
+            return []
+        if n == 0 or top_k <= 0:
+            return [[] for _ in query_embeddings]
+
+        Q = np.asarray(query_embeddings, dtype=np.float32)
+        if Q.ndim == 1:
+            Q = Q[None, :]
+        qn = np.linalg.norm(Q, axis=1)
+        ok = qn > 0
+        Q = Q / np.where(ok, qn, 1.0)[:, None]
+
+        sims = self._coarse_sims(Q)
+        if where:
+            mask = self._mask(where)
+            n = int(mask.sum())
+            if n == 0:
+                return [[] for _ in query_embeddings]
+            sims[:, ~mask] = -np.inf
+        k = min(int(top_k), n)
+
+        out: List[List[Dict[str, Any]]] = []
+        if self._qmat is None:
+            top = self._top_rows(sims, k)
+            for r in range(Q.shape[0]):
+                if not ok[r]:
+                    out.append([])
+                    continue
+                idx = top[r][np.argsort(-sims[r, top[r]], kind="stable")]
+                out.append([self._hit(int(i), float(sims[r, int(i)])) for i in idx])
+            return out
+
+        # quantized: coarse candidates, then exact re-scoring on float32 rows
+        cand = self._top_rows(sims, min(n, k * self.rescore_factor))
+        for r in range(Q.shape[0]):
+            if not ok[r]:
+                out.append([])
+                continue
+            rows = np.sort(cand[r])  # ascending rows -> sequential reads from the mapped file
+            exact = self._mat[rows] @ Q[r]
+            order = np.argsort(-exact, kind="stable")[:k]
+            out.append([self._hit(int(rows[j]), float(exact[j])) for j in order])
+        return out
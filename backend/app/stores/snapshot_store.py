@@ -0,0 +1,281 @@
+# app/stores/snapshot_store.py
+
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import struct
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from app.stores.numpy_store import NumpyVectorStore, _normalize_rows, quantize_int8
+
+SNAPSHOT_MAGIC = b"NG12SNAP"
+SNAPSHOT_VERSION = 1
+_ALIGN = 64  # every section starts on a cache-line / SIMD-friendly boundary
+_PREAMBLE = struct.Struct("<8sII")  # magic, format version, header length
+SECTION_BLOCK_ROWS = 4096  # rows per copy when writing array sections
+
+
+def _pad(n: int) -> int:
+    return (-n) % _ALIGN
+
+
+def _nbytes(data: Any) -> int:
+    return int(data.nbytes) if isinstance(data, np.ndarray) else len(data)
+
+
+def _pieces(data: Any) -> Iterator[bytes]:
+    """Section bytes in order; arrays go SECTION_BLOCK_ROWS rows at a time."""
+    if not isinstance(data, np.ndarray):
+        yield data
+        return
+    for start in range(0, data.shape[0], SECTION_BLOCK_ROWS):
+        yield np.ascontiguousarray(data[start : start + SECTION_BLOCK_ROWS]).tobytes()
+
+
+class _DocTable:
+    """Chunk texts decoded on access from the mapped utf-8 blob (offsets[i]:offsets[i + 1])."""
+
+    def __init__(self, blob: memoryview, offsets: np.ndarray) -> None:
+        self._blob = blob
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return max(0, len(self._offsets) - 1)
+
+    def __getitem__(self, i: int) -> str:
+        a, b = int(self._offsets[i]), int(self._offsets[i + 1])
+        return bytes(self._blob[a:b]).decode("utf-8")
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+
+def read_snapshot_header(path: str | Path) -> Dict[str, Any]:
+    with open(path, "rb") as f:
+        magic, version, hlen = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError(f"{path} is not an index snapshot")
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot format {version} in {path} (expected {SNAPSHOT_VERSION})")
+        return json.loads(f.read(hlen).decode("utf-8"))
+
+
+class SnapshotVectorStore(NumpyVectorStore):
+    """
+    NumpyVectorStore over one versioned, memory-mapped file.
+
+    Layout (all sections 64-byte aligned, offsets relative to the file start):
+      "NG12SNAP" | u32 format version | u32 header length | JSON header
+      embeddings      float32 [n, dim]  L2-normalized rows
+      int8 / scales   int8 [n, dim] + float32 [n]
+      float16         float16 [n, dim]
+      doc_offsets     uint64 [n + 1]    byte offsets into doc_blob
+      doc_blob        utf-8 chunk texts, concatenated
+      chunks          JSON {"ids", "metadatas"}
+      features        JSON chunk-feature payload (app/retrieval/chunk_features.py)
+
+    The header carries index_version, embedding_model, n, dim and
+    {section: {offset, nbytes, dtype, shape, sha256}}.
+
+    Opening maps the file read-only and builds zero-copy array views: no
+    SQLite, no HNSW load, no JSON parse of the texts. Every uvicorn worker
+    maps the same file, so the pages are shared through the OS page cache.
+    Queries are NumpyVectorStore's (exact matmul, optional quantized coarse
+    pass + exact re-score).
+    """
+
+    def __init__(
+        self,
+        path: Optional[str | Path] = None,
+        quantization: Optional[str] = None,
+        rescore_factor: Optional[int] = None,
+    ):
+        # Lazy import to avoid circular settings imports
+        from app.config.settings import settings
+
+        self.path = Path(path or settings.SNAPSHOT_PATH)
+        # mmap=True: the matrices are views of the mapping either way
+        super().__init__(index_dir=str(self.path.parent), mmap=True, quantization=quantization, rescore_factor=rescore_factor)
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            raise FileNotFoundError(
+                f"Index snapshot not found at {self.path}. Run scripts/ingest_ng12.py or scripts/snapshot_index.py export."
+            )
+
+        self.header = read_snapshot_header(self.path)
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buf = memoryview(self._mm)
+
+        self._mat = self._array("embeddings")
+        if self.quantization == "int8":
+            self._qmat = self._array("int8")
+            self._qscales = self._array("int8_scales")
+        elif self.quantization == "float16":
+            self._qmat = self._array("float16")
+
+        chunks = json.loads(self._bytes("chunks").decode("utf-8"))
+        self._ids = list(chunks.get("ids") or [])
+        self._metas = list(chunks.get("metadatas") or [])
+        self._docs = _DocTable(self._section("doc_blob"), self._array("doc_offsets"))
+        self._version = str(self.header.get("index_version") or f"snapshot:{len(self._ids)}")
+
+        if len(self._docs) != len(self._ids):
+            raise ValueError(f"Snapshot is inconsistent: {len(self._docs)} texts for {len(self._ids)} ids")
+
+    # -----------------------------
+    # Sections
+    # -----------------------------
+    def _section(self, name: str) -> memoryview:
+        s = self.header["sections"][name]
+        return self._buf[int(s["offset"]) : int(s["offset"]) + int(s["nbytes"])]
+
+    def _bytes(self, name: str) -> bytes:
+        return bytes(self._section(name))
+
+    def _array(self, name: str) -> np.ndarray:
+        s = self.header["sections"][name]
+        return np.frombuffer(self._section(name), dtype=np.dtype(s["dtype"])).reshape(s["shape"])
+
+    def chunk_features(self) -> Dict[str, Any]:
+        """The embedded chunk-feature payload (read by NG12Retriever instead of the sidecar)."""
+        return json.loads(self._bytes("features").decode("utf-8")) if "features" in self.header["sections"] else {}
+
+    def verify(self) -> List[str]:
+        """Names of sections whose sha256 does not match the header (reads the whole file)."""
+        bad = []
+        for name, s in self.header["sections"].items():
+            if hashlib.sha256(self._section(name)).hexdigest() != s.get("sha256"):
+                bad.append(name)
+        return bad
+
+    def dump(self) -> Dict[str, Any]:
+        """Same shape as ChromaVectorStore.dump (used by scripts/snapshot_index.py import)."""
+        return {
+            "ids": list(self._ids),
+            "documents": list(self._docs),
+            "metadatas": list(self._metas),
+            "embeddings": np.asarray(self._mat).tolist(),
+        }
+
+    def resident_bytes(self) -> int:
+        """Every section is a view of the shared read-only mapping."""
+        return 0
+
+    # -----------------------------
+    # Build
+    # -----------------------------
+    @staticmethod
+    def write(
+        path: str | Path,
+        ids: List[str],
+        documents: List[str],
+        metadatas: List[Dict[str, Any]],
+        embeddings: List[List[float]],
+        index_version: str = "",
+        embedding_model: str = "",
+        features: Optional[Dict[str, Any]] = None,
+    ) -> Path:
+        mat = np.ascontiguousarray(_normalize_rows(np.asarray(embeddings, dtype=np.float32)), dtype=np.float32)
+        if mat.ndim != 2:
+            mat = mat.reshape(len(ids), -1)
+        q8, scales = quantize_int8(mat)
+        return SnapshotVectorStore.write_arrays(
+            path, ids, documents, metadatas, mat, q8, scales, mat.astype(np.float16),
+            index_version=index_version, embedding_model=embedding_model, features=features,
+        )
+
+    @staticmethod
+    def write_arrays(
+        path: str | Path,
+        ids: List[str],
+        documents: List[str],
+        metadatas: List[Dict[str, Any]],
+        mat: np.ndarray,
+        q8: np.ndarray,
+        scales: np.ndarray,
+        f16: np.ndarray,
+        index_version: str = "",
+        embedding_model: str = "",
+        features: Optional[Dict[str, Any]] = None,
+    ) -> Path:
+        """
+        write() from already normalized / quantized matrices (e.g. the memory-mapped
+        NumPy index files). Array sections are hashed and copied SECTION_BLOCK_ROWS rows
+        at a time, so mapped inputs are never materialized whole.
+        """
+        p = Path(path)
+        p.parent.mkdir(parents=True, exist_ok=True)
+
+        encoded = [(d or "").encode("utf-8") for d in documents]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.uint64)
+        offsets[1:] = np.cumsum([len(b) for b in encoded], dtype=np.uint64)
+
+        sections: List[Tuple[str, Any]] = [
+            ("embeddings", mat),
+            ("int8", q8),
+            ("int8_scales", scales),
+            ("float16", f16),
+            ("doc_offsets", offsets),
+            ("doc_blob", b"".join(encoded)),
+            ("chunks", json.dumps({"ids": list(ids), "metadatas": list(metadatas)}).encode("utf-8")),
+        ]
+        if features is not None:
+            sections.append(("features", json.dumps(features, separators=(",", ":")).encode("utf-8")))
+
+        digests = {}
+        for name, data in sections:
+            h = hashlib.sha256()
+            for piece in _pieces(data):
+                h.update(piece)
+            digests[name] = h.hexdigest()
+
+        def header_for(base: int) -> Dict[str, Any]:
+            table: Dict[str, Any] = {}
+            off = base
+            for name, data in sections:
+                nbytes = _nbytes(data)
+                is_arr = isinstance(data, np.ndarray)
+                table[name] = {
+                    "offset": off,
+                    "nbytes": nbytes,
+                    "dtype": data.dtype.str if is_arr else "|u1",
+                    "shape": list(data.shape) if is_arr else [nbytes],
+                    "sha256": digests[name],
+                }
+                off += nbytes + _pad(nbytes)
+            return {
+                "format": "ng12-index-snapshot",
+                "index_version": index_version,
+                "embedding_model": embedding_model,
+                "n": len(ids),
+                "dim": int(mat.shape[1]) if mat.size else 0,
+                "created_at": int(time.time()),
+                "sections": table,
+            }
+
+        # header length depends on the offsets it records: size it twice
+        # (offsets are right-padded numbers, so the second pass is stable)
+        probe = json.dumps(header_for(10**12)).encode("utf-8")
+        base = _PREAMBLE.size + len(probe)
+        base += _pad(base)
+        header = json.dumps(header_for(base)).encode("utf-8").ljust(len(probe))
+
+        tmp = p.with_name(p.name + ".tmp")
+        with open(tmp, "wb") as f:
+            f.write(_PREAMBLE.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(header)))
+            f.write(header)
+            f.write(b"\0" * (base - _PREAMBLE.size - len(header)))
+            for _, data in sections:
+                for piece in _pieces(data):
+                    f.write(piece)
+                f.write(b"\0" * _pad(_nbytes(data)))
+        tmp.replace(p)
+        return p
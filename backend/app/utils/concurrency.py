@@ -0,0 +1,64 @@
+# app/utils/concurrency.py
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from typing import Any, Callable, Deque, Iterable, Iterator, Set, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def bounded_map(
+    executor: Executor,
+    fn: Callable[[T], R],
+    items: Iterable[T],
+    max_in_flight: int,
+    ordered: bool = True,
+) -> Iterator[R]:
+    """
+    Lazy Executor.map with back-pressure.
+
+    `items` is consumed only as results are taken, so at most `max_in_flight`
+    calls are submitted-but-unconsumed at any time (Executor.map submits the
+    whole iterable up front). ordered=True yields in input order; ordered=False
+    yields as calls complete. The first exception is re-raised to the caller.
+    """
+    limit = max(1, int(max_in_flight))
+    it = iter(items)
+
+    if ordered:
+        queue: Deque[Future] = deque()
+        for item in it:
+            queue.append(executor.submit(fn, item))
+            if len(queue) >= limit:
+                yield queue.popleft().result()
+        while queue:
+            yield queue.popleft().result()
+        return
+
+    pending: Set[Future] = set()
+    for item in it:
+        pending.add(executor.submit(fn, item))
+        if len(pending) >= limit:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for f in done:
+                yield f.result()
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for f in done:
+            yield f.result()
+
+
+async def call_async(obj: Any, name: str, *args: Any, **kwargs: Any) -> Any:
+    """
+    Await obj.a<name>(...) when the object has a native async variant,
+    otherwise run the blocking obj.<name>(...) in a worker thread.
+    Lets async graph nodes use providers / stores that are sync-only.
+    """
+    afn = getattr(obj, "a" + name, None)
+    if afn is not None and asyncio.iscoroutinefunction(afn):
+        return await afn(*args, **kwargs)
+    return await asyncio.to_thread(getattr(obj, name), *args, **kwargs)
@@ -0,0 +1,113 @@
+# scripts/bench_phrase_matcher.py
+#
+# Per-hit cost of lexicon scanning: repeated `phrase in text` loops (previous
+# implementation) vs one pass of the shared Aho-Corasick PhraseMatcher.
+#
+#   phrases:  which lexicon phrases occur in a chunk
+#   features: full chunk feature computation (chunk_features.compute_features)
+#
+# Usage (from backend/, after scripts/ingest_ng12.py):
+#   PYTHONPATH=. python scripts/bench_phrase_matcher.py [--repeats 20]
+
+import argparse
+import json
+import statistics
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from app.config.settings import settings
+from app.retrieval.chunk_features import CRITERIA_FLAGS, compute_features, normalize
+from app.retrieval.lexicon import BOILERPLATE_PHRASES, CLINICAL_MARKERS, SYMPTOM_TERMS, all_phrases
+from app.retrieval.phrase_matcher import lexicon_matcher
+
+
+def _load_documents() -> List[str]:
+    chunks = Path(settings.NUMPY_INDEX_DIR) / "chunks.json"
+    if chunks.exists():
+        return list(json.loads(chunks.read_text(encoding="utf-8")).get("documents") or [])
+
+    from app.stores.chroma_store import ChromaVectorStore
+
+    return list(ChromaVectorStore().dump()["documents"])
+
+
+def _scan_features(text: str) -> Dict[str, Any]:
+    """Features computed the pre-matcher way: one `in` scan per phrase."""
+    raw = (text or "").strip()
+    t = normalize(raw)
+    marker_hits = [m in t for m in CLINICAL_MARKERS]
+    boilerplate = (not t) or ((not any(marker_hits)) and any(b in t for b in BOILERPLATE_PHRASES))
+    flags = [
+        "symptom and specific features" in t and "recommendation" in t,
+        "suspected cancer pathway" in t,
+        ("refer" in t) or ("consider" in t) or ("offer" in t),
+        "haemoptysis" in t or "hemoptysis" in t,
+        "unexplained haemoptysis" in t or "unexplained hemoptysis" in t,
+        "lung" in t or "respiratory" in t,
+    ]
+    low = raw.lower()
+    terms = {term: low.find(term) for term in SYMPTOM_TERMS if term in t}
+    return {"boilerplate": boilerplate, "marker_hits": marker_hits, "flags": flags, "terms": terms}
+
+
+def _per_hit_us(fn: Callable[[str], Any], docs: List[str], repeats: int) -> float:
+    for d in docs[:10]:
+        fn(d)
+    runs: List[float] = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        for d in docs:
+            fn(d)
+        runs.append((time.perf_counter() - t0) / max(1, len(docs)) * 1e6)
+    return statistics.median(runs)
+
+
+def _check_equivalence(docs: List[str]) -> int:
+    phrases = all_phrases()
+    matcher = lexicon_matcher()
+    mismatches = 0
+    for d in docs:
+        t = normalize(d)
+        f, old = compute_features(d), _scan_features(d)
+        same = (
+            matcher.match(t) == {p for p in phrases if p in t}
+            and f["boilerplate"] == old["boilerplate"]
+            and all(bool(f["flags"] & (1 << i)) == on for i, on in enumerate(old["flags"]))
+            and f["terms"] == old["terms"]
+        )
+        mismatches += 0 if same else 1
+    return mismatches
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark lexicon scanning: `in` loops vs Aho-Corasick")
+    ap.add_argument("--repeats", type=int, default=20)
+    args = ap.parse_args()
+
+    docs = _load_documents()
+    if not docs:
+        raise SystemExit("No chunks found. Run scripts/ingest_ng12.py first.")
+
+    phrases = all_phrases()
+    matcher = lexicon_matcher()
+    normed = [normalize(d) for d in docs]
+
+    scan_phrases = _per_hit_us(lambda t: {p for p in phrases if p in t}, normed, args.repeats)
+    ac_phrases = _per_hit_us(matcher.match, normed, args.repeats)
+    scan_features = _per_hit_us(_scan_features, docs, args.repeats)
+    ac_features = _per_hit_us(compute_features, docs, args.repeats)
+
+    report = {
+        "chunks": len(docs),
+        "lexicon_phrases": len(phrases),
+        "criteria_flags": len(CRITERIA_FLAGS),
+        "mismatches": _check_equivalence(docs),
+        "phrases_us_per_hit": {"scan": scan_phrases, "aho_corasick": ac_phrases, "speedup": scan_phrases / ac_phrases},
+        "features_us_per_hit": {"scan": scan_features, "aho_corasick": ac_features, "speedup": scan_features / ac_features},
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# scripts/bench_startup.py
+#
+# Cold-start cost of each vector store backend, as a fresh uvicorn worker pays it:
+# every run is a new Python process that imports the store module, opens the
+# index and answers one query.
+#
+#   import_ms:      importing the store module (chromadb vs numpy only)
+#   open_ms:        constructing the store (PersistentClient + collection / np.load / mmap)
+#   first_query_ms: first top-k query (Chroma loads its HNSW segment here)
+#   rss_mb:         process RSS after the first query
+#
+# Usage (from backend/, after scripts/ingest_ng12.py):
+#   PYTHONPATH=. python scripts/bench_startup.py [--runs 5] [--backends chroma,numpy,snapshot]
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+from app.config.settings import settings
+
+_CHILD = r"""
+import json, resource, sys, time
+kind = sys.argv[1]
+from app.config.settings import settings
+t0 = time.perf_counter()
+if kind == "chroma":
+    from app.stores.chroma_store import ChromaVectorStore as Store
+elif kind == "numpy":
+    from app.stores.numpy_store import NumpyVectorStore as Store
+else:
+    from app.stores.snapshot_store import SnapshotVectorStore as Store
+t1 = time.perf_counter()
+store = Store()
+t2 = time.perf_counter()
+dim = int(sys.argv[2])
+hits = store.query([1.0 / dim ** 0.5] * dim, 5)
+t3 = time.perf_counter()
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+print(json.dumps({"import_ms": (t1 - t0) * 1e3, "open_ms": (t2 - t1) * 1e3,
+                  "first_query_ms": (t3 - t2) * 1e3, "rss_mb": rss, "hits": len(hits)}))
+"""
+
+
+def _dim() -> int:
+    from app.stores.snapshot_store import read_snapshot_header
+
+    if Path(settings.SNAPSHOT_PATH).exists():
+        return int(read_snapshot_header(settings.SNAPSHOT_PATH)["dim"])
+    import numpy as np
+
+    return int(np.load(str(Path(settings.NUMPY_INDEX_DIR) / "embeddings.npy"), mmap_mode="r").shape[1])
+
+
+def _run(kind: str, dim: int) -> Dict[str, Any]:
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [os.getcwd(), os.environ.get("PYTHONPATH")]))}
+    out = subprocess.run(
+        [sys.executable, "-c", _CHILD, kind, str(dim)], capture_output=True, text=True, env=env, check=True
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def _on_disk_bytes(kind: str) -> int:
+    if kind == "snapshot":
+        return Path(settings.SNAPSHOT_PATH).stat().st_size
+    root = Path(settings.CHROMA_DIR if kind == "chroma" else settings.NUMPY_INDEX_DIR)
+    return sum(p.stat().st_size for p in root.rglob("*") if p.is_file())
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark vector store cold start (one process per run)")
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--backends", default="chroma,numpy,snapshot")
+    args = ap.parse_args()
+
+    dim = _dim()
+    report: Dict[str, Any] = {"dim": dim, "runs": args.runs, "backends": {}}
+    for kind in [b.strip() for b in args.backends.split(",") if b.strip()]:
+        runs: List[Dict[str, Any]] = [_run(kind, dim) for _ in range(args.runs)]
+        report["backends"][kind] = {
+            **{k: statistics.median(r[k] for r in runs) for k in ("import_ms", "open_ms", "first_query_ms", "rss_mb")},
+            "on_disk_bytes": _on_disk_bytes(kind),
+        }
+
+    base = report["backends"].get("chroma")
+    if base:
+        for kind, r in report["backends"].items():
+            total = r["import_ms"] + r["open_ms"] + r["first_query_ms"]
+            r["cold_start_speedup_vs_chroma"] = (base["import_ms"] + base["open_ms"] + base["first_query_ms"]) / max(total, 1e-9)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
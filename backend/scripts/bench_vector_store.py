@@ -0,0 +1,168 @@
+# scripts/bench_vector_store.py
+#
+# Compare ChromaVectorStore vs NumpyVectorStore:
+#   - cold start: fresh process -> store opened -> first query answered
+#   - query latency: p50 / p95 / mean over repeated queries
+#
+# Usage (from backend/):
+#   PYTHONPATH=. python scripts/bench_vector_store.py                 # uses the ingested indexes
+#   PYTHONPATH=. python scripts/bench_vector_store.py --synthetic 400 # random corpus, no ingest/network needed
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+
+def _open_store(kind: str, chroma_dir: str, numpy_dir: str, collection: str):
+    if kind == "chroma":
+        from app.stores.chroma_store import ChromaVectorStore
+
+        return ChromaVectorStore(persist_dir=chroma_dir, collection_name=collection)
+
+    from app.stores.numpy_store import NumpyVectorStore
+
+    return NumpyVectorStore(index_dir=numpy_dir)
+
+
+def _cold_start_child(args) -> None:
+    # runs in a fresh interpreter: includes module import + index open + first query
+    t0 = time.perf_counter()
+    store = _open_store(args.cold, args.chroma_dir, args.numpy_dir, args.collection)
+    t1 = time.perf_counter()
+    q = json.loads(sys.stdin.read())
+    store.query(query_embedding=q, top_k=args.top_k)
+    t2 = time.perf_counter()
+    print(json.dumps({"open_ms": (t1 - t0) * 1000, "first_query_ms": (t2 - t1) * 1000}))
+
+
+def _cold_start(kind: str, args, query: List[float], runs: int) -> Dict[str, float]:
+    opens, firsts = [], []
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([os.getcwd(), os.environ.get("PYTHONPATH", "")]))
+    for _ in range(runs):
+        out = subprocess.run(
+            [
+                sys.executable, __file__, "--cold", kind,
+                "--chroma-dir", args.chroma_dir, "--numpy-dir", args.numpy_dir,
+                "--collection", args.collection, "--top-k", str(args.top_k),
+            ],
+            input=json.dumps(query),
+            capture_output=True,
+            text=True,
+            env=env,
+            check=True,
+        )
+        r = json.loads(out.stdout.strip().splitlines()[-1])
+        opens.append(r["open_ms"])
+        firsts.append(r["first_query_ms"])
+    return {
+        "open_ms": statistics.median(opens),
+        "first_query_ms": statistics.median(firsts),
+        "total_ms": statistics.median([a + b for a, b in zip(opens, firsts)]),
+    }
+
+
+def _latency(store, queries: np.ndarray, top_k: int, repeats: int) -> Dict[str, float]:
+    # warm-up
+    for q in queries[:5]:
+        store.query(query_embedding=q.tolist(), top_k=top_k)
+
+    samples: List[float] = []
+    for _ in range(repeats):
+        for q in queries:
+            ql = q.tolist()
+            t0 = time.perf_counter()
+            store.query(query_embedding=ql, top_k=top_k)
+            samples.append((time.perf_counter() - t0) * 1000)
+
+    samples.sort()
+    return {
+        "p50_ms": samples[len(samples) // 2],
+        "p95_ms": samples[int(len(samples) * 0.95) - 1],
+        "mean_ms": statistics.fmean(samples),
+        "n": len(samples),
+    }
+
+
+def _build_synthetic(n: int, dim: int, seed: int = 7) -> Dict[str, Any]:
+    from app.stores.chroma_store import ChromaVectorStore
+    from app.stores.numpy_store import NumpyVectorStore
+
+    rng = np.random.default_rng(seed)
+    embs = rng.standard_normal((n, dim)).astype(np.float32)
+    embs /= np.linalg.norm(embs, axis=1, keepdims=True)
+
+    ids = [f"syn_{i:05d}" for i in range(n)]
+    docs = [f"synthetic chunk {i}" for i in range(n)]
+    metas = [{"page": 1 + i // 4, "source": "synthetic"} for i in range(n)]
+
+    root = tempfile.mkdtemp(prefix="bench_vs_")
+    chroma_dir = os.path.join(root, "chroma")
+    numpy_dir = os.path.join(root, "numpy")
+
+    store = ChromaVectorStore(persist_dir=chroma_dir, collection_name="bench")
+    for start in range(0, n, 256):
+        store.upsert(
+            ids[start : start + 256],
+            docs[start : start + 256],
+            metas[start : start + 256],
+            embs[start : start + 256].tolist(),
+        )
+    NumpyVectorStore.write(numpy_dir, ids, docs, metas, embs.tolist(), index_version="synthetic")
+    return {"chroma_dir": chroma_dir, "numpy_dir": numpy_dir, "collection": "bench"}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark Chroma vs in-process NumPy vector index")
+    ap.add_argument("--synthetic", type=int, default=0, help="build a random corpus of N chunks instead of using the ingested index")
+    ap.add_argument("--dim", type=int, default=3072)
+    ap.add_argument("--queries", type=int, default=50)
+    ap.add_argument("--repeats", type=int, default=5)
+    ap.add_argument("--cold-runs", type=int, default=3)
+    ap.add_argument("--top-k", type=int, default=8)
+    ap.add_argument("--chroma-dir", default=None)
+    ap.add_argument("--numpy-dir", default=None)
+    ap.add_argument("--collection", default=None)
+    ap.add_argument("--cold", choices=["chroma", "numpy"], default=None, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.cold:
+        _cold_start_child(args)
+        return
+
+    if args.synthetic:
+        paths = _build_synthetic(args.synthetic, args.dim)
+        args.chroma_dir, args.numpy_dir, args.collection = paths["chroma_dir"], paths["numpy_dir"], paths["collection"]
+    else:
+        from app.config.settings import settings
+
+        args.chroma_dir = args.chroma_dir or str(settings.CHROMA_DIR)
+        args.numpy_dir = args.numpy_dir or str(settings.NUMPY_INDEX_DIR)
+        args.collection = args.collection or str(settings.CHROMA_COLLECTION)
+
+    # queries: stored vectors + noise, so no embedding round trip is needed
+    base = np.load(os.path.join(args.numpy_dir, "embeddings.npy"))
+    rng = np.random.default_rng(11)
+    pick = rng.integers(0, base.shape[0], size=args.queries)
+    queries = base[pick] + 0.05 * rng.standard_normal((args.queries, base.shape[1])).astype(np.float32)
+
+    report: Dict[str, Any] = {"corpus": int(base.shape[0]), "dim": int(base.shape[1]), "top_k": args.top_k}
+    for kind in ("chroma", "numpy"):
+        store = _open_store(kind, args.chroma_dir, args.numpy_dir, args.collection)
+        report[kind] = {
+            "query": _latency(store, queries, args.top_k, args.repeats),
+            "cold_start": _cold_start(kind, args, queries[0].tolist(), args.cold_runs),
+        }
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# scripts/check_rule_table.py
+#
+# Regression check of the ingest rule table (RULE_TABLE_PATH) against the real NG12 parse:
+# which synthetic patients may be answered from the table alone (match_rule_table bypass:
+# a "refer" recommendation met by a criterion whose whole source text is modelled).
+#
+#   must_not_bypass: a condition the table cannot check (7-point checklist score, chest
+#                    X-ray findings, FIT result, exclusions) was part of the recommendation,
+#                    or the patient's symptom does not assert the term (negated, resolved,
+#                    part of a longer word or term)
+#   must_bypass:     plain symptom + age recommendations still skip retrieval and the LLM
+#
+# Usage (from backend/, after scripts/ingest_ng12.py):
+#   PYTHONPATH=. python scripts/check_rule_table.py
+# Exits 1 when a case fails.
+
+import json
+from typing import Any, Dict, List, Set
+
+from app.config.settings import settings
+from app.domain.models import Patient
+from app.retrieval.recommendations import RecommendationIndex
+
+# (rec_id, age, gender, symptoms)
+MUST_NOT_BYPASS = [
+    ("1.7.1", 30, "female", ["skin lesion"]),
+    ("1.7.1", 52, "male", ["pigmented skin lesion"]),
+    ("1.1.1", 50, "male", ["chest x-ray"]),
+    ("1.1.1", 50, "male", ["chest x-ray normal"]),
+    ("1.1.4", 50, "male", ["chest x-ray normal"]),
+    ("1.6.6", 60, "male", ["visible haematuria"]),  # "without urinary tract infection"
+    ("1.1.1", 55, "male", ["no haemoptysis"]),
+    ("1.2.1", 55, "female", ["no dysphagia"]),
+    ("1.2.1", 55, "female", ["dysphagia resolved"]),
+    ("1.2.7", 55, "female", ["denies dysphagia"]),
+    ("1.4.1", 55, "female", ["breast lumpectomy scar"]),
+    ("1.6.4", 65, "male", ["non-visible haematuria"]),
+]
+MUST_BYPASS = [
+    ("1.1.1", 45, "male", ["haemoptysis"]),
+    ("1.2.1", 50, "female", ["dysphagia"]),
+    ("1.2.4", 62, "male", ["jaundice"]),
+    ("1.4.1", 35, "female", ["breast lump"]),
+]
+
+
+def bypassed(idx: RecommendationIndex, age: int, gender: str, symptoms: List[str]) -> Set[str]:
+    p = Patient(patient_id="CHECK", age=age, gender=gender, symptoms=symptoms)
+    return {
+        m["rule"]["rec_id"]
+        for m in idx.lookup(p)
+        if m["rule"].get("action") == "refer" and m["criterion"].get("bypass")
+    }
+
+
+def main():
+    idx = RecommendationIndex(settings.RULE_TABLE_PATH)
+    if not len(idx):
+        raise SystemExit(f"No rule table at {settings.RULE_TABLE_PATH}. Run scripts/ingest_ng12.py first.")
+
+    failures: List[Dict[str, Any]] = []
+    for expected, cases in ((False, MUST_NOT_BYPASS), (True, MUST_BYPASS)):
+        for rec_id, age, gender, symptoms in cases:
+            got = rec_id in bypassed(idx, age, gender, symptoms)
+            if got != expected:
+                failures.append({"rec_id": rec_id, "age": age, "symptoms": symptoms, "expected_bypass": expected})
+
+    print(json.dumps({"cases": len(MUST_NOT_BYPASS) + len(MUST_BYPASS), "failures": failures}, indent=2))
+    if failures:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# scripts/eval_quantization.py
+#
+# Memory saved, recall@k and query latency of the quantized NumPy index modes vs the float32 index.
+# Recall@k = |top-k(quantized) ∩ top-k(exact float32)| / k, averaged over the golden queries.
+# Latency: single-query store.query() wall time (p50 / p95 over --repeats passes of the golden
+# queries, after one warm-up pass), plus one query_many() over all of them.
+#
+# Usage (from backend/, after scripts/ingest_ng12.py):
+#   PYTHONPATH=. python scripts/eval_quantization.py [--k 5] [--rescore-factor 4] [--repeats 5]
+
+import argparse
+import json
+import statistics
+import time
+from typing import Any, Dict, List
+
+from app.config.settings import settings
+from app.providers.embedding_registry import get_embedding_provider
+from app.stores.numpy_store import NumpyVectorStore
+from app.utils.text import normalize_query
+
+# Representative NG12 questions (assessor queries for the E2E patients + common chat topics)
+GOLDEN_QUERIES: List[str] = [
+    "ng12 visible haematuria 45 and over suspected cancer pathway referral",
+    "aged 40 and over with unexplained haemoptysis refer lung cancer",
+    "dysphagia suspected cancer pathway referral oesophageal cancer",
+    "aged 55 and over weight loss upper abdominal pain reflux dyspepsia",
+    "urgent chest x-ray aged 40 and over cough fatigue shortness of breath ever smoked",
+    "unexplained breast lump aged 30 and over refer breast cancer",
+    "rectal bleeding change in bowel habit faecal immunochemical test colorectal",
+    "persistent unexplained hoarseness aged 45 and over head and neck cancer",
+    "iron deficiency anaemia aged 60 and over colorectal cancer referral",
+    "post-menopausal bleeding aged 55 and over endometrial cancer",
+    "unexplained lump in the neck laryngeal cancer referral",
+    "jaundice aged 40 and over pancreatic cancer referral",
+    "raised psa prostate cancer referral erectile dysfunction lower urinary tract symptoms",
+    "pigmented skin lesion weighted 7-point checklist melanoma",
+    "safety netting review people with symptoms who do not meet referral criteria",
+    "children and young people unexplained bruising leukaemia very urgent full blood count",
+]
+
+
+def _ids(hits: List[Dict[str, Any]]) -> List[str]:
+    return [str(h["id"]) for h in hits]
+
+
+def _latency(store: NumpyVectorStore, q_embs: List[List[float]], k: int, repeats: int) -> Dict[str, float]:
+    for q in q_embs:
+        store.query(q, k)  # warm-up (page faults, scratch buffers)
+    xs: List[float] = []
+    for _ in range(max(1, repeats)):
+        for q in q_embs:
+            t0 = time.perf_counter()
+            store.query(q, k)
+            xs.append((time.perf_counter() - t0) * 1000)
+    xs.sort()
+    t0 = time.perf_counter()
+    store.query_many(q_embs, k)
+    return {
+        "query_ms_p50": round(xs[len(xs) // 2], 3),
+        "query_ms_p95": round(xs[min(len(xs) - 1, int(0.95 * len(xs)))], 3),
+        "batch_query_ms": round((time.perf_counter() - t0) * 1000, 3),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Quantized NumPy index: memory + recall@k vs float32")
+    ap.add_argument("--k", type=int, default=5)
+    ap.add_argument("--rescore-factor", type=int, default=settings.NUMPY_INDEX_RESCORE_FACTOR)
+    ap.add_argument("--index-dir", default=str(settings.NUMPY_INDEX_DIR))
+    ap.add_argument("--repeats", type=int, default=5)
+    args = ap.parse_args()
+
+    embedder = get_embedding_provider(settings.EMBEDDING_PROVIDER)
+    q_embs = embedder.embed_texts([normalize_query(q) for q in GOLDEN_QUERIES])
+
+    exact = NumpyVectorStore(index_dir=args.index_dir, mmap=False, quantization="none")
+    truth = [_ids(h) for h in exact.query_many(q_embs, args.k)]
+    float_bytes = int(exact._mat.nbytes)
+
+    report: Dict[str, Any] = {
+        "queries": len(GOLDEN_QUERIES),
+        "k": args.k,
+        "rescore_factor": args.rescore_factor,
+        "float32": {"resident_bytes": float_bytes, **_latency(exact, q_embs, args.k, args.repeats)},
+    }
+
+    for mode in ("float16", "int8"):
+        store = NumpyVectorStore(index_dir=args.index_dir, quantization=mode, rescore_factor=args.rescore_factor)
+        got = [_ids(h) for h in store.query_many(q_embs, args.k)]
+
+        # coarse-only recall shows what the exact re-score buys back
+        coarse = NumpyVectorStore(index_dir=args.index_dir, quantization=mode, rescore_factor=1)
+        coarse_got = [_ids(h) for h in coarse.query_many(q_embs, args.k)]
+
+        def recall(results: List[List[str]]) -> float:
+            return statistics.fmean(
+                len(set(r) & set(t)) / max(1, len(t)) for r, t in zip(results, truth)
+            )
+
+        resident = store.resident_bytes()
+        report[mode] = {
+            "resident_bytes": resident,
+            "memory_saved_pct": round(100.0 * (1.0 - resident / float_bytes), 1) if float_bytes else 0.0,
+            f"recall@{args.k}": round(recall(got), 4),
+            f"recall@{args.k}_coarse_only": round(recall(coarse_got), 4),
+            **_latency(store, q_embs, args.k, args.repeats),
+        }
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
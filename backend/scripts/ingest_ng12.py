@@ -1,14 +1,39 @@
 # scripts/ingest_ng12.py
 
+import argparse
+import json
 import os
 import re
-from typing import List, Dict, Any
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
 
+import numpy as np
 from pypdf import PdfReader
+from tenacity import Retrying, stop_after_attempt, wait_exponential_jitter
 
 from app.config.settings import settings
 from app.stores.chroma_store import ChromaVectorStore
-from app.providers.vertex_embeddings import VertexEmbeddingProvider
+from app.stores.numpy_store import (
+    EMBEDDINGS_FILE,
+    FLOAT16_FILE,
+    INT8_FILE,
+    INT8_SCALES_FILE,
+    NumpyVectorStore,
+)
+from app.stores.snapshot_store import SnapshotVectorStore
+from app.retrieval.bm25 import BM25Index
+from app.retrieval.site_tagging import SiteTagger
+from app.retrieval.chunk_features import chunk_features_payload, write_chunk_features
+from app.retrieval.recommendations import parse_recommendations, write_recommendations
+from app.retrieval.lexicon import CRITERIA_SIGNALS
+from app.retrieval.dedupe import collapse_near_duplicates
+from app.retrieval.phrase_matcher import lexicon_matcher
+from app.providers.embedding_registry import get_embedding_provider
+from app.stores.index_meta import write_index_meta
+from app.stores.ingest_manifest import build_manifest, diff_manifest, read_manifest, write_manifest
+from app.utils.concurrency import bounded_map
 
 
 FOOTER_PATTERNS = [
@@ -84,35 +109,72 @@ def split_into_paragraph_chunks(text: str, max_chars: int = 1400, overlap_chars:
 
 
 def has_criteria_signals(text: str) -> bool:
-    t = (text or "").lower()
-    signals = [
-        "refer", "consider", "offer", "suspected cancer pathway",
-        "symptom and specific features", "possible cancer", "recommendation",
-        "aged", "and over", "within", "weeks",
-    ]
-    return any(s in t for s in signals)
+    found = lexicon_matcher().match((text or "").lower())
+    return any(s in found for s in CRITERIA_SIGNALS)
 
 
-def main():
-    pdf_path = str(settings.NG12_PDF_PATH)
-    if not os.path.exists(pdf_path):
-        raise FileNotFoundError(f"NG12 PDF not found at {pdf_path}")
+# -------------------------
+# Stage 1: page extraction (process pool; pypdf text extraction is CPU-bound)
+# -------------------------
+_worker_reader: Optional[PdfReader] = None
+
+
+def _open_worker_reader(pdf_path: str) -> None:
+    # one parsed PDF per worker process, reused for every page it extracts
+    global _worker_reader
+    _worker_reader = PdfReader(pdf_path)
+
+
+def _extract_page(page_idx: int) -> Tuple[int, str]:
+    page = _worker_reader.pages[page_idx - 1]
+    return page_idx, clean_text(page.extract_text() or "")
+
+
+def ingest_workers() -> int:
+    n = int(settings.INGEST_WORKERS)
+    return n if n > 0 else max(1, min(4, os.cpu_count() or 1))
+
+
+def iter_page_texts(pdf_path: str, workers: int) -> Iterator[Tuple[int, str]]:
+    """(page number, cleaned text) in page order; pages are extracted `workers` at a time, ahead of the consumer."""
+    n_pages = len(PdfReader(pdf_path).pages)
+    if workers <= 1:
+        _open_worker_reader(pdf_path)
+        for page_idx in range(1, n_pages + 1):
+            yield _extract_page(page_idx)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_open_worker_reader, initargs=(pdf_path,)) as pool:
+        yield from bounded_map(pool, _extract_page, range(1, n_pages + 1), max_in_flight=workers * 2)
 
-    reader = PdfReader(pdf_path)
-    store = ChromaVectorStore()
-    embedder = VertexEmbeddingProvider()
 
+# -------------------------
+# Stage 2: chunking + tagging (in order: site headings carry over between pages)
+# -------------------------
+def extract_chunks(
+    page_texts: Iterable[Tuple[int, str]],
+) -> Tuple[Dict[int, str], List[str], List[str], List[Dict[str, Any]]]:
+    """
+    Cleaned page texts plus chunk ids / documents / metadata, consumed page by page.
+
+    Pages arrive from the extraction pool as they finish, but the result is the whole
+    document's text: near-duplicate collapse, the manifest diff, BM25 and the rule
+    table all need every chunk at once. Only text is held here, never vectors.
+    """
+    pages: Dict[int, str] = {}
     ids: List[str] = []
     docs: List[str] = []
     metas: List[Dict[str, Any]] = []
+    # site section tags (pages are visited in order, so headings carry over)
+    tagger = SiteTagger()
 
-    for page_idx, page in enumerate(reader.pages, start=1):
-        raw = page.extract_text() or ""
-        text = clean_text(raw)
+    for page_idx, text in page_texts:
         if not text:
             continue
+        pages[page_idx] = text
 
         chunks = split_into_paragraph_chunks(text, max_chars=1400, overlap_chars=160)
+        page_start = len(ids)
         for ci, ch in enumerate(chunks):
             ch = ch.strip()
             if not ch:
@@ -126,19 +188,205 @@ def main():
                     "page": page_idx,
                     "source": "NG12 PDF",
                     "has_criteria": bool(has_criteria_signals(ch)),
+                    **tagger.tag_chunk(page_idx, ch),
                 }
             )
 
-    # batch embed + upsert
-    B = 32
-    for start in range(0, len(docs), B):
-        batch_docs = docs[start : start + B]
-        batch_ids = ids[start : start + B]
-        batch_metas = metas[start : start + B]
-        embs = embedder.embed_texts(batch_docs)
-        store.upsert(batch_ids, batch_docs, batch_metas, embs)
+        # adjacency map: consecutive chunks of a page share overlap_chars of text
+        for j in range(page_start, len(ids)):
+            metas[j]["prev_id"] = ids[j - 1] if j > page_start else ""
+            metas[j]["next_id"] = ids[j + 1] if j + 1 < len(ids) else ""
+
+    return pages, ids, docs, metas
+
+
+# -------------------------
+# Stage 3 + 4: concurrent embedding (bounded, retried) -> batched upserts
+# -------------------------
+def _embed_with_retry(embedder, texts: List[str]) -> List[List[float]]:
+    # rate limits / transient provider errors: exponential backoff with jitter, then give up loudly
+    for attempt in Retrying(
+        stop=stop_after_attempt(settings.INGEST_EMBED_RETRIES),
+        wait=wait_exponential_jitter(initial=1, max=30),
+        reraise=True,
+    ):
+        with attempt:
+            return embedder.embed_texts(texts)
+    return []
+
+
+def embed_and_upsert(
+    store: ChromaVectorStore,
+    embedder,
+    rows: List[int],
+    ids: List[str],
+    docs: List[str],
+    metas: List[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """
+    Embed docs[rows] in INGEST_EMBED_BATCH batches, INGEST_EMBED_CONCURRENCY at a time, and upsert
+    every INGEST_UPSERT_BATCH rows. Batches are produced lazily and upserted as they complete, so at
+    most concurrency * batch + upsert batch vectors are held in memory by this stage.
+
+    docs / metas are the full chunk lists from extract_chunks: chunk text stays whole-corpus
+    (BM25, features and the rule table need all of it); vectors never are.
+    """
+    B = int(settings.INGEST_EMBED_BATCH)
+    U = int(settings.INGEST_UPSERT_BATCH)
+    concurrency = int(settings.INGEST_EMBED_CONCURRENCY)
+
+    def batches() -> Iterator[List[int]]:
+        for start in range(0, len(rows), B):
+            yield rows[start : start + B]
+
+    def embed_batch(batch: List[int]) -> Tuple[List[int], List[List[float]]]:
+        embs = _embed_with_retry(embedder, [docs[i] for i in batch])
+        if len(embs) != len(batch):
+            raise RuntimeError(f"Embedding provider returned {len(embs)} vectors for {len(batch)} texts")
+        return batch, embs
+
+    buf_rows: List[int] = []
+    buf_embs: List[List[float]] = []
+    upserts = 0
+
+    def flush() -> None:
+        nonlocal upserts
+        if buf_rows:
+            store.upsert([ids[i] for i in buf_rows], [docs[i] for i in buf_rows], [metas[i] for i in buf_rows], buf_embs)
+            upserts += 1
+            buf_rows.clear()
+            buf_embs.clear()
+
+    # vector store writes stay on this thread; only the provider calls run concurrently
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="embed") as pool:
+        for batch, embs in bounded_map(pool, embed_batch, batches(), max_in_flight=concurrency, ordered=False):
+            buf_rows.extend(batch)
+            buf_embs.extend(embs)
+            if len(buf_rows) >= U:
+                flush()
+    flush()
+
+    return {"embedded": len(rows), "batches": -(-len(rows) // B), "upserts": upserts}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Ingest the NG12 PDF (incremental against the last ingest manifest)")
+    ap.add_argument("--full", action="store_true", help="ignore the manifest: refit and re-embed every chunk")
+    args = ap.parse_args()
+
+    pdf_path = str(settings.NG12_PDF_PATH)
+    if not os.path.exists(pdf_path):
+        raise FileNotFoundError(f"NG12 PDF not found at {pdf_path}")
+
+    store = ChromaVectorStore()
+    # EMBEDDING_PROVIDER picks vertex | local; re-ingesting an unchanged PDF
+    # only embeds chunks the cache hasn't seen
+    embedder = get_embedding_provider(settings.EMBEDDING_PROVIDER)
+
+    t0 = time.perf_counter()
+    workers = ingest_workers()
+    pages, ids, docs, metas = extract_chunks(iter_page_texts(pdf_path, workers))
+    t_extract = time.perf_counter() - t0
+
+    # near-duplicates (repeated recommendation text, overlapping chunks) -> one canonical chunk
+    n_chunks = len(ids)
+    groups: Dict[str, List[str]] = {}
+    if settings.DEDUPE_ENABLED:
+        ids, docs, metas, groups = collapse_near_duplicates(ids, docs, metas, threshold=settings.DEDUPE_THRESHOLD)
+
+    # corpus-fitted providers (local TF-IDF) learn their weights on a full ingest;
+    # incremental runs keep the fitted weights so unchanged vectors stay valid
+    inner = getattr(embedder, "inner", embedder)
+    if hasattr(inner, "fit") and (args.full or not getattr(inner, "fitted", False)):
+        inner.fit(docs)
+    model_name = str(getattr(embedder, "model_name", ""))
+
+    # diff against the previous ingest (page hashes, chunk hashes, embedding model)
+    old_manifest = {} if args.full else read_manifest(settings.CHROMA_DIR)
+    manifest = build_manifest(model_name, pages, ids, docs, metas)
+    in_store = set(store.ids())
+    if set((old_manifest.get("chunks") or {}).keys()) != in_store:
+        old_manifest = {}  # store and manifest disagree (wiped / other writer): rebuild everything
+    diff = diff_manifest(old_manifest, manifest)
+
+    # chunks that no longer exist (removed pages, collapsed duplicates, stale ids)
+    store.delete(sorted(set(diff.chunks_removed) | (in_store - set(ids))))
+
+    pos = {cid: i for i, cid in enumerate(ids)}
+
+    # concurrent embed + batched upsert: only new or changed text
+    t1 = time.perf_counter()
+    embed_stats = embed_and_upsert(store, embedder, [pos[c] for c in diff.to_embed], ids, docs, metas)
+    t_embed = time.perf_counter() - t1
+
+    # metadata-only changes (site tags, aliases, adjacency): keep the stored vectors
+    U = int(settings.INGEST_UPSERT_BATCH)
+    for start in range(0, len(diff.chunks_meta_changed), U):
+        batch_ids = diff.chunks_meta_changed[start : start + U]
+        rows = [pos[c] for c in batch_ids]
+        embs = store.get_embeddings(batch_ids).tolist()
+        store.upsert(batch_ids, [docs[i] for i in rows], [metas[i] for i in rows], embs)
+
+    # version stamp: retrieval caches key on it, so a re-ingest invalidates them
+    meta = write_index_meta(settings.CHROMA_DIR, model_name, ids, docs, metas)
+
+    # in-process NumPy index (VECTOR_STORE=numpy): stored vectors are paged out of the
+    # collection in upsert-sized blocks straight into memory-mapped .npy files
+    dim = int(store.get_embeddings(ids[:1]).shape[1]) if ids else 0
+    NumpyVectorStore.write_blocks(
+        settings.NUMPY_INDEX_DIR,
+        ids,
+        docs,
+        metas,
+        store.iter_embeddings(ids, batch_size=U),
+        dim=dim,
+        index_version=meta["index_version"],
+    )
+
+    # lexical side of hybrid retrieval
+    BM25Index.build(ids, docs).save(settings.BM25_INDEX_PATH)
+
+    # request-independent reranker features (assessor reads them instead of re-scanning text)
+    features = chunk_features_payload(ids, docs)
+    write_chunk_features(settings.CHUNK_FEATURES_PATH, ids, docs, payload=features)
+
+    # single-file memory-mapped snapshot (VECTOR_STORE=snapshot): fast cold start for every worker.
+    # Its matrices are copied block by block from the NumPy index files just written (mmap_mode="r").
+    def mapped(name: str) -> np.ndarray:
+        return np.load(Path(settings.NUMPY_INDEX_DIR) / name, mmap_mode="r")
+
+    SnapshotVectorStore.write_arrays(
+        settings.SNAPSHOT_PATH,
+        ids,
+        docs,
+        metas,
+        mapped(EMBEDDINGS_FILE),
+        mapped(INT8_FILE),
+        mapped(INT8_SCALES_FILE),
+        mapped(FLOAT16_FILE),
+        index_version=meta["index_version"],
+        embedding_model=model_name,
+        features=features,
+    )
+
+    # structured recommendation table (rec id -> site, ages, symptom terms, action, source chunk/page)
+    rules = parse_recommendations(pages, ids, docs, metas)
+    write_recommendations(settings.RULE_TABLE_PATH, rules, index_version=meta["index_version"])
+
+    # written last: a failed run is simply diffed again next time
+    write_manifest(settings.CHROMA_DIR, manifest)
 
-    print(f"Indexed {len(ids)} chunks into {settings.CHROMA_DIR} / {settings.CHROMA_COLLECTION}")
+    if groups:
+        print(f"Collapsed {n_chunks - len(ids)} near-duplicate chunks into {len(groups)} canonical chunks")
+    print(f"Changes: {json.dumps(diff.summary())}")
+    print(
+        f"Pipeline: extract {t_extract:.2f}s ({len(pages)} pages, {workers} workers), "
+        f"embed+upsert {t_embed:.2f}s ({json.dumps(embed_stats)}, concurrency={settings.INGEST_EMBED_CONCURRENCY})"
+    )
+    print(f"Rule table: {len(rules)} recommendations, {sum(1 for r in rules if r['criteria'])} with symptom criteria -> {settings.RULE_TABLE_PATH}")
+    print(f"Indexed {len(ids)} chunks into {settings.CHROMA_DIR} / {settings.CHROMA_COLLECTION} (index_version={meta['index_version']})")
+    if hasattr(embedder, "stats"):
+        print(f"Embedding cache: {embedder.stats()}")
 
 
 if __name__ == "__main__":
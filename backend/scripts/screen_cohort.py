@@ -0,0 +1,220 @@
+# scripts/screen_cohort.py
+#
+# Offline cohort screening: every patient in PATIENTS_PATH through the assessor
+# graph (AssessorService), on a bounded thread pool, without the HTTP layer.
+#
+#   output:     JSONL, one record per patient as it finishes
+#               {"patient_id", "status": "ok" | "error", "result" | "error", "elapsed_ms"}
+#   checkpoint: JSONL {"patient_id", "status", "offset"} appended after each record is
+#               flushed; a killed run resumes by truncating the checkpoint to its last
+#               complete line and the output to the last checkpointed offset (drops torn
+#               records in both) and skipping finished patients
+#   summary:    throughput, per-node latency (LangGraph callbacks), assessment / path
+#               counts and cache hit rates, printed at the end
+#
+# Usage (from backend/):
+#   PYTHONPATH=. python scripts/screen_cohort.py [--out screening/ng12_screening.jsonl]
+#       [--workers 4] [--top-k 5] [--limit N] [--retry-errors] [--fresh]
+
+import argparse
+import json
+import statistics
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from app.config.container import Container
+from app.config.settings import BASE_DIR, settings
+from app.domain.models import Patient
+from app.utils.concurrency import bounded_map
+
+
+class NodeTimer(BaseCallbackHandler):
+    """Wall time per assessor graph node, from LangGraph's chain start/end callbacks."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._started: Dict[Any, Tuple[str, float]] = {}
+        self.samples: Dict[str, List[float]] = {}
+
+    def on_chain_start(self, serialized, inputs, *, run_id, metadata=None, **kwargs):
+        node = (metadata or {}).get("langgraph_node")
+        # node runs only (routing functions and inner runnables carry another name)
+        if node and kwargs.get("name") == node:
+            with self._lock:
+                self._started[run_id] = (node, time.perf_counter())
+
+    def _finish(self, run_id) -> None:
+        with self._lock:
+            started = self._started.pop(run_id, None)
+            if started is not None:
+                node, t0 = started
+                self.samples.setdefault(node, []).append((time.perf_counter() - t0) * 1e3)
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._finish(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._finish(run_id)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        out = {}
+        with self._lock:
+            for node, xs in self.samples.items():
+                xs = sorted(xs)
+                out[node] = {
+                    "calls": len(xs),
+                    "mean_ms": statistics.fmean(xs),
+                    "p50_ms": xs[len(xs) // 2],
+                    "p95_ms": xs[min(len(xs) - 1, int(0.95 * len(xs)))],
+                    "total_ms": sum(xs),
+                }
+        return dict(sorted(out.items(), key=lambda kv: -kv[1]["total_ms"]))
+
+
+# -----------------------------
+# Checkpoint
+# -----------------------------
+def read_checkpoint(path: Path) -> Tuple[Dict[str, str], int, int]:
+    """
+    ({patient_id: status}, output offset after the last checkpointed record,
+    checkpoint bytes up to the last complete line).
+    """
+    done: Dict[str, str] = {}
+    offset = 0
+    valid = 0
+    if not path.exists():
+        return done, offset, valid
+    for line in path.read_bytes().splitlines(keepends=True):
+        try:
+            if not line.endswith(b"\n"):
+                raise ValueError("unterminated line")
+            row = json.loads(line)
+        except ValueError:
+            break  # torn last line of a killed run
+        done[str(row["patient_id"])] = str(row.get("status") or "ok")
+        offset = max(offset, int(row.get("offset") or 0))
+        valid += len(line)
+    return done, offset, valid
+
+
+def open_outputs(out: Path, ckpt: Path, fresh: bool, retry_errors: bool):
+    out.parent.mkdir(parents=True, exist_ok=True)
+    if fresh:
+        out.unlink(missing_ok=True)
+        ckpt.unlink(missing_ok=True)
+    elif out.exists() and out.stat().st_size and not ckpt.exists():
+        raise SystemExit(f"{out} exists without checkpoint {ckpt}; pass --fresh to overwrite it.")
+
+    done, offset, valid = read_checkpoint(ckpt)
+    with open(out, "ab") as f:
+        f.truncate(offset)  # anything past the last checkpoint was not recorded as finished
+    if ckpt.exists():
+        with open(ckpt, "ab") as f:
+            f.truncate(valid)  # new checkpoints must follow the last complete line, not a torn one
+    skip = {pid for pid, status in done.items() if status == "ok" or not retry_errors}
+    return open(out, "ab"), open(ckpt, "a", encoding="utf-8"), skip
+
+
+# -----------------------------
+# Run
+# -----------------------------
+def main():
+    ap = argparse.ArgumentParser(description="Screen every patient through the NG12 assessor (resumable)")
+    ap.add_argument("--out", default=str(BASE_DIR / "screening" / "ng12_screening.jsonl"))
+    ap.add_argument("--checkpoint", default=None, help="default: <out>.ckpt")
+    ap.add_argument("--workers", type=int, default=settings.ASSESS_BATCH_WORKERS)
+    ap.add_argument("--top-k", type=int, default=settings.DEFAULT_TOP_K)
+    ap.add_argument("--limit", type=int, default=0, help="stop after N patients (0 = all)")
+    ap.add_argument("--retry-errors", action="store_true", help="re-run patients that failed in an earlier run")
+    ap.add_argument("--fresh", action="store_true", help="discard previous output and checkpoint")
+    args = ap.parse_args()
+
+    out_path = Path(args.out)
+    ckpt_path = Path(args.checkpoint or f"{out_path}.ckpt")
+    c = Container()
+    timer = NodeTimer()
+    out_f, ckpt_f, skip = open_outputs(out_path, ckpt_path, args.fresh, args.retry_errors)
+
+    def todo():
+        n = 0
+        for p in c.patients.iter_patients():
+            if p.patient_id in skip:
+                continue
+            if args.limit and n >= args.limit:
+                return
+            n += 1
+            yield p
+
+    def run(p: Patient) -> Dict[str, Any]:
+        t0 = time.perf_counter()
+        try:
+            resp = c.assessor_service.assess(p.patient_id, args.top_k, config={"callbacks": [timer]})
+            rec: Dict[str, Any] = {"patient_id": p.patient_id, "status": "ok", "result": resp.model_dump()}
+        except Exception as e:
+            rec = {"patient_id": p.patient_id, "status": "error", "error": f"{type(e).__name__}: {e}"}
+        rec["elapsed_ms"] = round((time.perf_counter() - t0) * 1e3, 1)
+        return rec
+
+    counts: Counter = Counter()
+    paths: Counter = Counter()
+    retrieval_hits = 0
+    latencies: List[float] = []
+    t_start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, args.workers), thread_name_prefix="screen") as pool:
+            for rec in bounded_map(pool, run, todo(), max(1, args.workers) * 2, ordered=False):
+                out_f.write((json.dumps(rec) + "\n").encode("utf-8"))
+                out_f.flush()
+                ckpt_f.write(json.dumps({"patient_id": rec["patient_id"], "status": rec["status"], "offset": out_f.tell()}) + "\n")
+                ckpt_f.flush()
+
+                latencies.append(rec["elapsed_ms"])
+                if rec["status"] != "ok":
+                    counts["error"] += 1
+                    continue
+                counts[rec["result"]["assessment"]] += 1
+                debug = rec["result"].get("retrieval_debug") or {}
+                paths[debug.get("path") or "unknown"] += 1
+                retrieval_hits += int(bool(debug.get("cache_hit")))
+    finally:
+        out_f.close()
+        ckpt_f.close()
+
+    wall = time.perf_counter() - t_start
+    n = len(latencies)
+    embedder = getattr(c.retriever, "_embedder", None)
+    emb_stats = getattr(embedder, "stats", None)
+    lat = sorted(latencies)
+    summary = {
+        "processed": n,
+        "skipped_from_checkpoint": len(skip),
+        "wall_s": round(wall, 3),
+        "patients_per_s": round(n / wall, 2) if wall > 0 else 0.0,
+        "latency_ms": {
+            "p50": lat[n // 2] if n else 0.0,
+            "p95": lat[min(n - 1, int(0.95 * n))] if n else 0.0,
+        },
+        "assessments": dict(counts),
+        "paths": dict(paths),
+        "nodes": {k: {m: round(v, 2) for m, v in s.items()} for k, s in timer.summary().items()},
+        "cache": {
+            "retrieval_hits_in_run": retrieval_hits,
+            "retrieval": c.retriever.cache_stats(),
+            "embeddings": emb_stats() if callable(emb_stats) else {},
+            "llm": c.llm.cache_stats(),
+            "assessments": c.assessor_service.cache_stats(),
+        },
+        "output": str(out_path),
+        "checkpoint": str(ckpt_path),
+    }
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# scripts/snapshot_index.py
+#
+# Export / import the ingested corpus as one memory-mapped snapshot file
+# (app/stores/snapshot_store.py). scripts/ingest_ng12.py already writes the
+# snapshot; this script moves an index between machines without re-ingesting.
+#
+#   export: Chroma collection (+ index_meta.json) -> SNAPSHOT_PATH
+#   import: SNAPSHOT_PATH -> Chroma collection, NumPy index, BM25 index, feature sidecar
+#   verify: check every section hash
+#
+# Usage (from backend/):
+#   PYTHONPATH=. python scripts/snapshot_index.py export [--out path]
+#   PYTHONPATH=. python scripts/snapshot_index.py import [--snapshot path]
+#   PYTHONPATH=. python scripts/snapshot_index.py verify [--snapshot path]
+
+import argparse
+import json
+
+from app.config.settings import settings
+from app.retrieval.bm25 import BM25Index
+from app.retrieval.chunk_features import chunk_features_payload, features_from_payload, write_chunk_features
+from app.stores.chroma_store import ChromaVectorStore
+from app.stores.index_meta import read_index_meta, write_index_meta
+from app.stores.numpy_store import NumpyVectorStore
+from app.stores.snapshot_store import SnapshotVectorStore, read_snapshot_header
+
+
+def export_snapshot(out: str) -> None:
+    store = ChromaVectorStore()
+    dump = store.dump()
+    if not dump["ids"]:
+        raise SystemExit("Chroma collection is empty. Run scripts/ingest_ng12.py first.")
+    meta = read_index_meta(settings.CHROMA_DIR)
+    SnapshotVectorStore.write(
+        out,
+        dump["ids"],
+        dump["documents"],
+        dump["metadatas"],
+        dump["embeddings"],
+        index_version=str(meta.get("index_version") or store.index_version()),
+        embedding_model=str(meta.get("embedding_model") or ""),
+        features=chunk_features_payload(dump["ids"], dump["documents"]),
+    )
+    print(json.dumps({k: v for k, v in read_snapshot_header(out).items() if k != "sections"}))
+
+
+def import_snapshot(path: str) -> None:
+    snap = SnapshotVectorStore(path)
+    bad = snap.verify()
+    if bad:
+        raise SystemExit(f"Snapshot {path} is corrupt (sections {bad})")
+    header = snap.header
+    dump = snap.dump()
+
+    store = ChromaVectorStore()
+    store.delete(sorted(set(store.ids()) - set(dump["ids"])))
+    B = int(settings.INGEST_UPSERT_BATCH)
+    for start in range(0, len(dump["ids"]), B):
+        sl = slice(start, start + B)
+        store.upsert(dump["ids"][sl], dump["documents"][sl], dump["metadatas"][sl], dump["embeddings"][sl])
+
+    # keep the snapshot's version (computed over ingest order; Chroma may return another order)
+    meta = write_index_meta(
+        settings.CHROMA_DIR,
+        str(header.get("embedding_model") or ""),
+        dump["ids"],
+        dump["documents"],
+        dump["metadatas"],
+        extra={"index_version": header["index_version"]} if header.get("index_version") else None,
+    )
+
+    NumpyVectorStore.write(
+        settings.NUMPY_INDEX_DIR,
+        dump["ids"],
+        dump["documents"],
+        dump["metadatas"],
+        dump["embeddings"],
+        index_version=meta["index_version"],
+    )
+    BM25Index.build(dump["ids"], dump["documents"]).save(settings.BM25_INDEX_PATH)
+
+    features = snap.chunk_features()
+    if not features_from_payload(features):
+        features = chunk_features_payload(dump["ids"], dump["documents"])  # written with another lexicon
+    write_chunk_features(settings.CHUNK_FEATURES_PATH, dump["ids"], dump["documents"], payload=features)
+
+    print(f"Imported {len(dump['ids'])} chunks from {path} (index_version={meta['index_version']})")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Export / import the NG12 index as a single snapshot file")
+    ap.add_argument("command", choices=("export", "import", "verify"))
+    ap.add_argument("--snapshot", "--out", dest="path", default=str(settings.SNAPSHOT_PATH))
+    args = ap.parse_args()
+
+    if args.command == "export":
+        export_snapshot(args.path)
+    elif args.command == "import":
+        import_snapshot(args.path)
+    else:
+        bad = SnapshotVectorStore(args.path).verify()
+        print(json.dumps({"path": args.path, "ok": not bad, "bad_sections": bad}))
+        if bad:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
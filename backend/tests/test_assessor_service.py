@@ -0,0 +1,121 @@
+# tests/test_assessor_service.py
+
+from app.domain.models import Patient
+from app.services.assessor_service import AssessorService
+from app.stores.memory_cache import TTLMemoryCache
+
+
+class Patients:
+    def __init__(self, *patients):
+        self._by_id = {p.patient_id: p for p in patients}
+
+    def get_patient(self, patient_id):
+        return self._by_id.get(patient_id)
+
+
+class Graph:
+    def __init__(self):
+        self.runs = 0
+
+    def invoke(self, state, config=None):
+        self.runs += 1
+        return {
+            "response": {
+                "patient_id": state["patient_id"],
+                "assessment": "Urgent Referral",
+                "reasoning": f"run {self.runs}",
+                "confidence": 0.75,
+                "citations": [],
+                "retrieval_debug": {"path": "llm"},
+            }
+        }
+
+
+def _service(*patients, version=None, model="m1"):
+    version = version or {"v": "idx-1"}
+    graph = Graph()
+    svc = AssessorService(
+        graph,
+        patient_repo=Patients(*patients),
+        cache=TTLMemoryCache(maxsize=16, default_ttl_s=60),
+        index_version=lambda: version["v"],
+        model=model,
+    )
+    return svc, graph
+
+
+def _patient(pid, **kw):
+    fields = {"age": 58, "gender": "female", "smoking_history": "never", "symptoms": ["dysphagia"]}
+    return Patient(patient_id=pid, **{**fields, **kw})
+
+
+def test_repeat_assessment_is_served_from_cache():
+    svc, graph = _service(_patient("PT-1"))
+    first = svc.assess("PT-1")
+    again = svc.assess("PT-1")
+    assert graph.runs == 1
+    assert again.reasoning == first.reasoning
+    assert again.retrieval_debug["result_cache_hit"] is True
+    assert "result_cache_hit" not in first.retrieval_debug
+
+
+def test_same_clinical_profile_shares_an_entry():
+    svc, graph = _service(_patient("PT-1", name="A"), _patient("PT-2", name="B", symptoms=["Dysphagia "]))
+    svc.assess("PT-1")
+    other = svc.assess("PT-2")
+    assert graph.runs == 1
+    assert other.patient_id == "PT-2"
+
+
+def test_index_version_change_invalidates():
+    version = {"v": "idx-1"}
+    svc, graph = _service(_patient("PT-1"), version=version)
+    key = svc._cache_key("PT-1", 5)
+    svc.assess("PT-1")
+
+    version["v"] = "idx-2"  # re-ingest
+    assert svc._cache_key("PT-1", 5) != key
+    resp = svc.assess("PT-1")
+    assert graph.runs == 2
+    assert "result_cache_hit" not in resp.retrieval_debug
+
+
+def test_key_covers_top_k_model_and_clinical_fields():
+    svc, _ = _service(_patient("PT-1"), _patient("PT-2", age=59), _patient("PT-3", symptom_duration_days=30))
+    other_model, _ = _service(_patient("PT-1"), model="m2")
+    key = svc._cache_key("PT-1", 5)
+    assert svc._cache_key("PT-1", 3) != key
+    assert other_model._cache_key("PT-1", 5) != key
+    assert svc._cache_key("PT-2", 5) != key
+    assert svc._cache_key("PT-3", 5) != key
+
+
+def test_fingerprint_ignores_name_id_and_symptom_order():
+    a = _patient("PT-1", name="A", symptoms=["dysphagia", "weight loss"])
+    b = _patient("PT-9", name="B", symptoms=["Weight  loss", "dysphagia"])
+    assert AssessorService.fingerprint(a) == AssessorService.fingerprint(b)
+
+
+def _batch_service(*patients):
+    graph = Graph()
+    return AssessorService(graph, patient_repo=Patients(*patients), batch_workers=2), graph
+
+
+def test_batch_splits_groups_at_ng12_age_thresholds_without_rule_table():
+    svc, graph = _batch_service(
+        _patient("PT-1", age=49), _patient("PT-2", age=50), _patient("PT-3", age=65), _patient("PT-4", age=61)
+    )
+    out = svc.assess_batch(["PT-1", "PT-2", "PT-3", "PT-4"])
+    # 49 | 50 | 61 and 65 share the 60+ band
+    assert out.groups == 3
+    assert graph.runs == 3
+    by_id = {item.patient_id: item.result for item in out.results}
+    assert by_id["PT-3"].retrieval_debug["batch_group"] == by_id["PT-4"].retrieval_debug["batch_group"]
+    assert by_id["PT-1"].retrieval_debug["batch_group"] != by_id["PT-2"].retrieval_debug["batch_group"]
+
+
+def test_batch_groups_same_band_and_symptoms_once():
+    svc, graph = _batch_service(_patient("PT-1", age=51), _patient("PT-2", age=54, name="B"))
+    out = svc.assess_batch(["PT-1", "PT-2"])
+    assert out.groups == 1 and graph.runs == 1
+    assert [item.result.patient_id for item in out.results] == ["PT-1", "PT-2"]
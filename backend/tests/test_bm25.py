@@ -0,0 +1,38 @@
+# tests/test_bm25.py
+
+from app.retrieval.bm25 import BM25Index, tokenize
+
+IDS = ["c0", "c1", "c2", "c3"]
+DOCS = [
+    "Refer people aged 40 and over with unexplained haemoptysis.",
+    "Offer an urgent chest X-ray to people with haemoptysis and cough.",
+    "Refer people with dysphagia for urgent direct access endoscopy.",
+    "Consider a chest X-ray in people with persistent cough and fatigue.",
+]
+
+
+def test_tokenize_normalizes_us_spelling_and_keeps_thresholds():
+    assert tokenize("Hemoptysis in people aged 40 and over") == ["haemoptysis", "people", "aged", "40", "and", "over"]
+
+
+def test_rarer_term_dominates_and_scores_are_ordered():
+    idx = BM25Index.build(IDS, DOCS)
+    hits = idx.search("dysphagia cough", top_k=4)
+    # dysphagia is in one chunk, cough in two: the dysphagia chunk wins
+    assert hits[0][0] == "c2" and {cid for cid, _ in hits[1:]} == {"c1", "c3"}
+    scores = [s for _, s in hits]
+    assert scores == sorted(scores, reverse=True) and scores[0] > scores[1]
+
+
+def test_restrict_ids_and_no_match():
+    idx = BM25Index.build(IDS, DOCS)
+    assert [cid for cid, _ in idx.search("hemoptysis", top_k=5)] == ["c0", "c1"]
+    assert [cid for cid, _ in idx.search("haemoptysis", top_k=5, restrict_ids=["c1", "c3"])] == ["c1"]
+    assert idx.search("lymphadenopathy", top_k=5) == []
+    assert idx.search("haemoptysis", top_k=0) == []
+
+
+def test_save_load_round_trip(tmp_path):
+    idx = BM25Index.build(IDS, DOCS)
+    loaded = BM25Index.load(idx.save(tmp_path / "bm25.json"))
+    assert loaded.search("chest x-ray cough", top_k=3) == idx.search("chest x-ray cough", top_k=3)
@@ -0,0 +1,72 @@
+# tests/test_cached_embeddings.py
+
+import asyncio
+
+from app.providers.cached_embeddings import CachedEmbeddingProvider
+
+
+class Inner:
+    def __init__(self, model_name="emb-1"):
+        self.model_name = model_name
+        self.calls = []
+
+    def embed_texts(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(t)), float(ord(t[0]))] for t in texts]
+
+
+def test_misses_are_batched_once_and_deduplicated():
+    inner = Inner()
+    cache = CachedEmbeddingProvider(inner)
+    out = cache.embed_texts(["cough", "dysphagia", " cough "])
+    assert inner.calls == [["cough", "dysphagia"]]
+    assert out == [[5.0, 99.0], [9.0, 100.0], [5.0, 99.0]]
+    assert cache.stats()["misses"] == 3 and cache.stats()["hits"] == 0
+
+
+def test_hits_skip_the_provider_and_only_misses_are_sent():
+    inner = Inner()
+    cache = CachedEmbeddingProvider(inner)
+    cache.embed_texts(["cough", "dysphagia"])
+    out = cache.embed_texts(["dysphagia", "haemoptysis", "cough"])
+    assert inner.calls[1:] == [["haemoptysis"]]
+    assert out[0] == [9.0, 100.0] and out[2] == [5.0, 99.0]
+    assert cache.embed_texts(["cough"]) == [[5.0, 99.0]] and len(inner.calls) == 2
+    assert cache.stats()["hits"] == 3
+
+
+def test_key_includes_the_model_name():
+    inner = Inner()
+    cache = CachedEmbeddingProvider(inner)
+    cache.embed_texts(["cough"])
+    inner.model_name = "emb-2"  # e.g. a refitted local provider
+    cache.embed_texts(["cough"])
+    assert inner.calls == [["cough"], ["cough"]]
+
+
+def test_results_are_copies_of_the_cached_vectors():
+    cache = CachedEmbeddingProvider(Inner())
+    first = cache.embed_texts(["cough", "cough"])
+    first[0].append(1.0)
+    first[1][0] = -1.0
+    assert cache.embed_texts(["cough"]) == [[5.0, 99.0]]
+    again = cache.embed_texts(["cough", "cough"])
+    assert again[0] is not again[1]
+
+
+def test_disk_tier_survives_a_new_process(tmp_path):
+    path = tmp_path / "emb.sqlite"
+    CachedEmbeddingProvider(Inner(), disk_path=path).embed_texts(["cough", "dysphagia"])
+    inner = Inner()
+    fresh = CachedEmbeddingProvider(inner, disk_path=path)
+    assert fresh.embed_texts(["dysphagia", "cough"]) == [[9.0, 100.0], [5.0, 99.0]]
+    assert inner.calls == [] and fresh.stats()["disk_hits"] == 2
+
+
+def test_async_path_shares_the_cache():
+    inner = Inner()
+    cache = CachedEmbeddingProvider(inner)
+    cache.embed_texts(["cough"])
+    out = asyncio.run(cache.aembed_texts(["cough", "fatigue"]))
+    assert inner.calls == [["cough"], ["fatigue"]]
+    assert out == [[5.0, 99.0], [7.0, 102.0]]
@@ -0,0 +1,62 @@
+# tests/test_dedupe.py
+
+from app.retrieval.dedupe import collapse_near_duplicates, jaccard, near_duplicate_groups, shingles
+
+NOTE = (
+    "Separate recommendations have been made for\n"
+    "adults and for children and young people to reflect\n"
+    "that there are different referral pathways. In\n"
+    "practice young people (aged 16 to 24) may be\n"
+    "referred using either pathway depending on their\n"
+    "age and local arrangements\n"
+)
+REFERRAL = (
+    "Consider a very urgent referral (for an appointment\n"
+    "within 48 hours) for specialist assessment. When\n"
+    "considering referral, take into account any\n"
+    "associated symptoms [1.10.7] [1.10.9]\n"
+)
+
+
+def _footer(page):
+    return f"Suspected cancer: recognition and referral (NG12)\nconditions#notice-of-rights).\nPage {page} of\n95"
+
+
+# second chunks of NG12 pages 75 and 79 (lymphoma symptom table): page 79 has a row page 75 lacks
+PAGE_75 = "gkin's\nlymphoma\n" + REFERRAL + NOTE + _footer(75)
+PAGE_79 = (
+    "either pathway depending on their\nage and local arrangements\n"
+    "Pruritus with\nlymphadenopathy\n(unexplained) in\nchildren and\nyoung people\n"
+    "Non-Hodgkin's\nlymphoma or\nHodgkin's\nlymphoma\n" + REFERRAL + NOTE + _footer(79)
+)
+
+
+def test_table_pages_sharing_notes_are_not_collapsed():
+    # the raw shingles clear the threshold on the shared note and footer alone
+    assert jaccard(shingles(PAGE_75), shingles(PAGE_79)) >= 0.6
+    ids, docs, _, groups = collapse_near_duplicates(
+        ["ng12_0075_01", "ng12_0079_01"], [PAGE_75, PAGE_79], [{"page": 75}, {"page": 79}], threshold=0.6
+    )
+    # page 79 keeps its pruritus row; page 75's text is all inside it
+    assert "ng12_0079_01" in ids
+    assert any("Pruritus" in d for d in docs)
+    assert groups in ({}, {"ng12_0079_01": ["ng12_0075_01"]})
+
+
+def test_chunk_with_text_the_other_lacks_is_kept():
+    a = "Night sweats with\nsplenomegaly\n" + REFERRAL + NOTE + _footer(79)
+    b = "Fever with\nsplenomegaly\n" + REFERRAL + NOTE + _footer(80)
+    assert near_duplicate_groups([a, b], threshold=0.5) == [0, 1]
+
+
+def test_repeated_text_on_other_pages_collapses_with_alias_pages():
+    body = "Lymphadenopathy\n(generalised)\n" + REFERRAL + NOTE
+    ids, docs, metas, groups = collapse_near_duplicates(
+        ["ng12_0063_00", "ng12_0078_00"],
+        [body + _footer(63), body + _footer(78)],
+        [{"page": 63, "has_criteria": False}, {"page": 78, "has_criteria": True}],
+    )
+    assert ids == ["ng12_0063_00"]
+    assert groups == {"ng12_0063_00": ["ng12_0078_00"]}
+    assert metas[0]["alias_pages"] == "78"
+    assert metas[0]["has_criteria"] is True
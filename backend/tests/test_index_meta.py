@@ -0,0 +1,28 @@
+# tests/test_index_meta.py
+
+from app.stores.index_meta import compute_index_version, read_index_meta, write_index_meta
+
+IDS = ["ng12_0001_00", "ng12_0001_01"]
+DOCS = ["Refer for dysphagia.", "Refer for haemoptysis."]
+METAS = [{"page": 1, "site_lung": False, "next_id": "ng12_0001_01"}, {"page": 1, "site_lung": True, "prev_id": "ng12_0001_00"}]
+
+
+def test_version_is_stable_and_ignores_metadata_key_order():
+    v = compute_index_version("m1", IDS, DOCS, METAS)
+    reordered = [dict(reversed(list(m.items()))) for m in METAS]
+    assert compute_index_version("m1", IDS, DOCS, reordered) == v
+
+
+def test_version_changes_with_model_text_and_metadata():
+    v = compute_index_version("m1", IDS, DOCS, METAS)
+    assert compute_index_version("m2", IDS, DOCS, METAS) != v
+    assert compute_index_version("m1", IDS, [DOCS[0], "Refer for cough."], METAS) != v
+    # a site re-tag or adjacency change alone changes retrieval results, so it must re-version
+    assert compute_index_version("m1", IDS, DOCS, [METAS[0], {**METAS[1], "site_lung": False}]) != v
+    assert compute_index_version("m1", IDS, DOCS, [{**METAS[0], "next_id": None}, METAS[1]]) != v
+
+
+def test_write_read_round_trip(tmp_path):
+    meta = write_index_meta(tmp_path, "m1", IDS, DOCS, METAS)
+    assert meta["index_version"] == compute_index_version("m1", IDS, DOCS, METAS)
+    assert read_index_meta(tmp_path) == meta
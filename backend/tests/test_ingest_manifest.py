@@ -0,0 +1,60 @@
+# tests/test_ingest_manifest.py
+
+from app.stores.ingest_manifest import build_manifest, diff_manifest, read_manifest, write_manifest
+
+PAGES = {1: "page one", 2: "page two", 3: "page three"}
+IDS = ["ng12_0001_00", "ng12_0002_00", "ng12_0003_00"]
+DOCS = ["Refer for dysphagia.", "Refer for haemoptysis.", "Offer a FIT test."]
+METAS = [{"page": 1, "site": "upper_gi"}, {"page": 2, "site": "lung"}, {"page": 3, "site": "colorectal"}]
+
+
+def _manifest(pages=PAGES, ids=IDS, docs=DOCS, metas=METAS, model="m1"):
+    return build_manifest(model, pages, ids, docs, metas)
+
+
+def test_unchanged_ingest_embeds_nothing():
+    d = diff_manifest(_manifest(), _manifest())
+    assert not d.full and d.to_embed == [] and d.chunks_removed == []
+    assert d.chunks_unchanged == 3 and d.summary()["embedded"] == 0
+
+
+def test_added_page_and_chunk():
+    new = _manifest(
+        pages={**PAGES, 4: "page four"},
+        ids=IDS + ["ng12_0004_00"],
+        docs=DOCS + ["Refer for a breast lump."],
+        metas=METAS + [{"page": 4, "site": "breast"}],
+    )
+    d = diff_manifest(_manifest(), new)
+    assert d.pages_added == [4] and d.pages_changed == [] and d.pages_removed == []
+    assert d.chunks_added == ["ng12_0004_00"] and d.to_embed == ["ng12_0004_00"]
+    assert d.chunks_unchanged == 3
+
+
+def test_changed_text_re_embeds_and_metadata_only_keeps_the_vector():
+    docs = [DOCS[0], "Refer for unexplained haemoptysis.", DOCS[2]]
+    metas = [METAS[0], METAS[1], {**METAS[2], "next_id": "ng12_0004_00"}]
+    d = diff_manifest(_manifest(), _manifest(pages={**PAGES, 2: "page two, edited"}, docs=docs, metas=metas))
+    assert d.pages_changed == [2]
+    assert d.chunks_changed == ["ng12_0002_00"] and d.to_embed == ["ng12_0002_00"]
+    assert d.chunks_meta_changed == ["ng12_0003_00"]
+    assert d.chunks_unchanged == 1
+
+
+def test_removed_page_and_chunk():
+    d = diff_manifest(_manifest(), _manifest(pages={1: PAGES[1], 2: PAGES[2]}, ids=IDS[:2], docs=DOCS[:2], metas=METAS[:2]))
+    assert d.pages_removed == [3] and d.chunks_removed == ["ng12_0003_00"]
+    assert d.to_embed == [] and d.chunks_unchanged == 2
+
+
+def test_model_change_or_missing_manifest_is_a_full_rebuild():
+    for old in ({}, _manifest(model="m0")):
+        d = diff_manifest(old, _manifest())
+        assert d.full and sorted(d.to_embed) == IDS
+
+
+def test_write_read_round_trip(tmp_path):
+    m = _manifest()
+    write_manifest(tmp_path, m)
+    assert read_manifest(tmp_path) == m
+    assert read_manifest(tmp_path / "absent") == {}
@@ -0,0 +1,80 @@
+# tests/test_llm_cache.py
+
+import asyncio
+
+from app.providers.llm_provider import LLMProvider
+from app.stores.disk_cache import SqliteDiskCache
+from app.stores.memory_cache import TTLMemoryCache
+
+
+class Fake(LLMProvider):
+    """LLMProvider with the client call replaced by a counter."""
+
+    def __init__(self, reply='{"site": "lung"}', **kw):
+        kw.setdefault("cache", TTLMemoryCache(maxsize=32, default_ttl_s=60))
+        super().__init__(model=kw.pop("model", "m1"), **kw)
+        self.reply = reply
+        self.calls = 0
+
+    def _complete(self, system, user):
+        self.calls += 1
+        return self.reply
+
+    async def _acomplete(self, system, user):
+        return self._complete(system, user)
+
+
+def test_repeat_json_call_is_a_hit_and_returns_a_copy():
+    llm = Fake()
+    first = llm.generate_json("sys", "user", "assessor_plan")
+    first["site"] = "mutated"
+    again = llm.generate_json("sys", "user", "assessor_plan")
+    assert again == {"site": "lung"} and llm.calls == 1
+    assert llm.cache_stats()["hits"] == 1 and llm.cache_stats()["misses"] == 1
+
+
+def test_key_covers_schema_prompt_model_and_temperature():
+    llm = Fake()
+    key = llm._cache_key("sys", "user", "assessor_plan")
+    assert llm._cache_key("sys", "user", "assessor_extract") != key
+    assert llm._cache_key("sys", "other", "assessor_plan") != key
+    assert Fake(model="m2")._cache_key("sys", "user", "assessor_plan") != key
+    assert Fake(temperature=0.5)._cache_key("sys", "user", "assessor_plan") != key
+
+    llm.generate_json("sys", "user", "assessor_plan")
+    llm.generate_json("sys", "user", "assessor_extract")
+    assert llm.calls == 2
+
+
+def test_sampling_and_opt_out_are_never_cached():
+    hot = Fake(temperature=0.7)
+    hot.generate_json("sys", "user", "assessor_plan")
+    hot.generate_json("sys", "user", "assessor_plan")
+    assert hot.calls == 2
+
+    llm = Fake()
+    llm.generate_text("sys", "user")
+    llm.generate_text("sys", "user", use_cache=False)
+    assert llm.calls == 2
+
+
+def test_unparseable_output_is_not_cached():
+    llm = Fake(reply="not json")
+    assert llm.generate_json("sys", "user", "assessor_plan") == {}
+    llm.generate_json("sys", "user", "assessor_plan")
+    assert llm.calls == 2
+
+
+def test_disk_tier_is_shared_across_instances(tmp_path):
+    disk = SqliteDiskCache(tmp_path / "llm.sqlite", table="llm")
+    Fake(disk_cache=disk).generate_text("sys", "user")
+    other = Fake(disk_cache=SqliteDiskCache(tmp_path / "llm.sqlite", table="llm"))
+    assert other.generate_text("sys", "user") == '{"site": "lung"}'
+    assert other.calls == 0 and other.cache_stats()["disk_hits"] == 1
+
+
+def test_async_calls_share_the_cache():
+    llm = Fake()
+    llm.generate_json("sys", "user", "assessor_plan")
+    out = asyncio.run(llm.agenerate_json("sys", "user", "assessor_plan"))
+    assert out == {"site": "lung"} and llm.calls == 1
@@ -0,0 +1,84 @@
+# tests/test_ng12_retriever.py
+
+import numpy as np
+import pytest
+
+import app.retrieval.ng12_retriever as retriever_module
+from app.retrieval.ng12_retriever import NG12Retriever
+from app.stores.numpy_store import NumpyVectorStore
+
+# one-hot chunk vectors: relevance is set by the query weights alone, and no two
+# chunks are similar except through prev_id/next_id adjacency
+QUERY = [1.0, 0.9, 0.6, 0.3, 0.2, 0.1]
+IDS = ["a", "b", "c", "d", "e", "f"]
+LUNG = {"a", "d"}
+
+
+class Embedder:
+    def embed_texts(self, texts):
+        return [list(QUERY) for _ in texts]
+
+
+@pytest.fixture(autouse=True)
+def fake_embedder(monkeypatch):
+    monkeypatch.setattr(retriever_module, "get_embedding_provider", lambda name: Embedder())
+
+
+def _store(tmp_path, adjacent=True):
+    metas = []
+    for i, cid in enumerate(IDS):
+        meta = {"page": 1, "site_lung": cid in LUNG}
+        if adjacent:
+            # a <-> b are neighbouring chunks on the same page
+            meta.update({"a": {"next_id": "b"}, "b": {"prev_id": "a"}}.get(cid, {}))
+        metas.append(meta)
+    NumpyVectorStore.write(tmp_path, IDS, [f"chunk {c}" for c in IDS], metas, np.eye(len(IDS), dtype=np.float32))
+    return NumpyVectorStore(tmp_path)
+
+
+def _retriever(store, **kw):
+    return NG12Retriever(store=store, embedding_provider="fake", **kw)
+
+
+def _ids(hits):
+    return [h["id"] for h in hits]
+
+
+def test_rrf_fuses_vector_and_lexical_ranks(tmp_path):
+    r = _retriever(_store(tmp_path), rrf_k=60)
+    vector = [{"id": "a", "distance": 0.7}, {"id": "b", "distance": 0.8}, {"id": "c", "distance": 1.2}]
+    lexical = [("c", 4.0), ("d", 3.0)]
+    fused = r._fuse(vector, lexical, QUERY, k=4)
+
+    # c: 1/63 + 1/61; a: 1/61; b and d tie at 1/62 (vector candidate first)
+    assert _ids(fused) == ["c", "a", "b", "d"]
+    assert fused[0]["rrf_score"] == pytest.approx(1 / 63 + 1 / 61)
+    assert fused[0]["bm25_score"] == 4.0 and fused[0]["vector_rank"] == 3
+    # the lexical-only hit is fetched from the store with its vector similarity
+    assert fused[3]["document"] == "chunk d" and fused[3]["score"] > 0
+    assert _ids(r._fuse(vector, lexical, QUERY, k=2)) == ["c", "a"]
+
+
+def test_mmr_drops_the_adjacent_chunk(tmp_path):
+    hits, debug = _retriever(_store(tmp_path), top_k_default=2, site_filter=False).retrieve("q")
+    # b is the second most relevant, but it overlaps a (next_id): c is picked instead
+    assert _ids(hits) == ["a", "c"]
+    assert debug["mmr_candidates"] == 6
+
+
+def test_without_adjacency_or_mmr_relevance_order_stands(tmp_path):
+    assert _ids(_retriever(_store(tmp_path / "flat", adjacent=False), top_k_default=2).retrieve("q")[0]) == ["a", "b"]
+    assert _ids(_retriever(_store(tmp_path / "adj"), top_k_default=2, mmr=False).retrieve("q")[0]) == ["a", "b"]
+
+
+def test_site_filter_keeps_enough_filtered_hits(tmp_path):
+    hits, debug = _retriever(_store(tmp_path), top_k_default=2, mmr=False).retrieve("q", site="lung")
+    assert _ids(hits) == ["a", "d"]
+    assert debug["site_filter"] == "lung" and debug["site_fallback"] is False
+
+
+def test_site_filter_falls_back_when_too_few_results(tmp_path):
+    # only two lung chunks for top_k=3: the full-corpus result is used instead
+    hits, debug = _retriever(_store(tmp_path), top_k_default=3, mmr=False).retrieve("q", site="lung")
+    assert _ids(hits) == ["a", "b", "c"]
+    assert debug["site_filter"] == "lung" and debug["site_fallback"] is True
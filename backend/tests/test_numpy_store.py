@@ -0,0 +1,109 @@
+# tests/test_numpy_store.py
+
+import numpy as np
+import pytest
+
+from app.stores.numpy_store import (
+    EMBEDDINGS_FILE,
+    FLOAT16_FILE,
+    INT8_FILE,
+    INT8_SCALES_FILE,
+    SCORE_BLOCK_ROWS,
+    NumpyVectorStore,
+)
+
+
+def _corpus(n=50, dim=16, seed=0):
+    rng = np.random.default_rng(seed)
+    ids = [f"ng12_{i:04d}_00" for i in range(n)]
+    docs = [f"chunk {i}" for i in range(n)]
+    metas = [{"page": i // 4, "site": "lung" if i % 3 == 0 else "upper_gi"} for i in range(n)]
+    return ids, docs, metas, rng.normal(size=(n, dim)).astype(np.float32)
+
+
+def test_write_blocks_matches_write(tmp_path):
+    ids, docs, metas, emb = _corpus()
+    NumpyVectorStore.write(tmp_path / "whole", ids, docs, metas, emb, index_version="v1")
+    blocks = (emb[i : i + 7] for i in range(0, len(emb), 7))
+    NumpyVectorStore.write_blocks(tmp_path / "blocks", ids, docs, metas, blocks, dim=emb.shape[1], index_version="v1")
+
+    for name in (EMBEDDINGS_FILE, INT8_FILE, INT8_SCALES_FILE, FLOAT16_FILE):
+        assert np.array_equal(np.load(tmp_path / "whole" / name), np.load(tmp_path / "blocks" / name))
+    assert not list((tmp_path / "blocks").glob("*.tmp"))
+    assert NumpyVectorStore(tmp_path / "blocks").index_version() == "v1"
+
+
+def _brute_force(emb, q, k, rows=None):
+    unit = emb / np.linalg.norm(emb, axis=1, keepdims=True)
+    cos = unit @ (q / np.linalg.norm(q))
+    rows = np.arange(len(emb)) if rows is None else np.asarray(rows)
+    order = rows[np.argsort(-cos[rows], kind="stable")][:k]
+    return order, cos[order]
+
+
+def _index(tmp_path, **kw):
+    ids, docs, metas, emb = _corpus()
+    NumpyVectorStore.write(tmp_path, ids, docs, metas, emb, index_version="v1")
+    return NumpyVectorStore(tmp_path, **kw), ids, metas, emb
+
+
+def test_query_matches_brute_force_cosine(tmp_path):
+    store, ids, _, emb = _index(tmp_path)
+    q = np.random.default_rng(1).normal(size=emb.shape[1]).astype(np.float32)
+    rows, cos = _brute_force(emb, q, 5)
+    hits = store.query(q.tolist(), top_k=5)
+    assert [h["id"] for h in hits] == [ids[i] for i in rows]
+    assert np.allclose([h["distance"] for h in hits], 2.0 - 2.0 * cos, atol=1e-5)
+    assert np.allclose([h["score"] for h in hits], np.maximum(0.0, 2.0 * cos - 1.0), atol=1e-5)
+
+
+def test_query_many_matches_single_queries(tmp_path):
+    store, ids, _, emb = _index(tmp_path)
+    Q = np.random.default_rng(2).normal(size=(4, emb.shape[1])).astype(np.float32)
+    batched = store.query_many(Q.tolist(), top_k=7)
+    for q, hits in zip(Q, batched):
+        rows, _ = _brute_force(emb, q, 7)
+        assert [h["id"] for h in hits] == [ids[i] for i in rows]
+        single = store.query(q.tolist(), top_k=7)
+        assert [h["id"] for h in single] == [h["id"] for h in hits]
+        assert np.allclose([h["score"] for h in single], [h["score"] for h in hits], atol=1e-5)
+
+
+def test_where_filter_restricts_candidates(tmp_path):
+    store, ids, metas, emb = _index(tmp_path)
+    q = np.random.default_rng(3).normal(size=emb.shape[1]).astype(np.float32)
+    lung = [i for i, m in enumerate(metas) if m["site"] == "lung"]
+    rows, _ = _brute_force(emb, q, 5, rows=lung)
+    hits = store.query(q.tolist(), top_k=5, where={"site": "lung"})
+    assert [h["id"] for h in hits] == [ids[i] for i in rows]
+    # k larger than the filtered set returns every match, and an unmatched filter returns nothing
+    assert len(store.query(q.tolist(), top_k=100, where={"site": "lung"})) == len(lung)
+    assert store.query(q.tolist(), top_k=5, where={"site": "breast"}) == []
+
+
+def test_empty_index_and_zero_query(tmp_path):
+    NumpyVectorStore.write(tmp_path, [], [], [], np.zeros((0, 16), dtype=np.float32))
+    empty = NumpyVectorStore(tmp_path)
+    assert empty.query([0.1] * 16, top_k=5) == []
+    assert empty.query_many([[0.1] * 16, [0.2] * 16], top_k=5) == [[], []]
+
+    store, *_ = _index(tmp_path / "full")
+    assert store.query([0.0] * 16, top_k=5) == []
+    assert store.query_many([], top_k=5) == []
+
+
+@pytest.mark.parametrize("quantization", ["int8", "float16"])
+def test_quantized_top_k_after_rescore_matches_float32(tmp_path, quantization):
+    # more rows than SCORE_BLOCK_ROWS, so the coarse pass widens several blocks
+    ids, docs, metas, emb = _corpus(n=600, dim=32, seed=4)
+    NumpyVectorStore.write(tmp_path, ids, docs, metas, emb)
+    exact = NumpyVectorStore(tmp_path)
+    quant = NumpyVectorStore(tmp_path, quantization=quantization, rescore_factor=4)
+    assert quant._qmat is not None and quant._qmat.shape[0] > SCORE_BLOCK_ROWS
+
+    Q = np.random.default_rng(5).normal(size=(20, 32)).astype(np.float32).tolist()
+    for where in (None, {"site": "lung"}):
+        for want, got in zip(exact.query_many(Q, top_k=10, where=where), quant.query_many(Q, top_k=10, where=where)):
+            assert [h["id"] for h in got] == [h["id"] for h in want]
+            # re-scored on the float32 rows: exact distances, not quantized approximations
+            assert np.allclose([h["distance"] for h in got], [h["distance"] for h in want], atol=1e-5)
@@ -0,0 +1,139 @@
+# tests/test_recommendations.py
+
+import pytest
+
+from app.domain.models import Patient
+from app.retrieval.phrase_matcher import PhraseMatcher
+from app.retrieval.recommendations import RecommendationIndex, parse_recommendations, symptom_matches
+
+
+def _criterion(age_min=None, all_of=(), any_of=(), bypass=True):
+    return {
+        "text": "",
+        "age_min": age_min,
+        "age_max": None,
+        "all_of": [list(g) for g in all_of],
+        "any_of": [list(g) for g in any_of],
+        "min_any": 1 if any_of else 0,
+        "min_any_smoker": None,
+        "bypass": bypass,
+    }
+
+
+def _rule(rec_id, criteria, site="general", sex=""):
+    return {
+        "rec_id": rec_id,
+        "section": rec_id.rsplit(".", 1)[0],
+        "site": site,
+        "cancer": "",
+        "sex": sex,
+        "action": "refer",
+        "timeframe": "suspected_cancer_pathway",
+        "criteria": criteria,
+        "page": 1,
+        "chunk_id": f"ng12_{rec_id}",
+        "text": "",
+    }
+
+
+# shapes of the real NG12 parse (scripts/ingest_ng12.py)
+RULES = [
+    _rule("1.1.1", [_criterion(age_min=40, all_of=[["haemoptysis"]])], site="lung"),
+    _rule("1.2.1", [_criterion(all_of=[["dysphagia"]])], site="upper_gi"),
+    _rule("1.4.1", [_criterion(age_min=30, all_of=[["breast lump"]])], site="breast", sex="female"),
+    _rule(
+        "1.6.4",
+        [
+            _criterion(age_min=45, any_of=[["visible haematuria"]], bypass=False),
+            _criterion(age_min=60, all_of=[["non-visible haematuria"], ["dysuria"]], bypass=False),
+        ],
+        site="urological",
+    ),
+]
+
+
+@pytest.fixture(scope="module")
+def idx():
+    return RecommendationIndex.from_rules(RULES)
+
+
+def _met(idx, symptoms, age=55, gender="female"):
+    p = Patient(patient_id="T", age=age, gender=gender, symptoms=symptoms)
+    return [m["rule"]["rec_id"] for m in idx.lookup(p)]
+
+
+def test_plain_symptoms_match(idx):
+    assert _met(idx, ["haemoptysis"]) == ["1.1.1"]
+    assert _met(idx, ["Dysphagia"]) == ["1.2.1"]
+    assert _met(idx, ["breast lump"]) == ["1.4.1"]
+    assert _met(idx, ["visible haematuria"], age=65) == ["1.6.4"]
+
+
+def test_us_spelling_matches(idx):
+    assert _met(idx, ["hemoptysis"]) == ["1.1.1"]
+
+
+def test_age_and_sex_bounds(idx):
+    assert _met(idx, ["haemoptysis"], age=35) == []
+    assert _met(idx, ["breast lump"], gender="male") == []
+
+
+@pytest.mark.parametrize(
+    "symptom",
+    [
+        "no haemoptysis",
+        "denies haemoptysis",
+        "haemoptysis resolved",
+        "negative for haemoptysis",
+        "denies cough, weight loss and haemoptysis",
+    ],
+)
+def test_negated_or_resolved_symptoms_do_not_match(idx, symptom):
+    assert _met(idx, [symptom]) == []
+
+
+def test_negation_scope_ends_at_but(idx):
+    assert _met(idx, ["no weight loss but dysphagia"]) == ["1.2.1"]
+    assert _met(idx, ["no dysphagia", "haemoptysis"]) == ["1.1.1"]
+
+
+def test_terms_match_whole_tokens_only(idx):
+    assert _met(idx, ["breast lumpectomy scar"]) == []
+    assert _met(idx, ["nondysphagia"]) == []
+
+
+def test_non_visible_haematuria_is_not_visible_haematuria(idx):
+    assert _met(idx, ["non-visible haematuria"], age=65) == []
+    assert _met(idx, ["non visible haematuria"], age=65) == []
+    # the longer term is its own criterion
+    matches = idx.lookup(Patient(patient_id="T", age=65, symptoms=["non-visible haematuria", "dysuria"]))
+    assert [m["rule"]["rec_id"] for m in matches] == ["1.6.4"]
+    assert matches[0]["terms"] == ["dysuria", "non-visible haematuria"]
+
+
+def test_symptom_matches_keeps_longest_overlap():
+    m = PhraseMatcher(["haematuria", "visible haematuria", "non-visible haematuria"])
+    assert symptom_matches(m, "non-visible haematuria") == {"non-visible haematuria"}
+    assert symptom_matches(m, "visible haematuria") == {"visible haematuria"}
+
+
+NG12_1_6_4 = """1.6 Urological cancers
+1.6.4 Refer people using a suspected cancer pathway referral for bladder cancer if they are:
+• aged 45 and over and have:
+－ unexplained visible haematuria without urinary tract infection or
+－ visible haematuria that persists or recurs after successful treatment of urinary tract infection or
+• aged 60 and over and have unexplained non-visible haematuria and either dysuria or a raised white cell count on a blood test. [2015]
+"""
+
+
+def test_parser_deduplicates_groups_and_keeps_exclusions():
+    (rule,) = parse_recommendations({1: NG12_1_6_4}, ["ng12_0001_00"], [NG12_1_6_4], [{"page": 1}])
+    visible = rule["criteria"][0]
+    assert visible["age_min"] == 45
+    assert visible["any_of"] == [["visible haematuria"]]
+    assert visible["exclusions"] == [
+        "without urinary tract infection",
+        "after successful treatment of urinary tract infection",
+    ]
+    assert visible["bypass"] is False
+    assert rule["chunk_id"] == "ng12_0001_00"
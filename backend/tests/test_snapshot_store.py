@@ -0,0 +1,71 @@
+# tests/test_snapshot_store.py
+
+import numpy as np
+import pytest
+
+from app.stores.numpy_store import NumpyVectorStore
+from app.stores.snapshot_store import SnapshotVectorStore, read_snapshot_header
+
+
+def _corpus(n=40, dim=24, seed=0):
+    rng = np.random.default_rng(seed)
+    ids = [f"ng12_{i:04d}_00" for i in range(n)]
+    docs = [f"chunk {i} – référence {'x' * (i % 7)}" for i in range(n)]  # multi-byte utf-8, uneven lengths
+    metas = [{"page": i // 3, "site": "lung" if i % 2 else "upper_gi"} for i in range(n)]
+    return ids, docs, metas, rng.normal(size=(n, dim)).astype(np.float32)
+
+
+@pytest.fixture
+def snapshot(tmp_path):
+    ids, docs, metas, emb = _corpus()
+    path = SnapshotVectorStore.write(
+        tmp_path / "ng12.snapshot", ids, docs, metas, emb,
+        index_version="v7", embedding_model="m", features={"chunks": {}},
+    )
+    return path, (ids, docs, metas, emb)
+
+
+def test_write_then_mmap_load_round_trips(snapshot, tmp_path):
+    path, (ids, docs, metas, emb) = snapshot
+    store = SnapshotVectorStore(path)
+
+    assert store.index_version() == "v7"
+    assert store.verify() == []
+    assert store.chunk_features() == {"chunks": {}}
+    dump = store.dump()
+    assert dump["ids"] == ids and dump["documents"] == docs and dump["metadatas"] == metas
+    # zero-copy views of the read-only mapping
+    assert not store._mat.flags.owndata and not store._mat.flags.writeable
+    assert store.resident_bytes() == 0
+
+    NumpyVectorStore.write(tmp_path / "numpy", ids, docs, metas, emb, index_version="v7")
+    ref = NumpyVectorStore(tmp_path / "numpy")
+    assert np.array_equal(np.asarray(store._mat), np.asarray(ref._mat))
+    q = np.random.default_rng(1).normal(size=emb.shape[1]).tolist()
+    assert store.query(q, top_k=5, where={"site": "lung"}) == ref.query(q, top_k=5, where={"site": "lung"})
+
+
+def test_quantized_snapshot_uses_the_base_initializer(snapshot):
+    path, (ids, *_) = snapshot
+    store = SnapshotVectorStore(path, quantization="int8", rescore_factor=3)
+    assert store.rescore_factor == 3 and store._qmat.dtype == np.int8
+    assert store._row == {cid: i for i, cid in enumerate(ids)}
+    assert len(store.query_many([[1.0] * 24, [0.5] * 24], top_k=4)[1]) == 4
+    with pytest.raises(ValueError):
+        SnapshotVectorStore(path, quantization="int4")
+
+
+def test_sections_are_64_byte_aligned(snapshot):
+    path, _ = snapshot
+    sections = read_snapshot_header(path)["sections"]
+    assert {"embeddings", "int8", "int8_scales", "float16", "doc_offsets", "doc_blob", "chunks", "features"} <= set(sections)
+    assert all(s["offset"] % 64 == 0 for s in sections.values())
+    # the mapping starts page-aligned, so the array views are 64-byte aligned in memory too
+    store = SnapshotVectorStore(path, quantization="float16")
+    for arr in (store._mat, store._qmat, store._array("int8"), store._array("int8_scales")):
+        assert arr.ctypes.data % 64 == 0
+
+
+def test_missing_snapshot_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        SnapshotVectorStore(tmp_path / "absent.snapshot")
@@ -22,6 +22,7 @@ export type Citation = {
   page: number;
   chunk_id: string;
   excerpt?: string;
+  alias_pages?: number[];
 };
 
 export type AssessResponse = {
@@ -23,6 +23,11 @@ export default function CitationList({ citations }: { citations: Citation[] }) {
             <span className="rounded-full bg-indigo-500/15 px-2 py-1 text-indigo-200">
               p.{c.page}
             </span>
+            {c.alias_pages && c.alias_pages.length > 0 ? (
+              <span className="rounded-full bg-indigo-500/10 px-2 py-1 text-indigo-300">
+                also p.{c.alias_pages.join(", ")}
+              </span>
+            ) : null}
             <span className="rounded-full bg-cyan-500/15 px-2 py-1 text-cyan-200">
               {c.chunk_id}
             </span>